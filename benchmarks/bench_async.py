@@ -0,0 +1,54 @@
+"""Thousands of scripts sharing one asyncio event loop.
+
+Runs the same compiled program as many concurrent AsyncInterpreter tasks
+and compares the total with running it that many times synchronously.
+
+    python benchmarks/bench_async.py [scripts] [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.async_interpreter import AsyncInterpreter
+from doglang.program import compile
+
+SCRIPT = """
+i = 0;
+total = 0;
+wagtail(i < {iterations}) {{
+    total = total + i % 7;
+    i = i + 1;
+}}
+bark(total);
+"""
+
+
+async def run_all(program, scripts, yield_every):
+    await asyncio.gather(*(AsyncInterpreter(program, output=StringIO(), yield_every=yield_every).run()
+                           for _ in range(scripts)))
+
+
+def main():
+    scripts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    program = compile(SCRIPT.format(iterations=iterations))
+
+    start = time.perf_counter()
+    for _ in range(scripts):
+        program.run(output=StringIO())
+    sequential = time.perf_counter() - start
+    print(f"sequential Program.run   : {sequential * 1000:8.1f} ms")
+
+    for yield_every in (100, 1000):
+        start = time.perf_counter()
+        asyncio.run(run_all(program, scripts, yield_every))
+        elapsed = time.perf_counter() - start
+        print(f"{scripts} tasks, yield/{yield_every:<5}: {elapsed * 1000:8.1f} ms  ({elapsed / sequential:4.2f}x sequential)")
+
+
+if __name__ == "__main__":
+    main()
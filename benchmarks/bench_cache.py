@@ -0,0 +1,89 @@
+"""Cold vs. warm startup with the program cache.
+
+Cold runs tokenize, parse and compile the script and write the cache entry.
+Warm runs load the entry and skip the front end. Both are measured for
+every engine.
+
+    python benchmarks/bench_cache.py [statements]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from doglang import cache
+from doglang.program import ENGINES
+
+REPEAT = 5
+
+
+def generate(statements):
+    lines = ["total = 0;"]
+    for i in range(statements):
+        lines.append(f"v{i % 500} = {i} * 2 + {i % 7};")
+        lines.append(f"sniff(v{i % 500} > {i}) {{ total = total + 1; }}")
+    lines.append("bark(total);")
+    return "\n".join(lines)
+
+
+def best_of(function):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    code = generate(statements)
+    workdir = tempfile.mkdtemp()
+    try:
+        cache_dir = os.path.join(workdir, cache.CACHE_DIR_NAME)
+        script = os.path.join(workdir, "bench.doggy")
+        with open(script, "w") as file:
+            file.write(code)
+        environment = dict(os.environ, PYTHONPATH=ROOT)
+        for engine in ENGINES:
+
+            def cold():
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                cache.load_program(code, script, engine)
+
+            def warm():
+                cache.load_program(code, script, engine)
+
+            cold_time = best_of(cold)
+            warm_time = best_of(warm)
+            print(f"load on {engine}, {statements * 2 + 2} statements")
+            print(f"  cold: {cold_time * 1000:8.2f} ms")
+            print(f"  warm: {warm_time * 1000:8.2f} ms  ({cold_time / warm_time:.1f}x faster)")
+
+            # Whole process startup through the CLI, including Python itself
+            command = [sys.executable, "-m", "doglang.cli", "--engine", engine, "-f", script]
+
+            def cli_cold():
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env=environment)
+
+            def cli_warm():
+                subprocess.run(command, check=True, stdout=subprocess.DEVNULL, env=environment)
+
+            cli_cold_time = best_of(cli_cold)
+            cli_warm_time = best_of(cli_warm)
+            print(f"doglang --engine {engine} -f (whole process)")
+            print(f"  cold: {cli_cold_time * 1000:8.2f} ms")
+            print(f"  warm: {cli_warm_time * 1000:8.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Counted wagtail loops against the plain loop path, on the tree and py engines.
+
+The plain path is timed by compiling with counted loop recognition turned
+off. The vm has no counted loop path and is left out.
+
+    python benchmarks/bench_counted.py [iterations]
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import doglang.executor
+import doglang.transpiler
+from doglang.program import compile
+
+SCRIPTS = {
+    "fib": """a = 0;
+b = 1;
+count = 0;
+wagtail(count < {iterations}) {{
+    temp = (a + b) % 1000000007;
+    a = b;
+    b = temp;
+    count = count + 1;
+}}
+bark(a);
+""",
+    "sum": """i = 0;
+total = 0;
+wagtail(i < {iterations}) {{
+    total = total + i;
+    i = i + 1;
+}}
+bark(total);
+""",
+    "empty": """i = 0;
+wagtail(i < {iterations}) {{
+    i = i + 1;
+}}
+""",
+}
+
+
+@contextmanager
+def plain_loops():
+    """Compile every wagtail as a plain loop."""
+    saved = doglang.executor.counted_loop, doglang.transpiler.counted_loop
+    doglang.executor.counted_loop = doglang.transpiler.counted_loop = lambda node: None
+    try:
+        yield
+    finally:
+        doglang.executor.counted_loop, doglang.transpiler.counted_loop = saved
+
+
+def best_time(program, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        program.run(output=StringIO())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"{'script':>6} {'engine':>6} {'plain ms':>10} {'counted ms':>11} {'speedup':>8}")
+    for name, script in SCRIPTS.items():
+        code = script.format(iterations=iterations)
+        for engine in ("tree", "py"):
+            with plain_loops():
+                plain = compile(code, engine)
+            counted = compile(code, engine)
+            plain_time, counted_time = best_time(plain), best_time(counted)
+            print(f"{name:>6} {engine:>6} {plain_time * 1000:10.1f} {counted_time * 1000:11.1f} "
+                  f"{plain_time / counted_time:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compare the tree walking interpreter with the bytecode VM on a loop-heavy script.
+
+    python benchmarks/bench_engines.py [iterations]
+"""
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.main import Interpreter
+from doglang.program import ENGINES
+
+SCRIPT = """
+a = 0;
+b = 1;
+count = 0;
+total = 0;
+wagtail(count < {iterations}) {{
+    temp = a + b;
+    a = b;
+    b = temp % 1000;
+    sniff(count % 2 == 0) {{
+        total = total + 1;
+    }}
+    count = count + 1;
+}}
+bark(total);
+"""
+
+
+def time_engine(code, engine, repeat=7):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            Interpreter(code, engine=engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    code = SCRIPT.format(iterations=iterations)
+    results = {engine: time_engine(code, engine) for engine in ENGINES}
+    baseline = results["tree"]
+    for engine, elapsed in results.items():
+        print(f"{engine:>6}: {elapsed * 1000:8.1f} ms  ({baseline / elapsed:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Time examples/fib.doggy scaled up to thousands of iterations.
+
+The numbers are not kept small here, so a and b grow to thousands of
+digits. Values stay native Python ints from start to end, so the additions
+cost what Python's big integer additions cost and the time per iteration
+only grows with the size of the numbers. The variant without bark leaves
+out the one place left where a number is turned into text.
+
+    python benchmarks/bench_fib.py [iterations ...]
+"""
+import os
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.program import ENGINES, compile
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', 'examples', 'fib.doggy')
+
+
+def scaled(iterations, bark=True):
+    with open(EXAMPLE) as file:
+        code = file.read()
+    code = code.replace("count < 10", f"count < {iterations}")
+    if not bark:
+        code = code.replace("bark(a);", "")
+    return code
+
+
+def time_program(program, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        program.run(output=StringIO())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    counts = [int(argument) for argument in sys.argv[1:]] or [1000, 2000, 4000, 8000]
+    print(f"{'iterations':>10} {'engine':>6} {'bark':>5} {'ms':>10} {'us/iteration':>13}")
+    for iterations in counts:
+        for engine in ENGINES:
+            for bark in (True, False):
+                program = compile(scaled(iterations, bark), engine)
+                elapsed = time_program(program)
+                print(f"{iterations:>10} {engine:>6} {'yes' if bark else 'no':>5} {elapsed * 1000:10.2f} "
+                      f"{elapsed / iterations * 1e6:13.2f}")
+
+
+if __name__ == "__main__":
+    main()
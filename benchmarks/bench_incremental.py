@@ -0,0 +1,52 @@
+"""Time single keystroke edits on a large file, incremental against a full re-parse.
+
+    python benchmarks/bench_incremental.py [statements]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer
+from doglang.incremental import Document
+from workloads import straight_line
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    document = Document(straight_line(statements))
+    rng = random.Random(1)
+    edits = 200
+
+    start = time.perf_counter()
+    for _ in range(edits):
+        # Type a digit into the number at the end of a random line
+        line = rng.randint(2, statements)
+        column = document.lines[line - 1].index("%") - 1
+        document.edit(line, column, line, column, str(rng.randint(0, 9)))
+    in_line = (time.perf_counter() - start) / edits
+
+    start = time.perf_counter()
+    for _ in range(edits):
+        # Insert a new line, everything after it moves down
+        line = rng.randint(2, len(document.lines) - 1)
+        document.edit(line, 1, line, 1, "x1 = 2;\n")
+    new_line = (time.perf_counter() - start) / edits
+
+    start = time.perf_counter()
+    repeat = 5
+    for _ in range(repeat):
+        SyntaxAnalyser(Tokenizer(document.text)).parse()
+    full = (time.perf_counter() - start) / repeat
+
+    print(f"{len(document.lines)} lines")
+    print(f"full re-parse:       {full * 1000:9.3f} ms")
+    print(f"edit within a line:  {in_line * 1000:9.3f} ms  ({full / in_line:,.0f}x)")
+    print(f"edit adding a line:  {new_line * 1000:9.3f} ms  ({full / new_line:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
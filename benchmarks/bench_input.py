@@ -0,0 +1,75 @@
+"""Time a script that fetches every record of a data file.
+
+Compares the interactive path, input() for every fetch, with reading the
+file through an InputReader.
+
+    python benchmarks/bench_input.py [records]
+"""
+import builtins
+import os
+import sys
+import tempfile
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.main import Interpreter
+from doglang.program import ENGINES
+from doglang.runtime import InputReader
+
+SCRIPT = """
+total = 0;
+count = 0;
+wagtail(count < {records}) {{
+    value = fetch("value? ");
+    total = total + value;
+    count = count + 1;
+}}
+bark(total);
+"""
+
+
+def time_run(code, engine, path, interactive, repeat=5):
+    best = None
+    for _ in range(repeat):
+        with open(path) as file:
+            if interactive:
+                # What the old fetch did: one input() call, and its prompt, per record
+                original = builtins.input
+                builtins.input = lambda prompt: sys.stdout.write(prompt) and file.readline()
+                inputs = InputReader()
+            else:
+                inputs = InputReader(file)
+            start = time.perf_counter()
+            stdout = sys.stdout
+            sys.stdout = StringIO()
+            try:
+                Interpreter(code, engine=engine, output=StringIO(), inputs=inputs)
+            finally:
+                sys.stdout = stdout
+                if interactive:
+                    builtins.input = original
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    code = SCRIPT.format(records=records)
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as data:
+        data.writelines(f"{i}\n" for i in range(records))
+    try:
+        for engine in ENGINES:
+            interactive = time_run(code, engine, data.name, interactive=True)
+            reader = time_run(code, engine, data.name, interactive=False)
+            rate = records / reader / 1000
+            print(f"{engine:>6}: input() {interactive * 1000:8.1f} ms  reader {reader * 1000:8.1f} ms  "
+                  f"({interactive / reader:4.2f}x, {rate:.0f}k records/s)")
+    finally:
+        os.remove(data.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Cost of running with execution limits on the loop benchmark.
+
+Runs the script from bench_engines.py on both engines without limits and
+with generous step and time limits that are never hit. Runs alternate and
+use CPU time, the difference is small enough to drown in scheduling noise
+otherwise.
+
+    python benchmarks/bench_limits.py [iterations]
+"""
+import os
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_engines import SCRIPT
+from doglang.program import ENGINES, compile
+from doglang.runtime import Limits
+
+
+def time_runs(program, limits, repeat=15):
+    """Best times without and with limits, alternating so both see the same machine noise."""
+    best = [None, None]
+    for _ in range(repeat):
+        for index, run_limits in enumerate((None, limits)):
+            start = time.process_time()
+            program.run(output=StringIO(), limits=run_limits)
+            elapsed = time.process_time() - start
+            best[index] = elapsed if best[index] is None else min(best[index], elapsed)
+    return best
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    code = SCRIPT.format(iterations=iterations)
+    limits = Limits(steps=10 ** 12, time=3600)
+    for engine in ENGINES:
+        program = compile(code, engine)
+        free, limited = time_runs(program, limits)
+        print(f"{engine:>6}: no limits {free * 1000:8.1f} ms  limits {limited * 1000:8.1f} ms  "
+              f"({(limited / free - 1) * 100:+5.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Time a bark-heavy script with block buffered and line buffered output.
+
+Output goes to a real file, since the cost being measured is the write
+calls, not building strings in memory.
+
+    python benchmarks/bench_output.py [lines]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.main import Interpreter
+from doglang.program import ENGINES
+from doglang.runtime import OutputWriter
+
+SCRIPT = """
+i = 0;
+wagtail(i < {lines}) {{
+    bark(i);
+    i = i + 1;
+}}
+"""
+
+
+def time_output(code, engine, line_buffering, repeat=5):
+    best = None
+    with tempfile.TemporaryFile('w') as target:
+        for _ in range(repeat):
+            target.seek(0)
+            output = OutputWriter(target, line_buffering=line_buffering)
+            start = time.perf_counter()
+            Interpreter(code, engine=engine, output=output)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    code = SCRIPT.format(lines=lines)
+    for engine in ENGINES:
+        line = time_output(code, engine, line_buffering=True)
+        block = time_output(code, engine, line_buffering=False)
+        print(f"{engine:>6}: line buffered {line * 1000:8.1f} ms  block buffered {block * 1000:8.1f} ms  ({line / block:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Memory and speed of packs.
+
+Builds a pack of a million ints with bury ...[] = in DogLang on each engine
+and compares the memory it holds with a Python list of the same ints, then
+times a loop that digs and buries every element.
+
+    python benchmarks/bench_pack.py [size]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.program import ENGINES, compile
+
+BUILD = """numbers = pack[];
+i = 0;
+wagtail(i < {size}) {{
+    bury numbers[] = i * 1000;
+    i = i + 1;
+}}
+"""
+
+WALK = """i = 0;
+wagtail(i < {size}) {{
+    bury numbers[i] = dig numbers[i] + 1;
+    i = i + 1;
+}}
+"""
+
+
+def held_bytes(make):
+    """Bytes still allocated by what make() returns."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        value = make()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del value
+    return after - before
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    as_list = held_bytes(lambda: [i * 1000 for i in range(size)])
+    print(f"list of {size} ints: {as_list / 1e6:.1f} MB")
+    print(f"{'engine':>6} {'pack MB':>8} {'of list':>8} {'build ms':>9} {'walk ms':>8}")
+    for engine in ENGINES:
+        build = compile(BUILD.format(size=size), engine)
+        walk = compile(WALK.format(size=size), engine, variables=["numbers"])
+        held = held_bytes(lambda: build.run(output=StringIO())["numbers"])
+        start = time.perf_counter()
+        numbers = build.run(output=StringIO())["numbers"]
+        built = time.perf_counter()
+        walk.run(output=StringIO(), variables={"numbers": numbers})
+        walked = time.perf_counter()
+        print(f"{engine:>6} {held / 1e6:8.1f} {held / as_list:7.0%} {(built - start) * 1000:9.1f} "
+              f"{(walked - built) * 1000:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
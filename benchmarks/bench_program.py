@@ -0,0 +1,65 @@
+"""Per-request latency of running the same script many times.
+
+Compares building an Interpreter for every run, which parses the source
+each time, with compiling a Program once and calling run().
+
+    python benchmarks/bench_program.py [runs]
+"""
+import os
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.main import Interpreter
+from doglang.program import ENGINES, compile
+
+# A typical small request handler: some setup, a short loop, a few branches
+SCRIPT = """
+score = 0;
+i = 0;
+wagtail(i < 10) {
+    sniff(i % 3 == 0) {
+        score = score + 3;
+    } else {
+        sniff(i % 2 == 0) {
+            score = score + 2;
+        } else {
+            score = score - 1;
+        }
+    }
+    i = i + 1;
+}
+grade = "low";
+sniff(score > 10) {
+    grade = "high";
+}
+bark(score);
+bark(grade);
+"""
+
+
+def time_runs(runs, run_once, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(runs):
+            run_once()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / runs
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for engine in ENGINES:
+        program = compile(SCRIPT, engine)
+        fresh = time_runs(runs, lambda: Interpreter(SCRIPT, engine=engine, output=StringIO()))
+        reused = time_runs(runs, lambda: program.run(output=StringIO()))
+        print(f"{engine:>6}: Interpreter {fresh * 1e6:8.1f} us/run  Program.run {reused * 1e6:8.1f} us/run  "
+              f"({fresh / reused:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Throughput of run_many on a CPU-bound script as the number of workers grows.
+
+On a machine with N cores the process pool should approach N times the
+sequential rate. The thread pool shares one interpreter lock and stays
+close to sequential.
+
+    python benchmarks/bench_runner.py [runs] [iterations]
+"""
+import os
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.program import compile
+from doglang.runner import run_many
+
+SCRIPT = """
+seed = fetch("");
+i = 0;
+total = 0;
+wagtail(i < {iterations}) {{
+    seed = (seed * 1103 + 12345) % 65536;
+    total = total + seed % 7;
+    i = i + 1;
+}}
+bark(total);
+"""
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    program = compile(SCRIPT.format(iterations=iterations), "vm")
+    input_sets = [[str(seed)] for seed in range(runs)]
+
+    start = time.perf_counter()
+    for inputs in input_sets:
+        program.run(inputs=inputs, output=StringIO())
+    sequential = time.perf_counter() - start
+    print(f"sequential      : {sequential * 1000:8.1f} ms")
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, cores} | ({cores // 2} if cores > 3 else set()))
+    for pool in ("thread", "process"):
+        for workers in counts:
+            start = time.perf_counter()
+            run_many(program, input_sets, workers=workers, pool=pool)
+            elapsed = time.perf_counter() - start
+            print(f"{pool:>7} x {workers:<6}: {elapsed * 1000:8.1f} ms  ({sequential / elapsed:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
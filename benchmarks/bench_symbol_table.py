@@ -0,0 +1,45 @@
+"""Micro-benchmark for SymbolTable lookup and modify.
+
+Lookup cost should stay flat as the number of symbols grows.
+
+    python benchmarks/bench_symbol_table.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.SymbolTable import SymbolTable
+
+SIZES = (10, 100, 1000, 10000)
+REPEAT = 5
+NUMBER = 200000
+
+
+def build_table(size):
+    table = SymbolTable()
+    for i in range(size):
+        table.insert(f"var{i}", "int", "local", i)
+    return table
+
+
+def time_operation(statement, table, name):
+    timer = timeit.Timer(statement, globals={'table': table, 'name': name})
+    best = min(timer.repeat(repeat=REPEAT, number=NUMBER))
+    return best / NUMBER * 1e9
+
+
+def main():
+    print(f"{'symbols':>8} {'lookup ns':>10} {'modify ns':>10}")
+    for size in SIZES:
+        table = build_table(size)
+        # The last inserted name is the worst case for a linear scan
+        name = f"var{size - 1}"
+        lookup = time_operation("table.lookup(name)", table, name)
+        modify = time_operation("table.modify(name, 1)", table, name)
+        print(f"{size:>8} {lookup:>10.1f} {modify:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Tokenizer throughput on a generated multi-megabyte .doggy file.
+
+Compares the master-regex tokenizer with the previous findall() plus
+if/elif classification, and measures peak memory when streaming from a file.
+
+    python benchmarks/bench_tokenizer.py [megabytes]
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.Tokenizer import (Token, Tokenizer, Tokens, arithmetic_operators, comparison_operators,
+                               curly_braces, iter_tokens, keywords, logical_operators, parentheses,
+                               semicolon, separators)
+
+BLOCK = """counter = 0;
+total = 1;
+wagtail(counter < 100) {
+    sniff(counter % 3 == 0 && total != 7) {
+        bark("fizz");
+    } else {
+        total = total * 2 + (counter - 1) / 4;
+    }
+    counter = counter + 1;
+}
+"""
+
+
+def legacy_tokenizer(code):
+    """The line by line findall() tokenizer this module replaced, kept for comparison."""
+    tokens = []
+    pattern = r'"(?:\\.|[^"\\])*"|[A-Za-z_]\w*|\d+|==|!=|>=|<=|&&|\|\||[+\-*/%]=?|[(){};,]|[<>]|='
+    for line_number, line in enumerate(code.splitlines(), 1):
+        for word in re.findall(pattern, line):
+            if word.startswith('"') and word.endswith('"'):
+                tokens.append(Token(Tokens.STRING_LITERAL, word[1:-1], line_number))
+            elif word in keywords:
+                tokens.append(Token(Tokens.KEYWORD, word, line_number))
+            elif word.isidentifier():
+                tokens.append(Token(Tokens.IDENTIFIER, word, line_number))
+            elif word == '=':
+                tokens.append(Token(Tokens.ASSIGNMENT_OP, word, line_number))
+            elif word.isdigit():
+                tokens.append(Token(Tokens.INT_LITERAL, word, line_number))
+            elif word in arithmetic_operators:
+                tokens.append(Token(Tokens.ARITHMETIC_OP, word, line_number))
+            elif word in comparison_operators:
+                tokens.append(Token(Tokens.COMPARISON_OP, word, line_number))
+            elif word in logical_operators:
+                tokens.append(Token(Tokens.LOGICAL_OP, word, line_number))
+            elif word in parentheses:
+                tokens.append(Token(Tokens.PARENTHESIS, word, line_number))
+            elif word in curly_braces:
+                tokens.append(Token(Tokens.CURLY_BRACE, word, line_number))
+            elif word in separators:
+                tokens.append(Token(Tokens.SEPARATOR, word, line_number))
+            elif word == semicolon:
+                tokens.append(Token(Tokens.SEMICOLON, word, line_number))
+    return tokens
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def stream_count(path):
+    with open(path) as file:
+        return sum(1 for _ in iter_tokens(file))
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    code = BLOCK * int(megabytes * 1024 * 1024 / len(BLOCK))
+    size = len(code) / 1024 / 1024
+
+    with tempfile.NamedTemporaryFile("w", suffix=".doggy", delete=False) as file:
+        file.write(code)
+        path = file.name
+    try:
+        legacy, legacy_time = timed(legacy_tokenizer, code)
+        tokens, list_time = timed(Tokenizer, code)
+        del legacy, tokens
+
+        count, stream_time = timed(stream_count, path)
+
+        # tracemalloc slows everything down, so memory is measured in separate runs
+        tracemalloc.start()
+        stream_count(path)
+        _, stream_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        Tokenizer(code)
+        _, list_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.remove(path)
+
+    print(f"{size:.1f} MB source, {count} tokens")
+    for label, elapsed in (("legacy findall", legacy_time), ("Tokenizer", list_time),
+                           ("iter_tokens(file)", stream_time)):
+        print(f"  {label:<18} {elapsed:7.2f} s  {count / elapsed / 1e6:6.2f} M tokens/s")
+    print(f"  peak memory: Tokenizer {list_peak / 1e6:.1f} MB, iter_tokens(file) {stream_peak / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Memory per token and parse time on a large generated program.
+
+    python benchmarks/bench_tokens.py [blocks]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer
+
+BLOCK = """counter = 0;
+total = 1;
+wagtail(counter < 100) {
+    sniff(counter % 3 == 0 && total != 7) {
+        bark("fizz");
+    } else {
+        total = total * 2 + (counter - 1) / 4;
+    }
+    counter = counter + 1;
+}
+"""
+
+
+def main():
+    blocks = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    code = BLOCK * blocks
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tokens = Tokenizer(code)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    per_token = (after - before) / len(tokens)
+
+    start = time.perf_counter()
+    SyntaxAnalyser(tokens).parse()
+    parse_time = time.perf_counter() - start
+
+    print(f"{len(code) / 1024 / 1024:.1f} MB source, {len(tokens)} tokens")
+    print(f"  memory per token: {per_token:6.1f} bytes (token list {(after - before) / 1e6:.1f} MB)")
+    print(f"  parse time:       {parse_time:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
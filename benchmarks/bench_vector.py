@@ -0,0 +1,67 @@
+"""Whole-pack arithmetic against a wagtail over every element.
+
+Both scripts scale a pack and add up the elements above a threshold. The
+whole-pack version runs on each available backend of doglang.vector.
+
+    python benchmarks/bench_vector.py [size]
+"""
+import os
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang import vector
+from doglang.program import compile
+from doglang.runtime import Pack
+
+LOOP = """i = 0;
+total = 0;
+wagtail(i < {size}) {{
+    value = dig numbers[i] * 3 + 1;
+    sniff(value > 1000) {{
+        total = total + value;
+    }}
+    i = i + 1;
+}}
+bark(total);
+"""
+
+WHOLE = """values = numbers * 3 + 1;
+bark(tally((values > 1000) * values));
+"""
+
+
+def best_time(program, numbers, repeat=5):
+    best = None
+    for _ in range(repeat):
+        output = StringIO()
+        start = time.perf_counter()
+        program.run(output=output, variables={"numbers": numbers})
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output.getvalue()
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    numbers = Pack(range(size))
+    backends = [name for name in vector.BACKENDS if name != "numpy" or vector.numpy is not None]
+    print(f"{'script':>8} {'engine':>6} {'backend':>8} {'ms':>9}")
+    for engine in ("tree", "py"):
+        elapsed, expected = best_time(compile(LOOP.format(size=size), engine, variables=["numbers"]), numbers, 1)
+        print(f"{'wagtail':>8} {engine:>6} {'':>8} {elapsed * 1000:9.1f}")
+        program = compile(WHOLE, engine, variables=["numbers"])
+        for name in backends:
+            previous = vector.use_backend(name)
+            try:
+                elapsed, output = best_time(program, numbers)
+            finally:
+                vector.use_backend(previous)
+            assert output == expected, (output, expected)
+            print(f"{'whole':>8} {engine:>6} {name:>8} {elapsed * 1000:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
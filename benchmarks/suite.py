@@ -0,0 +1,189 @@
+"""Benchmark every stage of the pipeline on generated workloads.
+
+Each workload from workloads.py is tokenized, parsed, optimized, analysed,
+prepared for the tree engine, compiled for the vm, transpiled for the py
+engine and then run on all three. Every stage is timed on its own (best of --repeat runs) and
+reported with its throughput:
+
+- tokens/s for the tokenizer and parser
+- statements/s, counted in the source, for the later front end stages
+- statements/s, counted as executed, for the engines
+
+Results can be saved as JSON and compared with an earlier run. Stages that
+got slower by more than --threshold percent are flagged, unless they take
+under a millisecond, and the exit status is 1 if there are any.
+
+    python benchmarks/suite.py --save before.json
+    ... change something ...
+    python benchmarks/suite.py --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from doglang import __version__
+from doglang.SemanticAnalyser import SemanticAnalyser
+from doglang.SyntaxAnalyser import STATEMENT_TYPES, SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer
+from doglang.compiler import VM, compile_program
+from doglang.executor import Executor, prepare
+from doglang.optimizer import optimize
+from doglang.profiler import ProfilingExecutor
+from doglang.runtime import UNSET, InputReader, OutputWriter
+from doglang.transpiler import fetcher, load, to_python
+from workloads import WORKLOADS
+
+# Stages faster than this are all timer noise and never flagged
+NOISE_FLOOR = 0.001
+
+
+def best_time(function, repeat, setup=None):
+    """Best wall clock time of function(setup()) over repeat runs."""
+    best = None
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def count_statements(node):
+    count = 0
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if node.type in STATEMENT_TYPES:
+            count += 1
+        pending.extend(node.children)
+    return count
+
+
+def executed_statements(steps, names):
+    """How many statements the tree engine executes, counted once outside the timings."""
+    executor = ProfilingExecutor([UNSET] * len(names), OutputWriter(StringIO()), InputReader([]))
+    executor.execute(steps)
+    return sum(node.hits for node, _ in executor.root.walk())
+
+
+def measure(code, repeat):
+    """Time every stage for one program, return {stage: result}."""
+    tokens = Tokenizer(code)
+    statements = count_statements(SyntaxAnalyser(tokens).parse())
+
+    def parsed(_=None):
+        return optimize(SyntaxAnalyser(Tokenizer(code)).parse())
+
+    def resolved(_=None):
+        ast = parsed()
+        return ast, SemanticAnalyser(ast).names
+
+    ast, names = resolved()
+    steps = prepare(ast)
+    bytecode = compile_program(ast, names)
+    function = load(to_python(ast, names))
+    executed = executed_statements(steps, names)
+
+    def run_tree(_):
+        Executor([UNSET] * len(names), OutputWriter(StringIO()), InputReader([])).execute(steps)
+
+    def run_vm(_):
+        VM(bytecode, StringIO(), []).run()
+
+    def run_py(_):
+        output, inputs = OutputWriter(StringIO()), InputReader([])
+        function([UNSET] * len(names), output.write, fetcher(inputs, output), None, None)
+        output.flush()
+
+    timings = {
+        "tokenize": (best_time(lambda _: Tokenizer(code), repeat), len(tokens), "tokens/s"),
+        "parse": (best_time(lambda _: SyntaxAnalyser(tokens).parse(), repeat), len(tokens), "tokens/s"),
+        "optimize": (best_time(optimize, repeat, lambda: SyntaxAnalyser(tokens).parse()), statements, "statements/s"),
+        "analyse": (best_time(SemanticAnalyser, repeat, parsed), statements, "statements/s"),
+        "prepare": (best_time(lambda pair: prepare(pair[0]), repeat, resolved), statements, "statements/s"),
+        "compile": (best_time(lambda pair: compile_program(*pair), repeat, resolved), statements, "statements/s"),
+        "transpile": (best_time(lambda pair: load(to_python(*pair)), repeat, resolved), statements, "statements/s"),
+        "run_tree": (best_time(run_tree, repeat), executed, "statements/s"),
+        "run_vm": (best_time(run_vm, repeat), executed, "statements/s"),
+        "run_py": (best_time(run_py, repeat), executed, "statements/s"),
+    }
+    return {stage: {"seconds": seconds, "throughput": count / seconds if seconds else None, "unit": unit}
+            for stage, (seconds, count, unit) in timings.items()}
+
+
+def run_suite(workloads, repeat, out=sys.stdout):
+    results = {}
+    for name in workloads:
+        code = WORKLOADS[name]()
+        results[name] = measure(code, repeat)
+        print(name, file=out)
+        for stage, result in results[name].items():
+            print(f"  {stage:<10} {result['seconds'] * 1000:10.2f} ms {result['throughput']:14,.0f} {result['unit']}",
+                  file=out)
+    return {
+        "doglang": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Print the change of every stage against baseline, return the regressions."""
+    regressions = []
+    for name, stages in current["results"].items():
+        old_stages = baseline["results"].get(name, {})
+        for stage, result in stages.items():
+            old = old_stages.get(stage)
+            if old is None:
+                continue
+            change = (result["seconds"] / old["seconds"] - 1) * 100
+            flag = ""
+            if change > threshold and max(result["seconds"], old["seconds"]) >= NOISE_FLOOR:
+                flag = "  REGRESSION"
+                regressions.append((name, stage, change))
+            print(f"{name:<14} {stage:<10} {old['seconds'] * 1000:10.2f} ms -> {result['seconds'] * 1000:10.2f} ms"
+                  f"  {change:+6.1f}%{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DogLang benchmark suite")
+    parser.add_argument("workloads", nargs="*", metavar="WORKLOAD",
+                        help=f"Workloads to run (default: all of {', '.join(WORKLOADS)})")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per stage, the best one counts (default: 5)")
+    parser.add_argument("--save", metavar="FILE", help="Write the results to FILE as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="Compare with results saved earlier")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent slowdown reported as a regression (default: 10)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.workloads if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workload {', '.join(unknown)}")
+
+    current = run_suite(args.workloads or list(WORKLOADS), args.repeat)
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(current, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        print()
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower by more than {args.threshold}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
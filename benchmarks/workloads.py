@@ -0,0 +1,65 @@
+"""Generated .doggy programs for the benchmark suite.
+
+Each workload stresses a different part of the pipeline:
+
+- straight_line: a long file of assignments, mostly tokenizer and parser work
+- nested_sniffs: sniff blocks nested as deep as the parser allows
+- fib_loop: examples/fib.doggy scaled up to a long wagtail loop
+- bark_heavy: a loop that barks on every pass
+"""
+
+
+def straight_line(statements=20000):
+    lines = ["x0 = 1;"]
+    for index in range(1, statements):
+        lines.append(f"x{index % 500} = x{(index - 1) % 500} * 3 + {index} % 7 - (x0 + 2);")
+    return "\n".join(lines) + "\n"
+
+
+def nested_sniffs(depth=120, passes=200):
+    """A wagtail whose body is depth nested sniff blocks."""
+    lines = ["i = 0;", "hits = 0;", f"wagtail(i < {passes}) {{"]
+    for level in range(depth):
+        lines.append("    " * (level + 1) + f"sniff(i + {level} >= 0) {{")
+    lines.append("    " * (depth + 1) + "hits = hits + 1;")
+    for level in reversed(range(depth)):
+        lines.append("    " * (level + 1) + "}")
+    lines.append("    i = i + 1;")
+    lines.append("}")
+    lines.append("bark(hits);")
+    return "\n".join(lines) + "\n"
+
+
+def fib_loop(iterations=100000):
+    # The modulus keeps the numbers small, so the loop is measured and not big integer additions
+    return f"""a = 0;
+b = 1;
+count = 0;
+wagtail(count < {iterations}) {{
+    temp = (a + b) % 1000000007;
+    a = b;
+    b = temp;
+    count = count + 1;
+}}
+bark(a);
+"""
+
+
+def bark_heavy(lines=100000):
+    return f"""i = 0;
+wagtail(i < {lines}) {{
+    bark(i);
+    sniff(i % 10 == 0) {{
+        bark("woof");
+    }}
+    i = i + 1;
+}}
+"""
+
+
+WORKLOADS = {
+    "straight_line": straight_line,
+    "nested_sniffs": nested_sniffs,
+    "fib_loop": fib_loop,
+    "bark_heavy": bark_heavy,
+}
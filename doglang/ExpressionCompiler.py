@@ -0,0 +1,195 @@
+"""Compiles DogLang expressions into Python closures.
+
+SyntaxAnalyser builds expression trees out of binary, comparison, logical,
+unary, grouping, pack, dig and call nodes.  Before a program runs, compile_expressions()
+turns each of them into nested closures once.  Evaluating an expression
+afterwards is just a call with the list of variable slots, there is no
+string building or eval() involved.
+
+The AST has to be resolved by SemanticAnalyser first, so every IDENTIFIER
+node knows its slot.
+"""
+import operator
+
+from doglang.SyntaxAnalyser import LITERAL_TYPES
+from doglang.SemanticAnalyser import undeclared
+from doglang.Tokenizer import Tokens
+from doglang.error import DogLangError
+from doglang.runtime import BUILTINS, UNSET, Pack, dig
+
+
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+}
+
+
+def compile_expressions(ast):
+    """Attach an evaluate closure to every expression node in the AST."""
+    if ast.type == "expression":
+        ast.evaluate = compile_node(ast.children[0])
+        return
+    for child in ast.children:
+        compile_expressions(child)
+
+
+def compile_node(node):
+    """Turn an expression tree into a callable taking the list of variable slots."""
+    kind = node.type
+    if kind in LITERAL_TYPES:
+        return _constant(node.value)
+    if kind == Tokens.IDENTIFIER:
+        return _variable(node.value, node.slot, node.maybe_unset)
+    if kind == "grouping":
+        return compile_node(node.children[0])
+    if kind == "unary":
+        return _unary(node.value, compile_node(node.children[0]))
+    if kind == "pack":
+        return _pack(node.children)
+    if kind == "dig":
+        return _dig(node.children[0], compile_node(node.children[1]))
+    if kind == "call":
+        return _call(BUILTINS[node.value], compile_node(node.children[0]))
+    if kind in ("binary", "comparison", "logical"):
+        if node.value not in ('&&', '||'):
+            direct = _direct_binary(node.value, _operand(node.children[0]), _operand(node.children[1]))
+            if direct is not None:
+                return direct
+        return _binary(node.value, compile_node(node.children[0]), compile_node(node.children[1]))
+    raise DogLangError(f"Cannot compile expression node '{kind}'")
+
+
+def _constant(value):
+    def evaluate(slots):
+        return value
+    return evaluate
+
+
+def _variable(name, slot, maybe_unset):
+    if not maybe_unset:
+        # SemanticAnalyser proved the variable is always assigned here
+        def evaluate(slots):
+            return slots[slot]
+        return evaluate
+
+    def evaluate(slots):
+        value = slots[slot]
+        if value is UNSET:
+            raise undeclared(name)
+        return value
+    return evaluate
+
+
+def _binary(op, left, right):
+    if op == '&&':
+        def evaluate(slots):
+            return bool(left(slots)) and bool(right(slots))
+        return evaluate
+    if op == '||':
+        def evaluate(slots):
+            return bool(left(slots)) or bool(right(slots))
+        return evaluate
+
+    function = BINARY_OPERATORS[op]
+
+    def evaluate(slots):
+        return function(left(slots), right(slots))
+    return evaluate
+
+
+def _operand(node):
+    """(slot, None) for a variable known to be assigned, (None, value) for a literal, else None."""
+    while node.type == "grouping":
+        node = node.children[0]
+    if node.type == Tokens.IDENTIFIER and not node.maybe_unset:
+        return node.slot, None
+    if node.type in LITERAL_TYPES:
+        return None, node.value
+    return None
+
+
+def _direct_binary(op, left, right):
+    """Closures for operators on plain variables and literals.
+
+    Loops are mostly made of expressions like count + 1 or a < b. Reading
+    the slots right here saves a closure call per operand, and the operator
+    still works on the native values as they are.
+    """
+    if left is None or right is None:
+        return None
+    function = BINARY_OPERATORS[op]
+    left_slot, left_value = left
+    right_slot, right_value = right
+    if left_slot is not None and right_slot is not None:
+        def evaluate(slots):
+            return function(slots[left_slot], slots[right_slot])
+    elif left_slot is not None:
+        def evaluate(slots):
+            return function(slots[left_slot], right_value)
+    elif right_slot is not None:
+        def evaluate(slots):
+            return function(left_value, slots[right_slot])
+    else:
+        # Left for the optimizer to fold, or it would raise here at compile time
+        return None
+    return evaluate
+
+
+def _pack(elements):
+    if all(element.type in LITERAL_TYPES for element in elements):
+        # Known when compiling, so the storage is picked once and each run copies it
+        template = Pack([element.value for element in elements])
+
+        def evaluate(slots):
+            return template.copy()
+        return evaluate
+
+    elements = [compile_node(element) for element in elements]
+
+    def evaluate(slots):
+        return Pack([element(slots) for element in elements])
+    return evaluate
+
+
+def _dig(target, index):
+    operand = _operand(target)
+    if operand is not None and operand[0] is not None:
+        slot = operand[0]
+
+        def evaluate(slots):
+            return dig(slots[slot], index(slots))
+        return evaluate
+
+    target = compile_node(target)
+
+    def evaluate(slots):
+        return dig(target(slots), index(slots))
+    return evaluate
+
+
+def _call(function, argument):
+    def evaluate(slots):
+        return function(argument(slots))
+    return evaluate
+
+
+def _unary(op, operand):
+    if op == '-':
+        def evaluate(slots):
+            return -operand(slots)
+    elif op == '+':
+        def evaluate(slots):
+            return +operand(slots)
+    else:
+        def evaluate(slots):
+            return not operand(slots)
+    return evaluate
@@ -1,64 +1,99 @@
-from doglang.SymbolTable import SymbolTable
-from doglang.SyntaxAnalyser import AST, SyntaxAnalyser
-from doglang.Tokenizer import Tokenizer
+from doglang.SyntaxAnalyser import AST
+from doglang.Tokenizer import Tokens
+from doglang.error import DogLangNameError
+
+
+def undeclared(name):
+    return DogLangNameError(f"Variable not declared: '{name}'")
+
 
 class SemanticAnalyser:
-    def __init__(self,ast:AST):
-        ## first check for declaration of variables
-        self.symbol_table = SymbolTable()
-        self.traverseAST("assignment", ast)
-      
-        
-    def traverseAST(self, target:str, node:AST):
-        if node is None:
+    """Resolves every variable to a fixed slot before the program runs.
+
+    Each assigned name gets a slot number, and every IDENTIFIER node is
+    annotated with it, so the engines keep variables in a flat list.
+
+    Reads are checked in program order. A read of a name that cannot have
+    been assigned by that point raises DogLangNameError here, before anything
+    executes. A read that may or may not follow an assignment, for example
+    one in a loop that is assigned later in the same loop, is marked
+    maybe_unset and checked at runtime.
+
+    predeclared names are variables the caller may set before the program
+    starts. They get the first slots and reads of them are checked at runtime.
+    """
+
+    def __init__(self,ast:AST,predeclared=()):
+        self.names = []      # slot -> name
+        self.slots = {}      # name -> slot
+        for name in predeclared:
+            self.slot(name)
+        self.statements(ast.children, set(predeclared), set())
+
+    def slot(self, name):
+        if name not in self.slots:
+            self.slots[name] = len(self.names)
+            self.names.append(name)
+        return self.slots[name]
+
+    # possible: names that may have been assigned at this point
+    # definite: names that have been assigned on every path to this point
+    def statements(self, nodes, possible, definite):
+        for node in nodes:
+            self.statement(node, possible, definite)
+
+    def statement(self, node:AST, possible, definite):
+        if node.type == "assignment":
+            target, value = node.children
+            self.expression(value, possible, definite)
+            target.slot = self.slot(target.value)
+            possible.add(target.value)
+            definite.add(target.value)
+
+        elif node.type == "print":
+            self.expression(node.children[0], possible, definite)
+
+        elif node.type == "bury":
+            # Burying changes the pack, not the variable, so the pack is read
+            for child in node.children:
+                self.expression(child, possible, definite)
+
+        elif node.type == "loop":
+            # Anything the body assigns may be set when a later iteration, or
+            # the condition after it, reads it
+            possible |= assigned_names(node.children[1:])
+            self.expression(node.children[0], possible, definite)
+            self.statements(node.children[1:], possible, set(definite))
+
+        elif node.type == "conditional":
+            self.expression(node.children[0], possible, definite)
+            then_definite = set(definite)
+            self.statements(node.children[1].children, possible, then_definite)
+            if len(node.children) > 2:
+                else_definite = set(definite)
+                self.statements(node.children[2].children[0].children, possible, else_definite)
+                # Only names assigned by both branches are certain afterwards
+                definite |= then_definite & else_definite
+
+        elif node.type == "block":
+            self.statements(node.children, possible, definite)
+
+    def expression(self, node:AST, possible, definite):
+        if node.type == Tokens.IDENTIFIER:
+            if node.value not in possible:
+                raise undeclared(node.value)
+            node.slot = self.slot(node.value)
+            node.maybe_unset = node.value not in definite
             return
-        if node.type == target:
-            self.check(node)
         for child in node.children:
-            self.traverseAST(target, child)
-        
-    def check(self, node:AST):
-        
-        # node is assignment
-        expression=""
-        expression_type=node.children[1]
-        for element in expression_type.children: ## children[0] is expression then accessing children of expression
-            if element.type == "INT_LITERAL" or element.type == "ARITHMETIC_OP":
-                expression += element.value
-            elif element.type == "IDENTIFIER":
-                if self.symbol_table.lookup(element.value) is None:
-                    raise Exception("Variable not declared")
-                else:
-                    expression += str(self.symbol_table.lookup(element.value).value)
-
-        result = eval(expression)
-        if self.symbol_table.lookup(node.children[0].value) is None:
-            self.symbol_table.insert(name=node.children[0].value,type="int",scope="local", value = result)
-        else:
-            self.symbol_table.modify(node.children[0].value,result)
-        # if node.type == "print":
-        #     if node.children[0].type == "IDENTIFIER":
-        #         st=SymbolTable()
-        #         if st.lookup(node.children[0].value) is None:
-        #             raise Exception("Variable not declared")
-
-
-# code = """  a=23+2
-#             wagtail(a<1){ 
-#                 bark(a)
-#                 a=a+10
-#             }
-#             """
-#     # code = """a=(10+2);
-#     #           y=22;
-#     #         """
-# tokens=Tokenizer(code)
-# # print(tokens)
-# parse=SyntaxAnalyser(tokens)
-# ast=parse.parse()
-# semantic = SemanticCheck(ast)
- 
-# print(ast)
-
-# st=SymbolTable()
-# print(st.lookup("a").value)
+            self.expression(child, possible, definite)
+
+
+def assigned_names(nodes):
+    """Names assigned anywhere in a list of statements."""
+    names = set()
+    for node in nodes:
+        if node.type == "assignment":
+            names.add(node.children[0].value)
+        names |= assigned_names(node.children)
+    return names
@@ -1,34 +1,88 @@
 """Symbol Table(name,type,scope,value)"""
+from doglang.error import DogLangError
+
+
+class Symbol:
+    """A single symbol table entry.
+
+    Uses __slots__ to keep entries small. Item access is kept so code written
+    against the old dict entries (entry['value']) still works.
+    """
+    __slots__ = ('name', 'type', 'scope', 'value')
+
+    def __init__(self, name, type, scope, value):
+        self.name = name
+        self.type = type
+        self.scope = scope
+        self.value = value
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __repr__(self):
+        return f"Symbol({self.name!r}, {self.type!r}, {self.scope!r}, {self.value!r})"
+
 
 class SymbolTable:
-    # __init__ creates an instance-specific list.
+    # __init__ creates an instance-specific index, so tables never share state.
     def __init__(self):
-        self.symbols=[]
+        # name -> the innermost visible Symbol, this is what lookup() hits
+        self._index = {}
+        # one dict per open scope: name -> the Symbol it shadows (None if it shadows nothing)
+        self._frames = [{}]
+
+    def push_scope(self):
+        self._frames.append({})
+
+    def pop_scope(self):
+        if len(self._frames) == 1:
+            raise DogLangError("Cannot pop the global scope")
+        frame = self._frames.pop()
+        for name, shadowed in frame.items():
+            if shadowed is None:
+                del self._index[name]
+            else:
+                self._index[name] = shadowed
+
+    @property
+    def depth(self):
+        return len(self._frames)
+
+    @property
+    def symbols(self):
+        return list(self._index.values())
 
     def insert(self,name,type,scope,value):
+        frame = self._frames[-1]
+        if name not in frame:
+            frame[name] = self._index.get(name)
+        self._index[name] = Symbol(name, type, scope, value)
 
-        symbol_entry = {'name': name, 'type': type, 'scope': scope, 'value': value}
-        self.symbols.append(symbol_entry)
-    
     def lookup(self,name):
-        for entry in self.symbols:
-            if entry['name']==name:
-                return entry     # Returns the dictionary
-        return None
-    
-    # modifies the instance list.
+        return self._index.get(name)
+
+    # modifies the innermost visible entry in place.
     def modify(self,name,value):
-        for entry in self.symbols:
-            if entry['name']==name:
-                entry['value'] = value
-                return
-        return None
-    
+        entry = self._index.get(name)
+        if entry is not None:
+            entry.value = value
+
+    def __len__(self):
+        return len(self._index)
+
     def __repr__(self):
-        if not self.symbols:
+        if not self._index:
             return "Symbol Table is empty"
 
         result=""
-        for entry in self.symbols:
-            result += f" name : {entry['name']} | value : {entry['value']} | type : {entry['type']} | scope : {entry['scope']}\n"
-        return result
\ No newline at end of file
+        for entry in self._index.values():
+            result += f" name : {entry.name} | value : {entry.value} | type : {entry.type} | scope : {entry.scope}\n"
+        return result
@@ -1,13 +1,43 @@
-from doglang.Tokenizer import Tokens
+from doglang.Tokenizer import Tokens, builtin_functions
 from doglang.SymbolTable import SymbolTable
 # Import the custom exception we created in error.py
 from doglang.error import DogLangSyntaxError
 
+# Binding power of the binary operators, higher binds tighter
+PRECEDENCE = {
+    '||': 1,
+    '&&': 2,
+    '==': 3, '!=': 3, '>': 3, '<': 3, '>=': 3, '<=': 3,
+    '+': 4, '-': 4,
+    '*': 5, '/': 5, '%': 5,
+}
+
+# AST node type for each kind of binary operator token
+BINARY_NODE_TYPES = {
+    Tokens.ARITHMETIC_OP: "binary",
+    Tokens.COMPARISON_OP: "comparison",
+    Tokens.LOGICAL_OP: "logical",
+}
+
+UNARY_OPERATORS = {'-', '+', '!'}
+
+# Leaf node types holding a value. LITERAL is for values computed by the optimizer.
+LITERAL_TYPES = (Tokens.INT_LITERAL, Tokens.STRING_LITERAL, Tokens.LITERAL)
+# Node types statement() produces
+STATEMENT_TYPES = ("assignment", "print", "bury", "loop", "conditional")
+
+
 class AST:
-    def __init__(self,type,value=None):
+    # line is the source line the node starts on, None for nodes made by the optimizer.
+    # evaluate is set on expression nodes by ExpressionCompiler,
+    # slot and maybe_unset on IDENTIFIER nodes by SemanticAnalyser
+    __slots__ = ('type', 'value', 'children', 'line', 'evaluate', 'slot', 'maybe_unset')
+
+    def __init__(self,type,value=None,line=None):
         self.type=type
         self.value=value
         self.children=[]
+        self.line=line
     
     def addchild(self,child):
         self.children.append(child)
@@ -30,9 +60,18 @@ class AST:
         return result
 
 class SyntaxAnalyser(SymbolTable):
-    def __init__(self,token) -> None:
+    """Recursive descent parser.
+
+    By default the first syntax error is raised. With recover=True every
+    error is collected in errors instead: the parser skips to the end of the
+    broken statement, at a ';' or a closing '}', and carries on, and parse()
+    returns the AST of the statements that did parse.
+    """
+    def __init__(self,token,recover=False) -> None:
         self.token=token
         self.current=0
+        self.recover=recover
+        self.errors=[]
     
     def current_element(self):
         if self.current < len(self.token):
@@ -48,13 +87,22 @@ class SyntaxAnalyser(SymbolTable):
             return self.token[self.current + 1]
         return None
     
+    def error(self,message,token=None):
+        """A DogLangSyntaxError located at token, or at the end of the input."""
+        if token is None:
+            if self.token:
+                last=self.token[-1]
+                return DogLangSyntaxError(message,last.line,last.column + len(last.value))
+            return DogLangSyntaxError(message)
+        return DogLangSyntaxError(message,token.line,token.column)
+
     def match(self,expected_type,expected_value=None):
         token=self.current_element()
         if not token:
-            raise DogLangSyntaxError(f"Unexpected end of input. Expected {expected_type}")
+            raise self.error(f"Unexpected end of input. Expected {expected_type}")
         if token.token_type != expected_type or (expected_value is not None and token.value != expected_value):
             # Use the new error class and include the line number
-            raise DogLangSyntaxError(f"Expected {expected_type} '{expected_value}' but got {token.token_type} '{token.value}' at line {token.line}")
+            raise self.error(f"Expected {expected_type} '{expected_value}' but got {token.token_type} '{token.value}' at line {token.line}",token)
         self.increment()
         return token
             
@@ -65,8 +113,53 @@ class SyntaxAnalyser(SymbolTable):
     def program(self):
         node=AST("Program")
         while self.current < len(self.token):
-            node.addchild(self.statement())
+            self.block_statement(node)
         return node
+
+    def block_statement(self,node):
+        """Parse one statement into node, in recovery mode skipping it if it is broken."""
+        if not self.recover:
+            node.addchild(self.statement())
+            return
+        start=self.current
+        try:
+            node.addchild(self.statement())
+        except DogLangSyntaxError as error:
+            self.errors.append(error)
+            self.synchronize(start)
+
+    def synchronize(self,start):
+        """Move past the broken statement that began at start.
+
+        It ends after a ';' or after the '}' closing a block it opened, an
+        else following that block belongs to it too. A '}' it did not open
+        closes the enclosing block, so it is left for that block to match.
+        """
+        tokens=self.token
+        depth=0
+        position=start
+        while position < len(tokens):
+            token=tokens[position]
+            if token.token_type == Tokens.CURLY_BRACE:
+                if token.value == '{':
+                    depth+=1
+                elif depth:
+                    depth-=1
+                    if not depth and position + 1 >= self.current:
+                        following=tokens[position + 1] if position + 1 < len(tokens) else None
+                        if following is None or following.value != 'else' or following.token_type != Tokens.KEYWORD:
+                            position+=1
+                            break
+                else:
+                    if position == start:
+                        # A stray '}' on its own
+                        position+=1
+                    break
+            elif token.token_type == Tokens.SEMICOLON and not depth and position >= self.current:
+                position+=1
+                break
+            position+=1
+        self.current=max(position,start + 1)
     
 
     def statement(self):
@@ -79,6 +172,8 @@ class SyntaxAnalyser(SymbolTable):
                 return self.loop_stmt()
             elif token.value=='sniff':
                 return self.conditional_statement()
+            elif token.value=='bury':
+                return self.bury_stmt()
         
         elif token.token_type == Tokens.IDENTIFIER:
             # Look ahead to see if the next token is an assignment operator
@@ -87,40 +182,60 @@ class SyntaxAnalyser(SymbolTable):
                 return self.assignment()
             else:
                 # If it's an identifier NOT followed by '=', it's an unknown keyword
-                raise DogLangSyntaxError(f"Syntax Error: Unknown keyword '{token.value}' at line {token.line}")
+                raise self.error(f"Syntax Error: Unknown keyword '{token.value}' at line {token.line}",token)
 
         # If we reach here, the token is not a valid start to a statement
-        raise DogLangSyntaxError(f"Unexpected token '{token.value}' at line {token.line}")
+        raise self.error(f"Unexpected token '{token.value}' at line {token.line}",token)
 
     def loop_stmt(self):
-        node=AST("loop")
+        node=AST("loop",line=self.current_element().line)
         self.match(Tokens.KEYWORD,'wagtail')
         node.addchild(self.expressions())
         self.match(Tokens.CURLY_BRACE,'{') 
-        while self.current_element().value != '}':
-            node.addchild(self.statement())
+        while self.current_element() is not None and self.current_element().value != '}':
+            self.block_statement(node)
         self.match(Tokens.CURLY_BRACE,'}')
         return node
     
     def assignment(self): 
-        node=AST("assignment")
-        id = self.current_element().value
-        node.addchild(AST(Tokens.IDENTIFIER,id))
+        token = self.current_element()
+        node=AST("assignment",line=token.line)
+        node.addchild(AST(Tokens.IDENTIFIER,token.value,token.line))
         self.match(Tokens.IDENTIFIER)
         self.match(Tokens.ASSIGNMENT_OP,'=')
-        node.addchild(self.expressions())
+        node.addchild(self.expressions(allow_fetch=True))
         return node
     
+    def bury_stmt(self):
+        # bury numbers[1] = 25; stores into a pack, bury numbers[] = 25; appends to it
+        token=self.current_element()
+        node=AST("bury",line=token.line)
+        self.match(Tokens.KEYWORD,'bury')
+        target=self.match(Tokens.IDENTIFIER)
+        node.addchild(AST(Tokens.IDENTIFIER,target.value,target.line))
+        following=self.peek()
+        if following and following.token_type == Tokens.SQUARE_BRACKET and following.value == ']':
+            node.value="append"
+            self.match(Tokens.SQUARE_BRACKET,'[')
+            self.match(Tokens.SQUARE_BRACKET,']')
+        else:
+            index=AST("expression",line=target.line)
+            index.addchild(self.index())
+            node.addchild(index)
+        self.match(Tokens.ASSIGNMENT_OP,'=')
+        node.addchild(self.expressions())
+        return node
+
     def code_block(self):
-        node=AST("block")
-        self.match(Tokens.CURLY_BRACE,'{') 
-        while self.current_element().value != '}':
-            node.addchild(self.statement())
+        brace=self.match(Tokens.CURLY_BRACE,'{')
+        node=AST("block",line=brace.line)
+        while self.current_element() is not None and self.current_element().value != '}':
+            self.block_statement(node)
         self.match(Tokens.CURLY_BRACE,'}')
         return node
     
     def conditional_statement(self):
-        node=AST("conditional")
+        node=AST("conditional",line=self.current_element().line)
         self.match(Tokens.KEYWORD)
         node.addchild(self.expressions())
         node.addchild(self.code_block())
@@ -129,36 +244,130 @@ class SyntaxAnalyser(SymbolTable):
         return node
 
     def else_statement(self):
-        node = AST(Tokens.KEYWORD,"else")
+        node = AST(Tokens.KEYWORD,"else",self.current_element().line)
         self.match(Tokens.KEYWORD)
         node.addchild(self.code_block())
         return node
 
-    def expressions(self):
+    def expressions(self,allow_fetch=False):
         token=self.current_element()
 
-        if token.token_type == Tokens.KEYWORD:
+        if token and token.token_type == Tokens.KEYWORD:
             if token.value == "fetch":
+                if not allow_fetch:
+                    # Only an assignment has somewhere to put what fetch reads
+                    raise self.error(f"fetch can only be assigned to a variable at line {token.line}",token)
                 self.match(Tokens.KEYWORD,'fetch')
-                node = AST(Tokens.KEYWORD,"input")
+                node = AST(Tokens.KEYWORD,"input",token.line)
                 node.addchild(self.expressions())
                 return node 
 
-        node=AST("expression")
-        while self.current_element() and self.current_element().value != ';':
-            if self.current_element().token_type == Tokens.CURLY_BRACE: 
-                return node
-            node.addchild(AST(self.current_element().token_type,self.current_element().value))
-            self.increment()
-        
+        node=AST("expression",line=token.line if token else None)
+        node.addchild(self.binary_expression(1))
+
+        token=self.current_element()
         # Consume the semicolon if it exists
-        if self.current_element() and self.current_element().value == ';':
+        if token and token.token_type == Tokens.SEMICOLON:
             self.increment()
-        
+        elif token and token.token_type != Tokens.CURLY_BRACE:
+            raise self.error(f"Unexpected token '{token.value}' in expression at line {token.line}",token)
+        return node
+
+    # Expressions are parsed by precedence climbing in one left to right pass:
+    # binary_expression keeps folding operators into the left operand for as
+    # long as they bind at least as tightly as min_precedence.
+    def binary_expression(self,min_precedence):
+        left=self.unary_expression()
+        while True:
+            token=self.current_element()
+            if token is None:
+                return left
+            node_type=BINARY_NODE_TYPES.get(token.token_type)
+            if node_type is None:
+                return left
+            precedence=PRECEDENCE.get(token.value)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.increment()
+            node=AST(node_type,token.value,token.line)
+            node.addchild(left)
+            node.addchild(self.binary_expression(precedence + 1))
+            left=node
+
+    def unary_expression(self):
+        token=self.current_element()
+        if token and token.value in UNARY_OPERATORS and token.token_type in BINARY_NODE_TYPES:
+            self.increment()
+            node=AST("unary",token.value,token.line)
+            node.addchild(self.unary_expression())
+            return node
+        return self.primary_expression()
+
+    def primary_expression(self):
+        token=self.current_element()
+        if not token:
+            raise self.error("Unexpected end of input. Expected an expression")
+
+        if token.token_type == Tokens.INT_LITERAL:
+            self.increment()
+            return AST(Tokens.INT_LITERAL,int(token.value),token.line)
+        if token.token_type == Tokens.STRING_LITERAL:
+            self.increment()
+            return AST(Tokens.STRING_LITERAL,token.value,token.line)
+        if token.token_type == Tokens.IDENTIFIER:
+            self.increment()
+            return AST(Tokens.IDENTIFIER,token.value,token.line)
+        if token.token_type == Tokens.KEYWORD and token.value == 'pack':
+            return self.pack_expression()
+        if token.token_type == Tokens.KEYWORD and token.value in builtin_functions:
+            # tally(numbers), the argument is any expression
+            self.increment()
+            node=AST("call",token.value,token.line)
+            self.match(Tokens.PARENTHESIS,'(')
+            node.addchild(self.binary_expression(1))
+            self.match(Tokens.PARENTHESIS,')')
+            return node
+        if token.token_type == Tokens.KEYWORD and token.value == 'dig':
+            self.increment()
+            node=AST("dig",line=token.line)
+            node.addchild(self.primary_expression())
+            node.addchild(self.index())
+            return node
+        if token.token_type == Tokens.PARENTHESIS and token.value == '(':
+            self.increment()
+            node=AST("grouping",line=token.line)
+            node.addchild(self.binary_expression(1))
+            self.match(Tokens.PARENTHESIS,')')
+            return node
+
+        raise self.error(f"Unexpected token '{token.value}' in expression at line {token.line}",token)
+
+    def pack_expression(self):
+        # pack[10, 20, 30], the elements are any expressions
+        node=AST("pack",line=self.current_element().line)
+        self.match(Tokens.KEYWORD,'pack')
+        self.match(Tokens.SQUARE_BRACKET,'[')
+        token=self.current_element()
+        if token and token.token_type == Tokens.SQUARE_BRACKET and token.value == ']':
+            self.increment()
+            return node
+        node.addchild(self.binary_expression(1))
+        while self.current_element() and self.current_element().token_type == Tokens.SEPARATOR \
+                and self.current_element().value == ',':
+            self.increment()
+            node.addchild(self.binary_expression(1))
+        self.match(Tokens.SQUARE_BRACKET,']')
+        return node
+
+    def index(self):
+        """The expression between the brackets of numbers[...]"""
+        self.match(Tokens.SQUARE_BRACKET,'[')
+        node=self.binary_expression(1)
+        self.match(Tokens.SQUARE_BRACKET,']')
         return node
 
     def print_stmt(self):
-        node=AST("print")
+        node=AST("print",line=self.current_element().line)
         self.match(Tokens.KEYWORD,'bark') #bark keyword
         node.addchild(self.expressions())
         return node
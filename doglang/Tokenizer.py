@@ -1,39 +1,56 @@
 import re
+import sys
+from enum import IntEnum
 from .error import DogLangSyntaxError 
 
 
 class Token:
+    # No per-instance __dict__, large programs produce millions of these
+    __slots__ = ('token_type', 'value', 'line', 'column')
    
-    def __init__(self, token_type, value, line):
+    def __init__(self, token_type, value, line, column=None):
         self.token_type = token_type
         self.value = value
         self.line = line
+        self.column = column
 
     def __repr__(self):
        
         return f"\nToken({self.token_type}, '{self.value}', line={self.line})"
 
 
-class Tokens:
-    KEYWORD = 'KEYWORD'
-    IDENTIFIER = 'IDENTIFIER'
-    ASSIGNMENT_OP = 'ASSIGNMENT_OP'
-    LITERAL = 'LITERAL'
+class Tokens(IntEnum):
+    """Token types. Small ints, so the parser compares integers rather than strings."""
+    KEYWORD = 1
+    IDENTIFIER = 2
+    ASSIGNMENT_OP = 3
+    LITERAL = 4
     #LITERALS
-    INT_LITERAL= 'INT_LITERAL'
-    STRING_LITERAL='STRING_LITERAL'
+    INT_LITERAL = 5
+    STRING_LITERAL = 6
 
-    ARITHMETIC_OP = 'ARITHMETIC_OP'
-    COMPARISON_OP = 'COMPARISON_OP'
-    LOGICAL_OP = 'LOGICAL_OP'
-    SEPARATOR = 'SEPARATOR'
-    PARENTHESIS = 'PARENTHESIS'
-    CURLY_BRACE = 'CURLY_BRACE'
-    SEMICOLON = 'SEMICOLON'
-    COMMENT = 'COMMENT'
+    ARITHMETIC_OP = 7
+    COMPARISON_OP = 8
+    LOGICAL_OP = 9
+    SEPARATOR = 10
+    PARENTHESIS = 11
+    CURLY_BRACE = 12
+    SEMICOLON = 13
+    COMMENT = 14
+    SQUARE_BRACKET = 15
 
+    # Print as the name, error messages and AST dumps read better that way
+    def __str__(self):
+        return self.name
 
-keywords = {'bark','wagtail','fetch','sniff','else'}
+    def __format__(self, format_spec):
+        return format(self.name, format_spec)
+
+
+# Built-in functions, called like tally(numbers)
+builtin_functions = {'tally','runt','topdog'}
+
+keywords = {'bark','wagtail','fetch','sniff','else','pack','dig','bury'} | builtin_functions
 
 
 arithmetic_operators = {'+', '-', '*', '/', '%'}
@@ -41,47 +58,90 @@ comparison_operators = {'==', '!=', '>', '<', '>=', '<='}
 logical_operators = {'&&', '||', '!'}
 parentheses = {'(', ')'}
 curly_braces = {'{', '}'}
+square_brackets = {'[', ']'}
 separators = {',', '.'}
 semicolon = ';'
 
-# Tokenizer function
-def Tokenizer(code):
+def _alternatives(words):
+    # Longest first so '==' wins over '='
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+# One master pattern, the group that matched gives the token type.
+# Leading whitespace is swallowed by every match, and the STRING_LITERAL group
+# sits inside the quotes so its text is already the literal's value.
+TOKEN_PATTERN = re.compile(r'\s*(?:' + '|'.join([
+    r'"(?P<STRING_LITERAL>(?:\\.|[^"\\])*)"',
+    rf'(?P<KEYWORD>(?:{_alternatives(keywords)})\b)',
+    r'(?P<IDENTIFIER>[A-Za-z_]\w*)',
+    r'(?P<INT_LITERAL>\d+)',
+    rf'(?P<COMPARISON_OP>{_alternatives(comparison_operators)})',
+    rf'(?P<LOGICAL_OP>{_alternatives(logical_operators)})',
+    r'(?P<ASSIGNMENT_OP>=)',
+    rf'(?P<ARITHMETIC_OP>{_alternatives(arithmetic_operators)})',
+    rf'(?P<PARENTHESIS>{_alternatives(parentheses)})',
+    rf'(?P<CURLY_BRACE>{_alternatives(curly_braces)})',
+    rf'(?P<SQUARE_BRACKET>{_alternatives(square_brackets)})',
+    rf'(?P<SEMICOLON>{re.escape(semicolon)})',
+    rf'(?P<SEPARATOR>{_alternatives(separators)})',
+]) + ')')
+
+
+# Token type for each group number of TOKEN_PATTERN
+_GROUP_TYPES = [None] * (TOKEN_PATTERN.groups + 1)
+for _name, _index in TOKEN_PATTERN.groupindex.items():
+    _GROUP_TYPES[_index] = Tokens[_name]
+_STRING_GROUP = TOKEN_PATTERN.groupindex['STRING_LITERAL']
+
+
+def tokenize_line(line, line_number, errors=None):
+    """Tokenize a single line of source code.
+
+    Unrecognized characters raise DogLangSyntaxError, or when an errors list
+    is given they are appended to it and skipped.
+    """
     tokens = []
+    append = tokens.append
+    end = 0
+    # scanner().match only matches at the current position, so the matches
+    # are contiguous and stop at the first character no token can start with
+    intern = sys.intern
+    while True:
+        match = None
+        for match in iter(TOKEN_PATTERN.scanner(line, end).match, None):
+            index = match.lastindex
+            # A string's column is its opening quote, one before its group
+            column = match.start(index) + (index != _STRING_GROUP)
+            # Interned so every occurrence of a name or operator shares one string
+            append(Token(_GROUP_TYPES[index], intern(match[index]), line_number, column))
+        if match is not None:
+            end = match.end()
+        if end >= len(line) or line[end:].isspace():
+            return tokens
+        column = len(line) - len(line[end:].lstrip()) + 1
+        # Raise a syntax error for unrecognized characters instead of dropping them
+        error = DogLangSyntaxError(f"Unrecognized token '{line[column - 1]}' at line {line_number}, column {column}",
+                                   line_number, column)
+        if errors is None:
+            raise error
+        errors.append(error)
+        end = column
 
-    # Process the code line by line to get the line number
-    for line_number, line in enumerate(code.splitlines(), 1):
-        pattern = r'"(?:\\.|[^"\\])*"|[A-Za-z_]\w*|\d+|==|!=|>=|<=|&&|\|\||[+\-*/%]=?|[(){};,]|[<>]|='
-        tokenized_line = re.findall(pattern, line)
-
-        for word in tokenized_line:
-            # Pass the 'line_number' to every new Token instance
-            if word.startswith('"') and word.endswith('"'):
-                tokens.append(Token(Tokens.STRING_LITERAL, word[1:-1], line_number))
-            elif word in keywords:
-                tokens.append(Token(Tokens.KEYWORD, word, line_number))
-            elif word.isidentifier():
-                tokens.append(Token(Tokens.IDENTIFIER, word, line_number))
-            elif word == '=':
-                tokens.append(Token(Tokens.ASSIGNMENT_OP, word, line_number))
-            elif word.isdigit():
-                tokens.append(Token(Tokens.INT_LITERAL, word, line_number))
-            elif word in arithmetic_operators:
-                tokens.append(Token(Tokens.ARITHMETIC_OP, word, line_number))
-            elif word in comparison_operators:
-                tokens.append(Token(Tokens.COMPARISON_OP, word, line_number))
-            elif word in logical_operators:
-                tokens.append(Token(Tokens.LOGICAL_OP, word, line_number))
-            elif word in parentheses:
-                tokens.append(Token(Tokens.PARENTHESIS, word, line_number))
-            elif word in curly_braces:
-                tokens.append(Token(Tokens.CURLY_BRACE, word, line_number))
-            elif word in separators:
-                tokens.append(Token(Tokens.SEPARATOR, word, line_number))
-            elif word == semicolon:
-                tokens.append(Token(Tokens.SEMICOLON, word, line_number))
-            else:
-                # Raise a syntax error for unrecognized tokens
-                raise DogLangSyntaxError(f"Unrecognized token '{word}' at line {line_number}")
 
-    return tokens
+def iter_tokens(source):
+    """Yield tokens one at a time.
+
+    source is either a string or any iterable of lines, such as an open file,
+    so large programs can be tokenized without reading them into memory first.
+    """
+    lines = source.splitlines() if isinstance(source, str) else source
+    for line_number, line in enumerate(lines, 1):
+        yield from tokenize_line(line, line_number)
+
 
+# Tokenizer function
+def Tokenizer(code, errors=None):
+    tokens = []
+    for line_number, line in enumerate(code.splitlines(), 1):
+        tokens += tokenize_line(line, line_number, errors)
+    return tokens
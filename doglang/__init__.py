@@ -1,5 +1,6 @@
 from doglang.main import Interpreter
+from doglang.program import Program, check, compile
 from doglang.error import DogLangError
 
 __version__ = "1.0.0-alpha"
-__all__ = ["Interpreter", "Error"]
+__all__ = ["Interpreter", "Program", "check", "compile", "Error"]
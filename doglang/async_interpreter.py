@@ -0,0 +1,144 @@
+"""Run DogLang inside an asyncio event loop.
+
+AsyncInterpreter runs the tree engine's Steps like Executor does, except
+that fetch and bark await their channels and control goes back to the event
+loop every yield_every statements. Many scripts can then share one loop
+without a long wagtail starving the others. Cancelling the task that awaits
+run() stops the script at its next await, with output written so far
+flushed.
+
+Channels:
+
+- inputs is an object with an async read(prompt) method, an async iterable
+  of lines, or anything InputReader accepts. Standard input, the default,
+  is read in a worker thread so a waiting fetch does not block the loop.
+- output is an object with an async write(value) method, or anything
+  OutputWriter accepts.
+"""
+import asyncio
+import inspect
+
+from doglang.error import DogLangError
+from doglang.executor import Executor
+from doglang.program import Program, compile
+from doglang.runtime import coerce_input, input_reader, output_writer
+
+
+class AsyncInput:
+    """Adapts an input channel to an async read(prompt)."""
+
+    def __init__(self, inputs=None):
+        self.interactive = False
+        read = getattr(inputs, "read", None)
+        if read is not None and inspect.iscoroutinefunction(read):
+            self.read = read
+        elif hasattr(inputs, "__aiter__"):
+            self._lines = inputs.__aiter__()
+            self.read = self._read_line
+        else:
+            self._reader = input_reader(inputs)
+            self.interactive = self._reader.interactive
+            self.read = self._read_thread if inputs is None or self.interactive else self._read_sync
+
+    async def _read_line(self, prompt):
+        try:
+            line = await self._lines.__anext__()
+        except StopAsyncIteration:
+            raise DogLangError("fetch found no more input") from None
+        return line.rstrip("\r\n")
+
+    async def _read_sync(self, prompt):
+        return self._reader.read(prompt)
+
+    async def _read_thread(self, prompt):
+        # input() and sys.stdin block until a line comes, the loop keeps running meanwhile
+        return await asyncio.get_running_loop().run_in_executor(None, self._reader.read, prompt)
+
+
+class AsyncOutput:
+    """Adapts an output channel to an async write(value) and flush()."""
+
+    def __init__(self, output=None):
+        write = getattr(output, "write", None)
+        if write is not None and inspect.iscoroutinefunction(write):
+            self.write = write
+            self._writer = None
+            flush = getattr(output, "flush", None)
+            self._flush = flush if flush is not None and inspect.iscoroutinefunction(flush) else None
+        else:
+            self._writer = output_writer(output)
+            self.write = self._write_sync
+            self._flush = None
+
+    async def _write_sync(self, value):
+        self._writer.write(value)
+
+    async def flush(self):
+        if self._flush is not None:
+            await self._flush()
+        elif self._writer is not None:
+            self._writer.flush()
+
+
+class AsyncInterpreter(Executor):
+    """Runs a program as a coroutine.
+
+    code is DogLang source or a Program compiled for the tree engine, which
+    many AsyncInterpreters may share. variables gives starting values as for
+    Program.run.
+    """
+
+    def __init__(self, code, inputs=None, output=None, variables=None, yield_every=1000):
+        if isinstance(code, Program):
+            if code.engine != "tree":
+                raise DogLangError("AsyncInterpreter runs programs compiled for the tree engine")
+            self.program = code
+        else:
+            self.program = compile(code)
+        if yield_every < 1:
+            raise DogLangError("yield_every must be at least 1")
+        self.yield_every = yield_every
+        self.variables = None
+        super().__init__(self.program.initial_slots(variables), AsyncOutput(output), AsyncInput(inputs))
+        # Yields are counted in statements, which includes passes of an empty wagtail
+        self.count_statements()
+
+    async def run(self):
+        """Run the program and return its variables by name."""
+        try:
+            await self.execute_async(self.program.steps)
+        finally:
+            await self.output.flush()
+        self.variables = self.program.assigned(self.slots)
+        return self.variables
+
+    async def execute_async(self, statements):
+        """Executor.execute with awaited fetch and bark and a yield every few statements."""
+        handlers = self.handlers
+        slots = self.slots
+        yield_every = self.yield_every
+        countdown = yield_every
+        stack = [iter(statements)]
+        while stack:
+            for step in stack[-1]:
+                countdown -= 1
+                if not countdown:
+                    countdown = yield_every
+                    # Let other tasks run, this is also where cancellation lands
+                    await asyncio.sleep(0)
+                kind = step.type
+                if kind == "print":
+                    await self.output.write(step.evaluate(slots))
+                elif kind == "input":
+                    prompt = step.evaluate(slots)
+                    if self.inputs.interactive:
+                        # The prompt has to appear after everything barked so far
+                        await self.output.flush()
+                    slots[step.slot] = coerce_input(await self.inputs.read(prompt))
+                else:
+                    block = handlers[kind](step)
+                    if block is not None:
+                        stack.append(iter(block))
+                        break
+            else:
+                stack.pop()
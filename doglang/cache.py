@@ -0,0 +1,134 @@
+"""On-disk cache of compiled DogLang programs.
+
+Works like __pycache__: what the front end made of a script is stored in
+a __dogcache__ directory next to it, one entry per script and engine. The
+vm's entry holds the Bytecode, the tree and py engines' the resolved AST
+they start from. Entries are named after the script and a hash of its
+absolute path, so scripts with the same name never share one, even in a
+shared cache directory.
+
+An entry starts with a hash of the source, the DogLang version and the
+bytecode format. A later run of the same unchanged source loads the entry
+and skips the tokenizer, parser and semantic analysis, and for the vm the
+compiler too; after an edit the entry no longer matches and is
+overwritten.
+
+Entries are written with marshal, which is fast and only ever produces
+plain data (ints, strings, tuples), never executable objects.
+"""
+import hashlib
+import marshal
+import os
+import sys
+
+from doglang import __version__
+from doglang.SemanticAnalyser import SemanticAnalyser
+from doglang.SyntaxAnalyser import AST, SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer, Tokens
+from doglang.compiler import BYTECODE_VERSION, Bytecode, compile_program
+from doglang.optimizer import optimize
+from doglang.program import Program, from_ast
+
+CACHE_DIR_NAME = "__dogcache__"
+CACHE_SUFFIX = ".dogc"
+MAGIC = b"DOGC"
+
+
+def default_cache_dir(source_path):
+    """The __dogcache__ directory next to a script."""
+    return os.path.join(os.path.dirname(os.path.abspath(source_path)), CACHE_DIR_NAME)
+
+
+def source_key(code):
+    """Hash identifying a source text compiled by this DogLang version."""
+    digest = hashlib.sha256()
+    # marshal output differs between Python versions, so the interpreter is part of the key
+    header = f"{__version__}:{BYTECODE_VERSION}:{sys.implementation.cache_tag}:"
+    digest.update(header.encode())
+    digest.update(code.encode())
+    return digest.hexdigest()[:32]
+
+
+def cache_path(cache_dir, source_path, engine="vm"):
+    """The entry for the script at source_path run on engine."""
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    place = hashlib.sha256(os.path.abspath(source_path).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{name}.{place}.{engine}{CACHE_SUFFIX}")
+
+
+def read_cache(path, key):
+    """The data stored in a cache entry, None if it is missing, unreadable or for another source than key."""
+    try:
+        with open(path, 'rb') as file:
+            data = file.read()
+    except OSError:
+        return None
+    header = MAGIC + key.encode()
+    if not data.startswith(header):
+        return None
+    try:
+        return marshal.loads(data[len(header):])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def write_cache(path, key, value):
+    """Store value for the source with key, silently giving up if the directory is not writable."""
+    data = MAGIC + key.encode() + marshal.dumps(value)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary, 'wb') as file:
+            file.write(data)
+        # Replace in one step so a concurrent reader never sees half a file
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def dump_ast(node):
+    """A resolved AST as nested tuples marshal can store."""
+    kind = int(node.type) if isinstance(node.type, Tokens) else node.type
+    return (kind, node.value, node.line, getattr(node, 'slot', None), getattr(node, 'maybe_unset', None),
+            tuple(dump_ast(child) for child in node.children))
+
+
+def load_ast(data):
+    """The AST dump_ast() was given back."""
+    kind, value, line, slot, maybe_unset, children = data
+    node = AST(Tokens(kind) if type(kind) is int else kind, value, line)
+    if slot is not None:
+        node.slot = slot
+        node.maybe_unset = maybe_unset
+    node.children = [load_ast(child) for child in children]
+    return node
+
+
+def load_program(code, source_path, engine="vm", cache_dir=None):
+    """The Program for the script at source_path, from its cache entry or compiled and cached on a miss.
+
+    cache_dir defaults to the __dogcache__ directory next to the script.
+    """
+    path = cache_path(cache_dir or default_cache_dir(source_path), source_path, engine)
+    key = source_key(code)
+    data = read_cache(path, key)
+    try:
+        if data is not None and engine == "vm":
+            code_, constants, names, starts = data
+            return Program(names, engine, bytecode=Bytecode(code_, constants, names, starts), source=code)
+        if data is not None:
+            ast, names = data
+            return from_ast(load_ast(ast), names, engine, code)
+    except (TypeError, ValueError):
+        pass
+    ast = optimize(SyntaxAnalyser(Tokenizer(code)).parse())
+    names = SemanticAnalyser(ast).names
+    if engine == "vm":
+        bytecode = compile_program(ast, names)
+        write_cache(path, key, (bytecode.code, bytecode.constants, bytecode.names, bytecode.starts))
+        return Program(names, engine, bytecode=bytecode, source=code)
+    write_cache(path, key, (dump_ast(ast), names))
+    return from_ast(ast, names, engine, code)
@@ -1,18 +1,89 @@
+import re
 import sys
 import argparse
 from doglang.main import Interpreter
 from doglang.Tokenizer import Tokenizer
+from doglang.cache import load_program
+from doglang.optimizer import optimize
+from doglang.profiler import profile
+from doglang.program import ENGINES, check, compile
+from doglang.runtime import InputReader, Limits, OutputWriter
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.transpiler import python_source
 
 #!/usr/bin/env python3
 
+# The "at line N" messages end with, --check puts the position up front instead
+_LOCATION = re.compile(r" at line \d+(?:, column \d+)?$")
+
+
+def check_files(paths):
+    """Print every syntax error in paths as file:line:column: message, return the exit status."""
+    failed = 0
+    count = 0
+    for path in paths:
+        try:
+            with open(path, 'r') as file:
+                code = file.read()
+        except OSError as e:
+            print(f"{path}: Error reading file: {e}")
+            failed += 1
+            continue
+        _, errors = check(code)
+        for error in errors:
+            message = _LOCATION.sub("", str(error))
+            print(f"{path}:{error.line or 0}:{error.column or 0}: {message}")
+        count += len(errors)
+        failed += bool(errors)
+    if failed:
+        print(f"{count} syntax error(s) in {failed} of {len(paths)} file(s)", file=sys.stderr)
+        return 1
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description='DogLang Interpreter')
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('-e', '--execute', metavar='CODE', help='Execute DogLang code directly')
     group.add_argument('-f', '--file', metavar='FILE', help='Execute DogLang code from file')
+    group.add_argument('--check', metavar='FILE', nargs='+',
+                       help='Report every syntax error in the files without executing anything')
     parser.add_argument('--tokens', action='store_true', help='Print tokens instead of executing')
+    parser.add_argument('--dump-optimized', action='store_true',
+                        help='Print the AST after constant folding and dead branch removal instead of executing')
+    parser.add_argument('--engine', choices=ENGINES, default='tree',
+                        help='Execution engine: tree walking interpreter, bytecode VM or transpiled Python (default: tree)')
+    parser.add_argument('--dump-python', action='store_true',
+                        help='Print the Python code the py engine generates instead of executing')
+    parser.add_argument('--line-buffered', action='store_true',
+                        help='Write every bark line immediately (default when stdout is a terminal)')
+    parser.add_argument('--input', metavar='FILE',
+                        help='Read fetch input from FILE, one value per line, without prompts ("-" for stdin)')
+    parser.add_argument('--max-steps', type=int, metavar='N',
+                        help='Stop with an error after N statements')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='Stop with an error after SECONDS of running')
+    parser.add_argument('--max-output', type=int, metavar='CHARS',
+                        help='Stop with an error once more than CHARS characters are barked')
+    parser.add_argument('--max-memory', type=int, metavar='BYTES',
+                        help='Stop with an error once variables hold more than BYTES')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print per-line hit counts and times to stderr after running (tree engine)')
+    parser.add_argument('--profile-json', metavar='FILE',
+                        help='Profile and write the per-line results to FILE as JSON')
+    parser.add_argument('--profile-collapsed', metavar='FILE',
+                        help='Profile and write collapsed stacks for flamegraph tools to FILE')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the compiled program cache')
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help='Where to keep compiled programs (default: __dogcache__ next to the file)')
     
     args = parser.parse_args()
+    if args.check:
+        sys.exit(check_files(args.check))
+    profiling = args.profile or args.profile_json or args.profile_collapsed
+    if profiling and any(limit is not None for limit in (args.max_steps, args.timeout, args.max_output, args.max_memory)):
+        parser.error("profiling cannot be combined with limits")
     
     if args.execute:
         code = args.execute
@@ -27,17 +98,56 @@ def main():
             print(f"Error reading file: {e}")
             sys.exit(1)
     
+    # Block buffering is much faster when output goes to a pipe or file
+    output = OutputWriter(sys.stdout, line_buffering=args.line_buffered or sys.stdout.isatty())
+    input_file = None
+    if args.input == '-':
+        inputs = InputReader(prompts=False)
+    elif args.input:
+        try:
+            input_file = open(args.input, 'r')
+        except OSError as e:
+            print(f"Error reading input file: {e}")
+            sys.exit(1)
+        inputs = InputReader(input_file)
+    else:
+        inputs = InputReader()
+    limits = None
+    if any(limit is not None for limit in (args.max_steps, args.timeout, args.max_output, args.max_memory)):
+        limits = Limits(args.max_steps, args.timeout, args.max_output, args.max_memory)
     try:
         if args.tokens:
             tokens = Tokenizer(code)
             print("Tokens:")
             for token in tokens:
                 print(token)
+        elif args.dump_optimized:
+            print(optimize(SyntaxAnalyser(Tokenizer(code)).parse()))
+        elif args.dump_python:
+            program = compile(code, "py")
+            print(python_source(program.ast, program.names), end="")
+        elif profiling:
+            report = profile(compile(code), inputs, output)
+            if args.profile:
+                print(report.report(), file=sys.stderr)
+            if args.profile_json:
+                with open(args.profile_json, 'w') as file:
+                    file.write(report.to_json())
+            if args.profile_collapsed:
+                with open(args.profile_collapsed, 'w') as file:
+                    file.write(report.collapsed())
+        elif args.file and not args.no_cache:
+            # The cache skips tokenizing, parsing and analysing unchanged scripts; -e code is never cached
+            program = load_program(code, args.file, args.engine, args.cache_dir)
+            program.run(inputs=inputs, output=output, limits=limits)
         else:
-            Interpreter(code)
+            Interpreter(code, engine=args.engine, output=output, inputs=inputs, limits=limits)
     except Exception as e:
         print(f"Execution error: {e}")
         sys.exit(1)
+    finally:
+        if input_file is not None:
+            input_file.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,625 @@
+"""Bytecode compiler and stack based virtual machine for DogLang.
+
+compile_program() lowers the Program AST produced by SyntaxAnalyser.parse()
+into a flat list of (opcode, argument) pairs.  Every variable has a fixed
+slot number from SemanticAnalyser, so the VM keeps variables in a plain
+list instead of looking names up while it runs.
+
+Arguments in Bytecode are plain ints (or tuples of ints) so compiled
+programs can be serialized.  When a VM is created it links the code,
+replacing constant and operator indexes with the objects themselves.
+
+    bytecode = compile_program(SyntaxAnalyser(Tokenizer(code)).parse())
+    VM(bytecode).run()
+"""
+import operator
+import sys
+
+from doglang.SyntaxAnalyser import LITERAL_TYPES
+from doglang.Tokenizer import Tokens
+from doglang.error import DogLangError
+from doglang.SemanticAnalyser import SemanticAnalyser, undeclared
+from doglang.runtime import BUILTINS, UNSET, Budget, Pack, append, bury, coerce_input, dig, input_reader, output_writer
+
+
+# Bump whenever opcodes or their arguments change, it invalidates cached bytecode
+BYTECODE_VERSION = 4
+
+# Opcodes. Every instruction in Bytecode.code is an (opcode, argument) pair.
+LOAD_CONST = 0          # push constants[arg]
+LOAD_SLOT = 1           # push slots[arg]
+STORE_SLOT = 2          # pop into slots[arg]
+BINARY_OP = 3           # pop right, pop left, push BINARY_FUNCTIONS[arg](left, right)
+COMPARE_OP = 4          # pop right, pop left, push COMPARE_FUNCTIONS[arg](left, right)
+UNARY_OP = 5            # replace top with UNARY_FUNCTIONS[arg](top)
+JUMP = 6                # jump to arg
+JUMP_IF_FALSE = 7       # pop, jump to arg if falsy
+JUMP_IF_TRUE = 8        # pop, jump to arg if truthy
+SNIFF_IF_FALSE = 9      # pop a bool, jump to arg if False, error if it is not a bool
+JUMP_IF_FALSE_OR_POP = 10  # short circuit for &&
+JUMP_IF_TRUE_OR_POP = 11   # short circuit for ||
+PRINT = 12              # pop and print
+INPUT = 13              # pop prompt, push the value read
+
+# Superinstructions for the common "variable op constant" and
+# "variable op variable" shapes.  Operator indexes point into OPERATORS.
+OPERATE_SLOT_CONST = 14     # arg (operator, slot, const): push slots[slot] op constants[const]
+OPERATE_SLOT_SLOT = 15      # arg (operator, left, right): push slots[left] op slots[right]
+STORE_CONST = 16            # arg (const, target)
+COPY_SLOT = 17              # arg (source, target)
+ASSIGN_SLOT_CONST = 18      # arg (operator, slot, const, target)
+ASSIGN_SLOT_SLOT = 19       # arg (operator, left, right, target)
+LOOP_SLOT_CONST = 20        # arg (operator, slot, const, jump target), jumps while true
+LOOP_SLOT_SLOT = 21         # arg (operator, left, right, jump target), jumps while true
+HALT = 22                   # appended by the VM when linking, stops the run loop
+CHARGE = 23                 # arg (charge, jump target), added by the VM when running with limits
+
+# Packs
+BUILD_PACK = 24             # pop arg values, push a Pack of them
+LOAD_PACK = 25              # arg (const, ...): push a new Pack of those constants
+DIG = 26                    # pop index, replace top with dig(top, index)
+BURY = 27                   # pop value, pop index, pop a pack and bury the value in it
+APPEND = 28                 # pop value, pop a pack and append the value to it
+CALL = 29                   # replace top with BUILTIN_FUNCTIONS[arg](top)
+
+OPCODE_NAMES = {
+    LOAD_CONST: 'LOAD_CONST',
+    LOAD_SLOT: 'LOAD_SLOT',
+    STORE_SLOT: 'STORE_SLOT',
+    BINARY_OP: 'BINARY_OP',
+    COMPARE_OP: 'COMPARE_OP',
+    UNARY_OP: 'UNARY_OP',
+    JUMP: 'JUMP',
+    JUMP_IF_FALSE: 'JUMP_IF_FALSE',
+    JUMP_IF_TRUE: 'JUMP_IF_TRUE',
+    SNIFF_IF_FALSE: 'SNIFF_IF_FALSE',
+    JUMP_IF_FALSE_OR_POP: 'JUMP_IF_FALSE_OR_POP',
+    JUMP_IF_TRUE_OR_POP: 'JUMP_IF_TRUE_OR_POP',
+    PRINT: 'PRINT',
+    INPUT: 'INPUT',
+    OPERATE_SLOT_CONST: 'OPERATE_SLOT_CONST',
+    OPERATE_SLOT_SLOT: 'OPERATE_SLOT_SLOT',
+    STORE_CONST: 'STORE_CONST',
+    COPY_SLOT: 'COPY_SLOT',
+    ASSIGN_SLOT_CONST: 'ASSIGN_SLOT_CONST',
+    ASSIGN_SLOT_SLOT: 'ASSIGN_SLOT_SLOT',
+    LOOP_SLOT_CONST: 'LOOP_SLOT_CONST',
+    LOOP_SLOT_SLOT: 'LOOP_SLOT_SLOT',
+    HALT: 'HALT',
+    CHARGE: 'CHARGE',
+    BUILD_PACK: 'BUILD_PACK',
+    LOAD_PACK: 'LOAD_PACK',
+    DIG: 'DIG',
+    BURY: 'BURY',
+    APPEND: 'APPEND',
+    CALL: 'CALL',
+}
+
+# Instructions whose argument is a jump target, for the loops the whole argument tuple
+JUMP_OPS = frozenset({JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, SNIFF_IF_FALSE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP})
+LOOP_OPS = frozenset({LOOP_SLOT_CONST, LOOP_SLOT_SLOT, JUMP_IF_TRUE})
+
+BINARY_OPERATORS = ('+', '-', '*', '/', '%')
+BINARY_FUNCTIONS = (operator.add, operator.sub, operator.mul, operator.truediv, operator.mod)
+
+COMPARE_OPERATORS = ('==', '!=', '>', '<', '>=', '<=')
+COMPARE_FUNCTIONS = (operator.eq, operator.ne, operator.gt, operator.lt, operator.ge, operator.le)
+
+UNARY_OPERATORS = ('-', '+', '!', 'bool')
+UNARY_FUNCTIONS = (operator.neg, operator.pos, operator.not_, bool)
+
+BUILTIN_NAMES = tuple(BUILTINS)
+BUILTIN_FUNCTIONS = tuple(BUILTINS.values())
+
+OPERATORS = BINARY_OPERATORS + COMPARE_OPERATORS
+OPERATOR_FUNCTIONS = BINARY_FUNCTIONS + COMPARE_FUNCTIONS
+
+
+class Bytecode:
+    """A compiled DogLang program: instructions, constant pool and slot names.
+
+    starts holds the position of the first instruction of every statement,
+    which is where a run with a step limit charges it.
+    """
+
+    def __init__(self, code, constants, names, starts=()):
+        self.code = code
+        self.constants = constants
+        self.names = names
+        self.starts = starts
+
+    def disassemble(self):
+        lines = []
+        for pc, (op, arg) in enumerate(self.code):
+            if isinstance(arg, tuple):
+                lines.append(f"{pc:>5} {OPCODE_NAMES[op]:<22}      ({self.describe(op, arg)})")
+                continue
+            line = f"{pc:>5} {OPCODE_NAMES[op]:<22}{arg:>4}"
+            if op == LOAD_CONST:
+                line += f"  ({self.constants[arg]!r})"
+            elif op in (LOAD_SLOT, STORE_SLOT):
+                line += f"  ({self.names[arg]})"
+            elif op == BINARY_OP:
+                line += f"  ({BINARY_OPERATORS[arg]})"
+            elif op == COMPARE_OP:
+                line += f"  ({COMPARE_OPERATORS[arg]})"
+            elif op == UNARY_OP:
+                line += f"  ({UNARY_OPERATORS[arg]})"
+            elif op == CALL:
+                line += f"  ({BUILTIN_NAMES[arg]})"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def describe(self, op, arg):
+        names, constants = self.names, self.constants
+        if op == LOAD_PACK:
+            return "pack[" + ", ".join(repr(constants[index]) for index in arg) + "]"
+        if op == STORE_CONST:
+            return f"{names[arg[1]]} = {constants[arg[0]]!r}"
+        if op == COPY_SLOT:
+            return f"{names[arg[1]]} = {names[arg[0]]}"
+        left = names[arg[1]]
+        if op in (OPERATE_SLOT_CONST, ASSIGN_SLOT_CONST, LOOP_SLOT_CONST):
+            right = repr(constants[arg[2]])
+        else:
+            right = names[arg[2]]
+        text = f"{left} {OPERATORS[arg[0]]} {right}"
+        if op in (ASSIGN_SLOT_CONST, ASSIGN_SLOT_SLOT):
+            return f"{names[arg[3]]} = {text}"
+        if op in (LOOP_SLOT_CONST, LOOP_SLOT_SLOT):
+            return f"{text}, to {arg[3]}"
+        return text
+
+    def __repr__(self):
+        return f"Bytecode({len(self.code)} instructions, {len(self.names)} slots)"
+
+
+class Compiler:
+    """Lowers a Program AST into Bytecode."""
+
+    def __init__(self, names):
+        self.code = []
+        self.constants = []
+        self.constant_index = {}
+        self.starts = []
+        # Slot numbers were given to IDENTIFIER nodes by SemanticAnalyser
+        self.names = names
+
+    def compile(self, ast):
+        self.statement(ast)
+        return Bytecode(self.code, self.constants, self.names, tuple(self.starts))
+
+    # helpers
+    def emit(self, op, arg=0):
+        self.code.append((op, arg))
+        return len(self.code) - 1
+
+    def patch(self, position, target):
+        self.code[position] = (self.code[position][0], target)
+
+    def here(self):
+        return len(self.code)
+
+    def constant(self, value):
+        # bool and int compare equal, so the type is part of the key
+        key = (type(value), value)
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constant_index[key]
+
+    # statements
+    def statement(self, node):
+        if node.type == "Program" or node.type == "block":
+            for child in node.children:
+                self.statement(child)
+            return
+        self.starts.append(self.here())
+        if node.type == "assignment":
+            self.assignment(node)
+        elif node.type == "print":
+            self.expression(node.children[0])
+            self.emit(PRINT)
+        elif node.type == "bury":
+            for child in node.children:
+                self.expression(child)
+            self.emit(APPEND if node.value == "append" else BURY)
+        elif node.type == "loop":
+            self.loop(node)
+        elif node.type == "conditional":
+            self.conditional(node)
+        else:
+            raise DogLangError(f"Cannot compile node '{node.type}'")
+
+    def assignment(self, node):
+        target, value = node.children
+        if value.value == 'input':
+            self.expression(value.children[0])
+            self.emit(INPUT)
+            self.emit(STORE_SLOT, target.slot)
+            return
+
+        tree = unwrap(value)
+        if tree.type in LITERAL_TYPES:
+            self.emit(STORE_CONST, (self.constant(tree.value), target.slot))
+        elif tree.type == Tokens.IDENTIFIER:
+            self.emit(COPY_SLOT, (tree.slot, target.slot))
+        elif self.is_simple(tree):
+            op, operands = self.simple_operands(tree)
+            self.emit(ASSIGN_SLOT_CONST if op == OPERATE_SLOT_CONST else ASSIGN_SLOT_SLOT,
+                      operands + (target.slot,))
+        else:
+            self.expression(tree)
+            self.emit(STORE_SLOT, target.slot)
+
+    def loop(self, node):
+        condition = unwrap(node.children[0])
+        # The condition is placed after the body so each iteration costs one jump
+        enter = self.emit(JUMP)
+        body = self.here()
+        for child in node.children[1:]:
+            self.statement(child)
+        self.patch(enter, self.here())
+        if self.is_simple(condition):
+            op, operands = self.simple_operands(condition)
+            self.emit(LOOP_SLOT_CONST if op == OPERATE_SLOT_CONST else LOOP_SLOT_SLOT,
+                      operands + (body,))
+        else:
+            self.expression(condition)
+            self.emit(JUMP_IF_TRUE, body)
+
+    def conditional(self, node):
+        self.expression(node.children[0])
+        skip_then = self.emit(SNIFF_IF_FALSE)
+        self.statement(node.children[1])
+        if len(node.children) > 2:
+            skip_else = self.emit(JUMP)
+            self.patch(skip_then, self.here())
+            self.statement(node.children[2].children[0])
+            self.patch(skip_else, self.here())
+        else:
+            self.patch(skip_then, self.here())
+
+    # expressions
+    @staticmethod
+    def is_simple(node):
+        """True for "variable op constant" and "variable op variable" nodes."""
+        if node.type != "binary" and node.type != "comparison":
+            return False
+        left, right = unwrap(node.children[0]), unwrap(node.children[1])
+        return left.type == Tokens.IDENTIFIER and (right.type in LITERAL_TYPES or right.type == Tokens.IDENTIFIER)
+
+    def simple_operands(self, node):
+        index = OPERATORS.index(node.value)
+        left, right = unwrap(node.children[0]), unwrap(node.children[1])
+        slot = left.slot
+        if right.type in LITERAL_TYPES:
+            return OPERATE_SLOT_CONST, (index, slot, self.constant(right.value))
+        return OPERATE_SLOT_SLOT, (index, slot, right.slot)
+
+    def expression(self, node):
+        node = unwrap(node)
+        kind = node.type
+        if kind in LITERAL_TYPES:
+            self.emit(LOAD_CONST, self.constant(node.value))
+        elif kind == Tokens.IDENTIFIER:
+            self.emit(LOAD_SLOT, node.slot)
+        elif kind == "unary":
+            self.expression(node.children[0])
+            self.emit(UNARY_OP, UNARY_OPERATORS.index(node.value))
+        elif kind == "pack":
+            elements = [unwrap(child) for child in node.children]
+            if all(element.type in LITERAL_TYPES for element in elements):
+                self.emit(LOAD_PACK, tuple(self.constant(element.value) for element in elements))
+            else:
+                for element in elements:
+                    self.expression(element)
+                self.emit(BUILD_PACK, len(elements))
+        elif kind == "dig":
+            self.expression(node.children[0])
+            self.expression(node.children[1])
+            self.emit(DIG)
+        elif kind == "call":
+            self.expression(node.children[0])
+            self.emit(CALL, BUILTIN_NAMES.index(node.value))
+        elif self.is_simple(node):
+            self.emit(*self.simple_operands(node))
+        elif kind == "logical":
+            self.expression(node.children[0])
+            jump = self.emit(JUMP_IF_FALSE_OR_POP if node.value == '&&' else JUMP_IF_TRUE_OR_POP)
+            self.expression(node.children[1])
+            self.emit(UNARY_OP, UNARY_OPERATORS.index('bool'))
+            self.patch(jump, self.here())
+        elif kind == "comparison":
+            self.expression(node.children[0])
+            self.expression(node.children[1])
+            self.emit(COMPARE_OP, COMPARE_OPERATORS.index(node.value))
+        elif kind == "binary":
+            self.expression(node.children[0])
+            self.expression(node.children[1])
+            self.emit(BINARY_OP, BINARY_OPERATORS.index(node.value))
+        else:
+            raise DogLangError(f"Cannot compile expression node '{kind}'")
+
+
+def unwrap(node):
+    """Skip expression and grouping wrappers down to the node that computes something."""
+    while node.type == "expression" or node.type == "grouping":
+        node = node.children[0]
+    return node
+
+
+def compile_program(ast, names=None):
+    """Compile a Program AST into Bytecode.
+
+    names is the slot list from SemanticAnalyser, the AST is resolved here
+    if it has not been already.
+    """
+    if names is None:
+        names = SemanticAnalyser(ast).names
+    return Compiler(names).compile(ast)
+
+
+def charged(budget, slots):
+    """A function charging budget one step for each call, the CHARGE instructions of a run with limits."""
+    allowance = countdown = 0
+
+    if budget.limits.memory is None:
+        def charge():
+            nonlocal allowance, countdown
+            countdown -= 1
+            if countdown <= 0:
+                allowance = countdown = budget.spend(allowance - countdown)
+        return charge
+
+    def charge():
+        nonlocal allowance, countdown
+        countdown -= 1
+        if countdown <= 0:
+            allowance = countdown = budget.spend(allowance - countdown)
+        budget.check_memory(sum(sys.getsizeof(value) for value in slots if value is not UNSET))
+    return charge
+
+
+class VM:
+    """Runs Bytecode on a value stack with one list slot per variable.
+
+    bark output goes to output, an OutputWriter or a file-like object, and
+    fetch reads from inputs, an InputReader or an iterable of lines.
+    slots holds the starting variable values and code the result of an
+    earlier link() of the same Bytecode, both are created when not given.
+
+    limits is a runtime.Limits. A step is a statement, charged before it
+    runs like the tree engine does, and so is each pass of a wagtail with
+    an empty body. The time and memory limits are checked along with the
+    steps. Without limits no checks are made at all.
+    """
+
+    def __init__(self, bytecode, output=None, inputs=None, slots=None, code=None, limits=None):
+        self.bytecode = bytecode
+        self.output = output_writer(output, None if limits is None else limits.output)
+        self.inputs = input_reader(inputs)
+        self.slots = [UNSET] * len(bytecode.names) if slots is None else slots
+        if code is None:
+            code = self.link(bytecode)
+        self.budget = None
+        if limits is not None:
+            self.budget = Budget(limits)
+            code = self.add_charges(code, bytecode.starts, charged(self.budget, self.slots))
+        self.code = code
+
+    @staticmethod
+    def link(bytecode):
+        """Resolve constant and operator indexes so run() does not have to."""
+        constants = bytecode.constants
+        code = []
+        for op, arg in bytecode.code:
+            if op == LOAD_CONST:
+                arg = constants[arg]
+            elif op == BINARY_OP:
+                arg = BINARY_FUNCTIONS[arg]
+            elif op == COMPARE_OP:
+                arg = COMPARE_FUNCTIONS[arg]
+            elif op == UNARY_OP:
+                arg = UNARY_FUNCTIONS[arg]
+            elif op == CALL:
+                arg = BUILTIN_FUNCTIONS[arg]
+            elif op == OPERATE_SLOT_CONST:
+                arg = (OPERATOR_FUNCTIONS[arg[0]], arg[1], constants[arg[2]])
+            elif op == OPERATE_SLOT_SLOT:
+                arg = (OPERATOR_FUNCTIONS[arg[0]], arg[1], arg[2])
+            elif op == STORE_CONST:
+                arg = (constants[arg[0]], arg[1])
+            elif op in (ASSIGN_SLOT_CONST, LOOP_SLOT_CONST):
+                arg = (OPERATOR_FUNCTIONS[arg[0]], arg[1], constants[arg[2]], arg[3])
+            elif op in (ASSIGN_SLOT_SLOT, LOOP_SLOT_SLOT):
+                arg = (OPERATOR_FUNCTIONS[arg[0]], arg[1], arg[2], arg[3])
+            elif op == LOAD_PACK:
+                # The storage is picked once here, each run copies it
+                arg = Pack([constants[index] for index in arg])
+            code.append((op, arg))
+        # Jumps past the last instruction land here, so run() needs no bounds check
+        code.append((HALT, 0))
+        return code
+
+    @staticmethod
+    def add_charges(code, starts, charge):
+        """Code that calls charge before every statement, for runs with limits.
+
+        A CHARGE instruction goes in front of the first instruction of each
+        statement and jumps are moved to match, a jump to a statement lands
+        on its CHARGE. A loop with an empty body jumps back through a CHARGE
+        placed after HALT, so each pass is charged too.
+        """
+        starts = set(starts)
+        # Where each instruction's jump target ends up, its CHARGE when it starts a statement
+        position = []
+        inserted = 0
+        for pc in range(len(code)):
+            position.append(pc + inserted)
+            inserted += pc in starts
+        charged_code = []
+        # (position of a loop instruction with an empty body, where its pass begins)
+        passes = []
+        for pc, (op, arg) in enumerate(code):
+            if pc in starts:
+                charged_code.append((CHARGE, (charge, len(charged_code) + 1)))
+            if op in JUMP_OPS or op in LOOP_OPS:
+                target = arg if op in JUMP_OPS else arg[3]
+                if op in LOOP_OPS and target <= pc and not any(target <= start <= pc for start in starts):
+                    passes.append((len(charged_code), position[target]))
+                arg = position[target] if op in JUMP_OPS else arg[:3] + (position[target],)
+            charged_code.append((op, arg))
+        for pc, target in passes:
+            op, arg = charged_code[pc]
+            charged_code[pc] = (op, len(charged_code) if op in JUMP_OPS else arg[:3] + (len(charged_code),))
+            charged_code.append((CHARGE, (charge, target)))
+        return charged_code
+
+    def undeclared(self, slot):
+        return undeclared(self.bytecode.names[slot])
+
+    def run(self):
+        try:
+            self.execute()
+        finally:
+            self.output.flush()
+
+    def execute(self):
+        code = self.code
+        slots = self.slots
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        write = self.output.write
+        pc = 0
+
+        # Branches are ordered roughly by how often a typical loop hits them
+        while True:
+            op, arg = code[pc]
+            pc += 1
+            if op == ASSIGN_SLOT_CONST:
+                function, slot, const, target = arg
+                value = slots[slot]
+                if value is UNSET:
+                    raise self.undeclared(slot)
+                slots[target] = function(value, const)
+            elif op == LOOP_SLOT_CONST:
+                function, slot, const, target = arg
+                value = slots[slot]
+                if value is UNSET:
+                    raise self.undeclared(slot)
+                if function(value, const):
+                    pc = target
+            elif op == ASSIGN_SLOT_SLOT:
+                function, left, right, target = arg
+                value = slots[left]
+                other = slots[right]
+                if value is UNSET:
+                    raise self.undeclared(left)
+                if other is UNSET:
+                    raise self.undeclared(right)
+                slots[target] = function(value, other)
+            elif op == COPY_SLOT:
+                value = slots[arg[0]]
+                if value is UNSET:
+                    raise self.undeclared(arg[0])
+                slots[arg[1]] = value
+            elif op == STORE_SLOT:
+                slots[arg] = pop()
+            elif op == CHARGE:
+                # Only in runs with limits, where it comes before every statement
+                charge, pc = arg
+                charge()
+            elif op == OPERATE_SLOT_CONST:
+                function, slot, const = arg
+                value = slots[slot]
+                if value is UNSET:
+                    raise self.undeclared(slot)
+                push(function(value, const))
+            elif op == LOAD_SLOT:
+                value = slots[arg]
+                if value is UNSET:
+                    raise self.undeclared(arg)
+                push(value)
+            elif op == JUMP_IF_TRUE:
+                if pop():
+                    pc = arg
+            elif op == OPERATE_SLOT_SLOT:
+                function, left, right = arg
+                value = slots[left]
+                other = slots[right]
+                if value is UNSET:
+                    raise self.undeclared(left)
+                if other is UNSET:
+                    raise self.undeclared(right)
+                push(function(value, other))
+            elif op == LOAD_CONST:
+                push(arg)
+            elif op == STORE_CONST:
+                slots[arg[1]] = arg[0]
+            elif op == LOOP_SLOT_SLOT:
+                function, left, right, target = arg
+                value = slots[left]
+                other = slots[right]
+                if value is UNSET:
+                    raise self.undeclared(left)
+                if other is UNSET:
+                    raise self.undeclared(right)
+                if function(value, other):
+                    pc = target
+            elif op == BINARY_OP or op == COMPARE_OP:
+                right = pop()
+                stack[-1] = arg(stack[-1], right)
+            elif op == SNIFF_IF_FALSE:
+                check = pop()
+                if type(check) is not bool:
+                    raise DogLangError("Value inside sniff is not boolean.")
+                if not check:
+                    pc = arg
+            elif op == JUMP:
+                pc = arg
+            elif op == JUMP_IF_FALSE:
+                if not pop():
+                    pc = arg
+            elif op == PRINT:
+                write(pop())
+            elif op == UNARY_OP or op == CALL:
+                stack[-1] = arg(stack[-1])
+            elif op == DIG:
+                index = pop()
+                stack[-1] = dig(stack[-1], index)
+            elif op == BURY:
+                value = pop()
+                index = pop()
+                bury(pop(), index, value)
+            elif op == APPEND:
+                value = pop()
+                append(pop(), value)
+            elif op == LOAD_PACK:
+                push(arg.copy())
+            elif op == BUILD_PACK:
+                values = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                push(Pack(values))
+            elif op == JUMP_IF_FALSE_OR_POP:
+                if stack[-1]:
+                    pop()
+                else:
+                    stack[-1] = False
+                    pc = arg
+            elif op == JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    stack[-1] = True
+                    pc = arg
+                else:
+                    pop()
+            elif op == INPUT:
+                if self.inputs.interactive:
+                    # The prompt has to appear after everything barked so far
+                    self.output.flush()
+                push(coerce_input(self.inputs.read(pop())))
+            elif op == HALT:
+                return
+            else:
+                raise DogLangError(f"Unknown opcode {op}")
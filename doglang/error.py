@@ -3,5 +3,28 @@ class DogLangError(Exception):
     pass
 
 class DogLangSyntaxError(DogLangError):
-    """Exception raised for syntax errors found during parsing."""
+    """Exception raised for syntax errors found during parsing.
+
+    line and column locate the error in the source when they are known.
+    """
+    def __init__(self, message, line=None, column=None):
+        super().__init__(message)
+        self.line = line
+        self.column = column
+
+class DogLangNameError(DogLangError):
+    """Exception raised when a variable is read before it has been assigned."""
+    pass
+
+class DogLangIndexError(DogLangError):
+    """Exception raised when dig or bury uses an index outside the pack."""
     pass
+
+class DogLangLimitError(DogLangError):
+    """Exception raised when a run goes over one of its execution limits.
+
+    limit names the limit: "steps", "time", "output" or "memory".
+    """
+    def __init__(self, message, limit=None):
+        super().__init__(message)
+        self.limit = limit
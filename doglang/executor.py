@@ -0,0 +1,267 @@
+"""The tree engine: runs a resolved Program AST statement by statement.
+
+prepare() turns the AST into Step objects once, compiling every expression
+to a closure. Executor then runs them against one list of variable slots.
+Steps hold no state of their own, so the same prepared program can be run
+any number of times.
+"""
+import sys
+
+from doglang.ExpressionCompiler import compile_node
+from doglang.error import DogLangError
+from doglang.optimizer import counted_loop
+from doglang.runtime import UNSET, Budget, CountedRange, append, bury, coerce_input
+
+
+class Executor:
+    """Runs prepared Steps with one set of slots, output and inputs."""
+
+    def __init__(self, slots, output, inputs):
+        self.slots = slots
+        self.output = output
+        self.inputs = inputs
+        # One handler per Step type, looked up once per statement
+        self.handlers = {
+            "assignment": self.assignment,
+            "input": self.fetch,
+            "print": self.print_stmt,
+            "bury": self.bury,
+            "loop": self.loop_stmt,
+            "counted": self.counted_loop,
+            "conditional": self.conditions,
+            "block": self.block,
+        }
+
+    def execute(self, statements):
+        """Run a list of prepared Steps.
+
+        Nothing recurses: the work stack holds one iterator per block that is
+        still running, so nesting depth is only limited by memory. A handler
+        returns the statements to run next, or None.
+        """
+        handlers = self.handlers
+        stack = [iter(statements)]
+        while stack:
+            for step in stack[-1]:
+                block = handlers[step.type](step)
+                if block is not None:
+                    stack.append(iter(block))
+                    break
+            else:
+                stack.pop()
+
+    def assignment(self, step):
+        self.slots[step.slot] = step.evaluate(self.slots)
+
+    def fetch(self, step):
+        prompt = step.evaluate(self.slots)
+        if self.inputs.interactive:
+            # The prompt has to appear after everything barked so far
+            self.output.flush()
+        self.slots[step.slot] = coerce_input(self.inputs.read(prompt))
+
+    def conditions(self, step):
+        check = step.evaluate(self.slots)
+        if type(check) is not bool:
+            raise DogLangError("Value inside sniff is not boolean.")
+        return step.body if check else step.orelse
+
+    def block(self, step):
+        return step.body
+
+    def print_stmt(self, step):
+        self.output.write(step.evaluate(self.slots))
+
+    def bury(self, step):
+        step.evaluate(self.slots)
+
+    def loop_stmt(self, step):
+        # The condition is checked again each time the body has run to the end
+        condition, body, slots = step.evaluate, step.body, self.slots
+        while condition(slots):
+            yield from body
+
+    def counted_loop(self, step):
+        # The counter steps through a CountedRange, the body runs without its last statement
+        slots, slot = self.slots, step.slot
+        stop, increment, comparison, inner = step.counted
+        values = CountedRange(slots[slot], stop(slots), increment, comparison)
+        for value in values:
+            slots[slot] = value
+            yield from inner
+        slots[slot] = values.end
+
+    def count_statements(self):
+        """Make every statement run pass through execute(), for executors that count them there.
+
+        Counted loops run as written, and each pass of a wagtail with an
+        empty body yields TICK, which stands in for a statement.
+        """
+        self.handlers["loop"] = self.handlers["counted"] = self.counted_passes
+        self.handlers["tick"] = self.tick
+
+    def counted_passes(self, step):
+        if step.body:
+            return self.loop_stmt(step)
+        return self.empty_loop(step)
+
+    def empty_loop(self, step):
+        # Nothing in the body passes through execute(), so count the passes here
+        condition, slots = step.evaluate, self.slots
+        while condition(slots):
+            yield TICK
+
+    def tick(self, step):
+        return None
+
+
+class LimitedExecutor(Executor):
+    """An Executor that keeps a run within its runtime.Limits.
+
+    Every statement is one step, and so is each pass of a wagtail with an
+    empty body. Plain Executor stays free of any accounting.
+    """
+
+    def __init__(self, slots, output, inputs, limits):
+        super().__init__(slots, output, inputs)
+        self.budget = Budget(limits)
+        self.count_statements()
+        if limits.memory is not None:
+            self.sizes = [0] * len(slots)
+            self.memory = 0
+            for slot, value in enumerate(slots):
+                self.track(slot, value)
+            self.handlers["assignment"] = self.tracked_assignment
+            self.handlers["input"] = self.tracked_fetch
+            self.handlers["bury"] = self.tracked_bury
+
+    def execute(self, statements):
+        handlers = self.handlers
+        budget = self.budget
+        allowance = countdown = budget.spend(0)
+        stack = [iter(statements)]
+        while stack:
+            for step in stack[-1]:
+                countdown -= 1
+                if not countdown:
+                    allowance = countdown = budget.spend(allowance)
+                block = handlers[step.type](step)
+                if block is not None:
+                    stack.append(iter(block))
+                    break
+            else:
+                stack.pop()
+
+    # memory accounting, only used when there is a memory limit
+    def track(self, slot, value):
+        size = 0 if value is UNSET else sys.getsizeof(value)
+        self.memory += size - self.sizes[slot]
+        self.sizes[slot] = size
+        self.budget.check_memory(self.memory)
+
+    def tracked_assignment(self, step):
+        value = step.evaluate(self.slots)
+        self.track(step.slot, value)
+        self.slots[step.slot] = value
+
+    def tracked_fetch(self, step):
+        self.fetch(step)
+        self.track(step.slot, self.slots[step.slot])
+
+    def tracked_bury(self, step):
+        step.evaluate(self.slots)
+        # The pack may have grown
+        self.track(step.slot, self.slots[step.slot])
+
+
+class Step:
+    """A statement prepared for Executor.execute.
+
+    evaluate is the compiled value, prompt or condition, for a bury the
+    whole statement with slot its pack's variable. body and orelse are
+    the prepared statements of a wagtail or sniff. line is the source line of
+    the statement.
+
+    A counted wagtail is a "counted" Step that is also a complete "loop"
+    Step, slot is its counter and counted holds (stop, step, comparison,
+    body without the last statement) for Executor.counted_loop.
+    """
+    __slots__ = ('type', 'slot', 'evaluate', 'body', 'orelse', 'line', 'counted')
+
+    def __init__(self, type, evaluate, slot=None, body=None, orelse=None, line=None, counted=None):
+        self.type = type
+        self.evaluate = evaluate
+        self.slot = slot
+        self.body = body
+        self.orelse = orelse
+        self.line = line
+        self.counted = counted
+
+
+# Stands in for a statement on each pass of an empty wagtail, see Executor.count_statements
+TICK = Step("tick", None)
+
+
+def compile_bury(node):
+    """A closure running a bury statement, the pack, index and value are evaluated in that order."""
+    target = compile_node(node.children[0])
+    value = compile_node(node.children[-1].children[0])
+    if node.value == "append":
+        def evaluate(slots):
+            append(target(slots), value(slots))
+        return evaluate
+
+    index = compile_node(node.children[1].children[0])
+
+    def evaluate(slots):
+        bury(target(slots), index(slots), value(slots))
+    return evaluate
+
+
+def prepare(ast):
+    """Turn a resolved Program AST into Steps, compiling every expression once."""
+    statements = []
+    counted = []
+    # (AST statements still to prepare, list their Steps go into)
+    pending = [(ast.children, statements)]
+    while pending:
+        nodes, steps = pending.pop()
+        for node in nodes:
+            kind = node.type
+            if kind == "assignment":
+                target, value = node.children
+                if value.type == "expression":
+                    steps.append(Step("assignment", compile_node(value.children[0]), slot=target.slot, line=node.line))
+                else:  # fetch, the prompt is an expression
+                    steps.append(Step("input", compile_node(value.children[0].children[0]), slot=target.slot,
+                                      line=node.line))
+            elif kind == "print":
+                steps.append(Step("print", compile_node(node.children[0].children[0]), line=node.line))
+            elif kind == "bury":
+                steps.append(Step("bury", compile_bury(node), slot=node.children[0].slot, line=node.line))
+            elif kind == "loop":
+                step = Step("loop", compile_node(node.children[0].children[0]), body=[], line=node.line)
+                loop = counted_loop(node)
+                if loop is not None:
+                    counter, stop, increment, comparison = loop
+                    step.type = "counted"
+                    step.slot = counter.slot
+                    step.counted = (compile_node(stop), increment, comparison)
+                    counted.append(step)
+                pending.append((node.children[1:], step.body))
+                steps.append(step)
+            elif kind == "conditional":
+                step = Step("conditional", compile_node(node.children[0].children[0]), body=[], line=node.line)
+                pending.append((node.children[1].children, step.body))
+                if len(node.children) > 2:
+                    step.orelse = []
+                    pending.append((node.children[2].children[0].children, step.orelse))
+                steps.append(step)
+            elif kind == "block":
+                step = Step("block", None, body=[], line=node.line)
+                pending.append((node.children, step.body))
+                steps.append(step)
+    for step in counted:
+        # The bodies are only filled in once everything is prepared
+        step.counted += (step.body[:-1],)
+    return statements
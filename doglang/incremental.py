@@ -0,0 +1,160 @@
+"""Incremental front end for editors.
+
+A Document keeps the source lines, their tokens and the parsed AST of a
+file. edit() applies one text edit and does only the work the edit calls
+for:
+
+- only the edited lines are tokenized again, Tokenizer works line by line
+- parsing restarts at the top-level statement before the edit and stops as
+  soon as it lines up with a statement that started after the edit
+- the new statements are spliced into the existing Program node
+
+Tokens and nodes after the edit keep their objects. When the edit adds or
+removes lines their line numbers are shifted, typing within a line leaves
+them alone.
+
+The result is always what SyntaxAnalyser(Tokenizer(document.text)).parse()
+would give, and an edit that leaves the file unparseable raises the same
+error a full parse would. The next edit then parses the whole file again.
+"""
+from doglang.SyntaxAnalyser import AST, SyntaxAnalyser
+from doglang.Tokenizer import tokenize_line
+from doglang.error import DogLangError
+
+
+def _split(text):
+    return text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+
+def _first_token_at(tokens, line):
+    """Index of the first token on line or after it."""
+    low, high = 0, len(tokens)
+    while low < high:
+        middle = (low + high) // 2
+        if tokens[middle].line < line:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _shift_lines(statements, delta):
+    pending = list(statements)
+    while pending:
+        node = pending.pop()
+        if node.line is not None:
+            node.line += delta
+        pending.extend(node.children)
+
+
+class Document:
+    """One source file kept parsed across edits.
+
+    Lines and columns are 1-based, like the line and column of a Token.
+    """
+
+    def __init__(self, source=""):
+        self.lines = _split(source)
+        self.tokens = []
+        # Index in tokens of the first token of every top-level statement
+        self.starts = []
+        # Top-level statements parsed by the last edit
+        self.reparsed = 0
+        # The Program node, ast is None while the text does not parse
+        self._program = None
+        self.ast = None
+        self._parse_all()
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    def _parse_all(self):
+        self.ast = None
+        tokens = []
+        for line_number, line in enumerate(self.lines, 1):
+            tokens += tokenize_line(line, line_number)
+        self.tokens = tokens
+        program = AST("Program")
+        starts = []
+        parser = SyntaxAnalyser(tokens)
+        while parser.current < len(tokens):
+            starts.append(parser.current)
+            program.addchild(parser.statement())
+        self.starts = starts
+        self._program = self.ast = program
+        self.reparsed = len(program.children)
+
+    def edit(self, start_line, start_column, end_line, end_column, text):
+        """Replace the text from (start_line, start_column) up to (end_line, end_column) with text.
+
+        Returns the Program AST.
+        """
+        lines = self.lines
+        if not (1 <= start_line <= end_line <= len(lines)):
+            raise DogLangError(f"Edit lines {start_line}-{end_line} are outside the document")
+        if not (1 <= start_column <= len(lines[start_line - 1]) + 1
+                and 1 <= end_column <= len(lines[end_line - 1]) + 1
+                and (start_line, start_column) <= (end_line, end_column)):
+            raise DogLangError(f"Edit columns {start_column}-{end_column} are outside the document")
+
+        new_lines = _split(lines[start_line - 1][:start_column - 1] + text + lines[end_line - 1][end_column - 1:])
+        lines[start_line - 1:end_line] = new_lines
+        if self.ast is None:
+            # The last edit left the file unparseable, there is nothing to reuse
+            self._parse_all()
+            return self.ast
+        self.ast = None
+
+        delta = len(new_lines) - (end_line - start_line + 1)
+        tokens = self.tokens
+        first = _first_token_at(tokens, start_line)
+        last = _first_token_at(tokens, end_line + 1)
+        new_tokens = []
+        for line_number, line in enumerate(new_lines, start_line):
+            new_tokens += tokenize_line(line, line_number)
+
+        starts = self.starts
+        statements = self._program.children
+        # The first statement that may change is the one holding the token
+        # before the edit, the edit may extend it. Statements starting at or
+        # after the old end of the edit may be reused.
+        index = max(len(starts) - 1, 0)
+        while index > 0 and starts[index] >= first:
+            index -= 1
+        reusable = index + 1
+        while reusable < len(starts) and starts[reusable] < last:
+            reusable += 1
+        if delta:
+            for token in tokens[last:]:
+                token.line += delta
+            _shift_lines(statements[reusable:], delta)
+        tokens[first:last] = new_tokens
+        token_delta = len(new_tokens) - (last - first)
+
+        edit_end = first + len(new_tokens)
+        parser = SyntaxAnalyser(tokens)
+        parser.current = starts[index] if starts else 0
+        parsed = []
+        parsed_starts = []
+        stop = reusable
+        while parser.current < len(tokens):
+            if parser.current >= edit_end:
+                # Parsing lined up with a statement that started after the edit, the rest is unchanged
+                while stop < len(starts) and starts[stop] + token_delta < parser.current:
+                    stop += 1
+                if stop < len(starts) and starts[stop] + token_delta == parser.current:
+                    break
+            parsed_starts.append(parser.current)
+            parsed.append(parser.statement())
+        else:
+            stop = len(starts)
+
+        statements[index:stop] = parsed
+        starts[index:stop] = parsed_starts
+        if token_delta:
+            for position in range(index + len(parsed), len(starts)):
+                starts[position] += token_delta
+        self.reparsed = len(parsed)
+        self.ast = self._program
+        return self.ast
@@ -1,94 +1,27 @@
 from doglang.SymbolTable import SymbolTable
-from doglang.SyntaxAnalyser import SyntaxAnalyser
-from doglang.Tokenizer import Tokenizer
-from doglang.SemanticAnalyser import SemanticAnalyser
-from doglang.error import DogLangError
+from doglang.program import compile
+from doglang.runtime import type_name
 
-class Interpreter:
-    def __init__(self,code):
-        self.symbol_table = SymbolTable()
-        tokens=Tokenizer(code)
-        parse=SyntaxAnalyser(tokens)
-        ast=parse.parse()
-        # SemanticAnalyser(ast)
-        self.visit(ast)
-    
-    def visit(self,ast):
-        if ast.type == "Program" or ast.type== "block":
-            for child in ast.children:
-                self.visit(child)
-
-        elif ast.type == "assignment":
-                self.assignment(ast.children)
-        elif ast.type == "print":
-                self.print_stmt(ast.children)
-        elif ast.type == "loop":
-                self.loop_stmt(ast.children)
-        elif ast.type == "conditional":
-                self.conditions(ast.children)
 
-    def assignment(self,children):
-         name = children[0].value
-         if children[1].value == 'input':
-              expression = children[1].children[0]
-              prompt = self.expression_stmt(expression.children)
-              val = input(prompt)
-              self.symbol_table.insert(name=name,type=type(val),scope="local", value = val)
-              return
-         expression = self.expression_stmt(children[1].children)
-         if self.symbol_table.lookup(name) is None:
-              self.symbol_table.insert(name=name,type="int",scope="local", value = expression)
-         else: #already exists variable just modify it
-              self.symbol_table.modify(name=name,value = expression)
-    
-    def conditions(self,children):
-         for child in children:
-              if child.type == "expression":
-                   check = self.expression_stmt(child.children)
-                   if type(check) is bool:
-                        if check:
-                            self.visit(children[1].children[0])
-                        else:
-                             if len(children) > 2:
-                                self.visit(children[2].children[0])
-                   else:
-                        DogLangError("Type","Value inside sniff is not boolean.")
-    
-    def print_stmt(self,children):
-            for child in children:
-                if child.type == "expression":
-                    result=self.expression_stmt(child.children)
-                    print(result)
-                    return result
-            
+class Interpreter:
+    """Compiles and runs code straight away, see program.compile to run code more than once.
 
-    
-    def loop_stmt(self,children):
-            # First, evaluate the condition
-            condition_node = next((child for child in children if child.type == "expression"), None)
-            body_nodes = [child for child in children if child.type != "expression"]
-            
-            if condition_node:
-                # Use an iterative while loop instead of recursion
-                while self.expression_stmt(condition_node.children):
-                    # Execute each statement in the loop body
-                    for node in body_nodes:
-                        self.visit(node)
-          
-            
-    def expression_stmt(self,children):
-        expression=""
-        for child in children:
-            if child.type == "STRING_LITERAL":
-                 return child.value
-            if child.type == "IDENTIFIER":
-                entry=self.symbol_table.lookup(child.value) 
-                if entry is None:
-                    raise Exception("Variable not declared")
-                else:
-                    expression += str(entry['value']) # just call lookup and get value
-            else:
-                expression += child.value
-        return eval(expression)
+    output and inputs are where bark writes and fetch reads, see
+    runtime.OutputWriter and runtime.InputReader. limits is a runtime.Limits.
+    """
+    def __init__(self,code,engine="tree",output=None,inputs=None,limits=None):
+        self.program=compile(code,engine)
+        self.names=self.program.names
+        # Values of the variables that have been assigned, by name
+        self.variables=self.program.run(inputs=inputs,output=output,limits=limits)
 
+    @property
+    def symbol_table(self):
+        """The variables as a SymbolTable, for code written against the old interpreter.
 
+        A pack's type names its elements too, as in pack[int].
+        """
+        table = SymbolTable()
+        for name, value in self.variables.items():
+            table.insert(name=name, type=type_name(value), scope="local", value=value)
+        return table
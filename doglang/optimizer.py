@@ -0,0 +1,224 @@
+"""AST optimizer run between parsing and execution.
+
+optimize() rewrites the Program AST from SyntaxAnalyser.parse() in place:
+
+- constant subexpressions are folded, so x = 60 * 60 * 24; stores 86400
+- a sniff whose condition is a constant True or False is replaced by the
+  statements of the branch that would run
+- a wagtail whose condition is constant and falsy is removed
+
+counted_loop() recognizes wagtails that count a variable up or down to a
+fixed bound, which the engines can run as a native range.
+
+Anything that would fail at runtime (1 / 0, "a" - 1, a non boolean sniff
+condition) is left alone so the error still happens when and where it
+would have without the optimizer.
+"""
+import operator
+
+from doglang.ExpressionCompiler import BINARY_OPERATORS
+from doglang.SyntaxAnalyser import AST, LITERAL_TYPES
+from doglang.Tokenizer import Tokens
+
+UNARY_OPERATORS = {
+    '-': operator.neg,
+    '+': operator.pos,
+    '!': operator.not_,
+}
+
+
+def is_constant(node):
+    return node.type in LITERAL_TYPES
+
+
+def constant(value, line=None):
+    return AST(Tokens.LITERAL, value, line)
+
+
+class Optimizer:
+    """Folds constants and removes statically dead branches and loops."""
+
+    def __init__(self):
+        self.folded = 0
+        self.removed = 0
+
+    def optimize(self, ast):
+        ast.children = self.statements(ast.children)
+        return ast
+
+    # statements
+    def statements(self, nodes):
+        result = []
+        for node in nodes:
+            result.extend(self.statement(node))
+        return result
+
+    def statement(self, node):
+        """Return the statements that replace node, which may be none."""
+        if node.type == "assignment":
+            value = node.children[1]
+            if value.type == "expression":
+                self.expression(value)
+            else:  # fetch, the prompt is an expression
+                self.expression(value.children[0])
+            return [node]
+
+        if node.type == "print":
+            self.expression(node.children[0])
+            return [node]
+
+        if node.type == "bury":
+            for child in node.children[1:]:
+                self.expression(child)
+            return [node]
+
+        if node.type == "loop":
+            condition = self.expression(node.children[0])
+            if is_constant(condition) and not condition.value:
+                self.removed += 1
+                return []
+            node.children[1:] = self.statements(node.children[1:])
+            return [node]
+
+        if node.type == "conditional":
+            condition = self.expression(node.children[0])
+            then_block = node.children[1]
+            else_block = node.children[2].children[0] if len(node.children) > 2 else None
+            if is_constant(condition) and type(condition.value) is bool:
+                self.removed += 1
+                if condition.value:
+                    return self.statements(then_block.children)
+                return self.statements(else_block.children) if else_block else []
+            then_block.children = self.statements(then_block.children)
+            if else_block:
+                else_block.children = self.statements(else_block.children)
+            return [node]
+
+        if node.type == "block":
+            node.children = self.statements(node.children)
+        return [node]
+
+    # expressions
+    def expression(self, wrapper):
+        """Fold the tree under an expression wrapper node and return its new root."""
+        wrapper.children[0] = self.fold(wrapper.children[0])
+        return wrapper.children[0]
+
+    def fold(self, node):
+        if not node.children:
+            return node
+        node.children = [self.fold(child) for child in node.children]
+
+        if node.type == "grouping":
+            # Parentheses only matter while parsing
+            return node.children[0]
+
+        if node.type in ("pack", "dig", "call"):
+            # A pack is made afresh every time, since bury changes it
+            return node
+
+        if not all(is_constant(child) for child in node.children):
+            return self.fold_logical(node) if node.type == "logical" else node
+
+        values = [child.value for child in node.children]
+        try:
+            if node.type == "unary":
+                value = UNARY_OPERATORS[node.value](values[0])
+            elif node.type == "logical":
+                value = bool(values[0]) and bool(values[1]) if node.value == '&&' else bool(values[0]) or bool(values[1])
+            else:
+                value = BINARY_OPERATORS[node.value](values[0], values[1])
+        except Exception:
+            # Let the error surface at runtime as it would unoptimized
+            return node
+        self.folded += 1
+        return constant(value, node.line)
+
+    def fold_logical(self, node):
+        """Short circuit && and || when only the left operand is known."""
+        left = node.children[0]
+        if not is_constant(left):
+            return node
+        if node.value == '&&' and not left.value:
+            self.folded += 1
+            return constant(False, node.line)
+        if node.value == '||' and left.value:
+            self.folded += 1
+            return constant(True, node.line)
+        return node
+
+
+def optimize(ast):
+    """Optimize a Program AST in place and return it."""
+    return Optimizer().optimize(ast)
+
+
+# Comparisons a counted loop may use, by the direction the counter moves in
+COUNTING_UP = ('<', '<=')
+COUNTING_DOWN = ('>', '>=')
+
+
+def _unwrap(node):
+    while node.type == "expression" or node.type == "grouping":
+        node = node.children[0]
+    return node
+
+
+def _int_literal(node):
+    return node.type in LITERAL_TYPES and type(node.value) is int
+
+
+def _writes(nodes, names):
+    """True if any of the statements assign one of names, however deeply nested."""
+    pending = list(nodes)
+    while pending:
+        node = pending.pop()
+        if node.type == "assignment" and node.children[0].value in names:
+            return True
+        if node.type in ("loop", "conditional", "block", Tokens.KEYWORD):
+            pending.extend(node.children)
+    return False
+
+
+def counted_loop(node):
+    """(counter, stop, step, comparison) when the wagtail node is a counted loop, else None.
+
+    A counted loop looks like wagtail(i < n){ ...; i = i + 1; }: the
+    condition compares a variable with an int literal or with a variable
+    the body never assigns, the last statement moves the variable by an int
+    literal towards the bound, and nothing else in the body assigns it.
+    counter and stop are the condition's IDENTIFIER and bound nodes, and
+    step is negative when counting down.
+    """
+    condition = _unwrap(node.children[0])
+    body = node.children[1:]
+    if condition.type != "comparison" or not body:
+        return None
+    if condition.value not in COUNTING_UP and condition.value not in COUNTING_DOWN:
+        return None
+    counter, stop = (_unwrap(child) for child in condition.children)
+    if counter.type != Tokens.IDENTIFIER or getattr(counter, "maybe_unset", True):
+        return None
+    if not _int_literal(stop) and not (stop.type == Tokens.IDENTIFIER and stop.value != counter.value):
+        return None
+
+    increment = body[-1]
+    if increment.type != "assignment" or increment.children[0].value != counter.value:
+        return None
+    value = increment.children[1]
+    if value.type != "expression":
+        return None
+    value = _unwrap(value)
+    if value.type != "binary" or value.value not in ('+', '-'):
+        return None
+    left, right = (_unwrap(child) for child in value.children)
+    if left.type != Tokens.IDENTIFIER or left.value != counter.value or not _int_literal(right) or right.value <= 0:
+        return None
+    step = right.value if value.value == '+' else -right.value
+    if (step > 0) != (condition.value in COUNTING_UP):
+        return None
+
+    names = {counter.value, stop.value} if stop.type == Tokens.IDENTIFIER else {counter.value}
+    if _writes(body[:-1], names):
+        return None
+    return counter, stop, step, condition.value
@@ -0,0 +1,137 @@
+"""Compile once, run many times.
+
+compile() runs the whole front end (tokenizer, parser, optimizer and
+semantic analysis) and the chosen engine's compiler, and returns a
+Program. Program.run() executes it with fresh variables, output and input
+every time, so a service that runs the same script per request only pays
+for parsing once. A Program keeps no state between runs and can be shared.
+"""
+from doglang.SemanticAnalyser import SemanticAnalyser
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer
+from doglang.compiler import VM, compile_program
+from doglang.error import DogLangError, DogLangNameError
+from doglang.executor import Executor, LimitedExecutor, prepare
+from doglang.optimizer import optimize
+from doglang.runtime import UNSET, Budget, input_reader, output_writer
+from doglang.transpiler import fetcher, load, memory_check, to_python
+
+ENGINES = ("tree", "vm", "py")
+
+
+class Program:
+    """A compiled DogLang program for one engine.
+
+    names lists the variables by slot. For the tree engine steps holds the
+    prepared statements, for the vm engine bytecode holds the Bytecode and
+    for the py engine ast holds the resolved AST the Python function is
+    generated from. source and declared are the arguments it was compiled
+    from, which is what another process needs to build the same Program.
+    """
+
+    def __init__(self, names, engine="tree", steps=None, bytecode=None, source=None, declared=(), ast=None):
+        self.names = names
+        self.engine = engine
+        self.source = source
+        self.declared = tuple(declared)
+        self.steps = steps
+        self.bytecode = bytecode
+        self.ast = ast
+        self._slots = {name: slot for slot, name in enumerate(names)}
+        # Linking is the same for every run
+        self._code = VM.link(bytecode) if bytecode is not None else None
+        # The py engine's functions, by whether they charge loops and check memory
+        self._functions = {}
+        if ast is not None:
+            self.function(False, False)
+
+    def function(self, charge, memory):
+        """The compiled Python function of a py engine Program, generated on first use."""
+        key = (charge, memory)
+        function = self._functions.get(key)
+        if function is None:
+            function = self._functions[key] = load(to_python(self.ast, self.names, charge, memory))
+        return function
+
+    def run(self, inputs=None, output=None, variables=None, limits=None):
+        """Run the program and return its variables by name.
+
+        inputs and output are as for Interpreter. variables maps names to
+        starting values, each has to be a variable of the program. limits is
+        a runtime.Limits, going over one raises DogLangLimitError.
+        """
+        slots = self.initial_slots(variables)
+        output = output_writer(output, None if limits is None else limits.output)
+        inputs = input_reader(inputs)
+        try:
+            if self.engine == "vm":
+                VM(self.bytecode, output, inputs, slots, self._code, limits).run()
+            elif self.engine == "py":
+                if limits is None:
+                    self.function(False, False)(slots, output.write, fetcher(inputs, output), None, None)
+                else:
+                    budget = Budget(limits)
+                    memory = limits.memory is not None
+                    self.function(True, memory)(slots, output.write, fetcher(inputs, output), budget.spend,
+                                                memory_check(budget) if memory else None)
+            elif limits is not None:
+                LimitedExecutor(slots, output, inputs, limits).execute(self.steps)
+            else:
+                Executor(slots, output, inputs).execute(self.steps)
+        finally:
+            output.flush()
+        return self.assigned(slots)
+
+    def initial_slots(self, variables=None):
+        slots = [UNSET] * len(self.names)
+        if variables:
+            for name, value in variables.items():
+                slot = self._slots.get(name)
+                if slot is None:
+                    raise DogLangNameError(f"Program has no variable '{name}'")
+                slots[slot] = value
+        return slots
+
+    def assigned(self, slots):
+        """The variables in slots that have a value, by name."""
+        return {name: value for name, value in zip(self.names, slots) if value is not UNSET}
+
+    def __repr__(self):
+        return f"Program({self.engine!r}, {len(self.names)} variables)"
+
+
+def compile(code, engine="tree", variables=()):
+    """Compile DogLang source into a Program for engine.
+
+    variables names the variables run() may be given values for. The
+    program may read them without assigning them first.
+    """
+    if engine not in ENGINES:
+        raise DogLangError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}")
+    ast = optimize(SyntaxAnalyser(Tokenizer(code)).parse())
+    # Gives every variable a slot and reports undeclared variables before anything runs
+    names = SemanticAnalyser(ast, variables).names
+    return from_ast(ast, names, engine, code, variables)
+
+
+def from_ast(ast, names, engine="tree", source=None, variables=()):
+    """The Program for a resolved AST and its slot names, what compile() does after the front end."""
+    if engine == "vm":
+        return Program(names, engine, bytecode=compile_program(ast, names), source=source, declared=variables)
+    if engine == "py":
+        return Program(names, engine, source=source, declared=variables, ast=ast)
+    return Program(names, engine, steps=prepare(ast), source=source, declared=variables)
+
+
+def check(code):
+    """Find every syntax error in code without running anything.
+
+    Returns the AST of the statements that did parse and the list of
+    DogLangSyntaxErrors, each with its line and column, in source order.
+    """
+    errors = []
+    parser = SyntaxAnalyser(Tokenizer(code, errors), recover=True)
+    ast = parser.parse()
+    errors += parser.errors
+    errors.sort(key=lambda error: (error.line or 0, error.column or 0))
+    return ast, errors
@@ -0,0 +1,96 @@
+"""Run one compiled program against many input sets at once.
+
+run_many() fans the runs out over a concurrent.futures pool. Every run gets
+its own variables and its own output buffer, and the results come back in
+the order of the input sets.
+
+With the default process pool each worker process compiles the program once
+from its source, since the compiled closures cannot be pickled, and then
+serves many runs. A thread pool shares the Program itself, which is safe
+because a Program keeps no state between runs, but only helps scripts that
+spend their time waiting on input.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import StringIO
+
+from doglang.error import DogLangError
+from doglang.program import compile
+
+POOLS = ("process", "thread")
+
+
+class RunResult:
+    """What one run produced.
+
+    output is everything it barked. variables holds the assigned variables by
+    name, or None when the run failed with error.
+    """
+    __slots__ = ('output', 'variables', 'error')
+
+    def __init__(self, output, variables=None, error=None):
+        self.output = output
+        self.variables = variables
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"RunResult(error={self.error!r})"
+        return f"RunResult({self.output!r}, {self.variables!r})"
+
+
+def run_captured(program, inputs=None, variables=None, limits=None):
+    """Run program once with a private output buffer, catching any error."""
+    output = StringIO()
+    try:
+        values = program.run(inputs=inputs, output=output, variables=variables, limits=limits)
+    except Exception as error:
+        # One failing script must not take the rest of the batch down with it
+        return RunResult(output.getvalue(), error=error)
+    return RunResult(output.getvalue(), values)
+
+
+# The Program of a worker process, compiled once by _start_worker
+_worker_program = None
+
+
+def _start_worker(source, engine, declared):
+    global _worker_program
+    _worker_program = compile(source, engine, declared)
+
+
+def _run_in_worker(job):
+    inputs, variables, limits = job
+    return run_captured(_worker_program, inputs, variables, limits)
+
+
+def run_many(program, input_sets, variables=None, workers=None, pool="process", limits=None):
+    """Run program once per input set and return the RunResults in order.
+
+    Each input set is what fetch reads in that run, as for Program.run.
+    variables gives the same starting values to every run, and limits the
+    same runtime.Limits. workers defaults to the number of CPUs, and pool
+    picks processes or threads.
+    """
+    if pool not in POOLS:
+        raise DogLangError(f"Unknown pool '{pool}', expected one of {', '.join(POOLS)}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if pool == "thread":
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(lambda inputs: run_captured(program, inputs, variables, limits), input_sets))
+
+    if program.source is None:
+        raise DogLangError("Program has no source to compile in worker processes")
+    # Files and generators cannot be sent to another process, their lines can
+    jobs = [(None if inputs is None else list(inputs), variables, limits) for inputs in input_sets]
+    # Large chunks keep the cost of sending jobs low, several per worker keep the load even
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=_start_worker,
+                             initargs=(program.source, program.engine, program.declared)) as executor:
+        return list(executor.map(_run_in_worker, jobs, chunksize=chunksize))
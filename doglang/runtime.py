@@ -0,0 +1,444 @@
+"""Runtime helpers shared by every DogLang execution engine."""
+import operator
+import sys
+import time
+from array import array
+
+from doglang.error import DogLangError, DogLangIndexError, DogLangLimitError
+from doglang.vector import combine, compact, largest, smallest, total
+
+# Marks a variable slot that has not been assigned yet
+UNSET = object()
+
+COMPARISONS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+# Budgets check the clock, and the step limit, once every this many steps
+CHECK_INTERVAL = 1000
+
+
+def coerce_input(value):
+    """Turn numeric text read by fetch into an int or float, leave anything else as a string."""
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+class CountedRange:
+    """The values the counter of a counted wagtail takes, see optimizer.counted_loop.
+
+    With int bounds it iterates a native range. Any other values step
+    through the same comparison and addition the wagtail itself would make,
+    with the same errors. After the loop, end is the value the counter is
+    left with: the first one that failed the condition.
+    """
+    __slots__ = ('start', 'stop', 'step', 'comparison', 'end')
+
+    def __init__(self, start, stop, step, comparison):
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.comparison = comparison
+        self.end = start
+
+    def __iter__(self):
+        start, stop, step = self.start, self.stop, self.step
+        if type(start) is not int or type(stop) is not int:
+            return self._stepped()
+        if self.comparison == '<=':
+            stop += 1
+        elif self.comparison == '>=':
+            stop -= 1
+        values = range(start, stop, step)
+        if values:
+            self.end = values[-1] + step
+        return iter(values)
+
+    def _stepped(self):
+        compare = COMPARISONS[self.comparison]
+        value, stop, step = self.start, self.stop, self.step
+        while True:
+            self.end = value
+            if not compare(value, stop):
+                return
+            yield value
+            value = value + step
+
+
+class Pack:
+    """A DogLang array, made by pack[...], read by dig and written by bury.
+
+    A pack of nothing but ints keeps them in an array.array of 64 bit
+    machine ints, 8 bytes each rather than a pointer and an int object, and
+    a pack of nothing but floats in an array of doubles. The first value
+    that does not fit, a string, a bool or an int too big for 64 bits in an
+    int pack, turns the storage into a list once and for all. Like a
+    Python list a pack is shared: after b = a; a bury into a shows in b.
+
+    Arithmetic and comparisons work element by element, see vector.combine,
+    so pack[1, 2] * 2 is pack[2, 4] and pack[1, 5] > 2 the mask
+    pack[False, True].
+    """
+    __slots__ = ('items',)
+
+    def __init__(self, values=()):
+        self.items = compact(values)
+
+    @property
+    def element_type(self):
+        """'int' or 'float' for a compact pack, else the type every element has or 'mixed'."""
+        items = self.items
+        if type(items) is array:
+            return "int" if items.typecode == 'q' else "float"
+        types = set(map(type_name, items))
+        return types.pop() if len(types) == 1 else "mixed"
+
+    def copy(self):
+        pack = Pack.__new__(Pack)
+        # A slice of an array copies the machine values as they are
+        pack.items = self.items[:]
+        return pack
+
+    def bury(self, index, value):
+        items = self.items
+        if type(index) is not int or not 0 <= index < len(items):
+            raise _index_error("bury", self, index)
+        if type(items) is array:
+            if type(value) is (int if items.typecode == 'q' else float):
+                try:
+                    items[index] = value
+                    return
+                except OverflowError:
+                    pass
+            items = self.items = items.tolist()
+        items[index] = value
+
+    def append(self, value):
+        items = self.items
+        if type(items) is array:
+            if type(value) is (int if items.typecode == 'q' else float):
+                try:
+                    items.append(value)
+                    return
+                except OverflowError:
+                    pass
+            items = self.items = items.tolist()
+        items.append(value)
+
+    def _combine(self, op, other, reflected=False):
+        other = other.items if type(other) is Pack else other
+        pack = Pack.__new__(Pack)
+        pack.items = combine(op, other, self.items) if reflected else combine(op, self.items, other)
+        return pack
+
+    def __add__(self, other):
+        return self._combine('+', other)
+
+    def __radd__(self, other):
+        return self._combine('+', other, True)
+
+    def __sub__(self, other):
+        return self._combine('-', other)
+
+    def __rsub__(self, other):
+        return self._combine('-', other, True)
+
+    def __mul__(self, other):
+        return self._combine('*', other)
+
+    def __rmul__(self, other):
+        return self._combine('*', other, True)
+
+    def __truediv__(self, other):
+        return self._combine('/', other)
+
+    def __rtruediv__(self, other):
+        return self._combine('/', other, True)
+
+    def __mod__(self, other):
+        return self._combine('%', other)
+
+    def __rmod__(self, other):
+        return self._combine('%', other, True)
+
+    # Python turns a comparison around when the pack is on the right, 1 < p becomes p > 1
+    def __eq__(self, other):
+        return self._combine('==', other)
+
+    def __ne__(self, other):
+        return self._combine('!=', other)
+
+    def __lt__(self, other):
+        return self._combine('<', other)
+
+    def __le__(self, other):
+        return self._combine('<=', other)
+
+    def __gt__(self, other):
+        return self._combine('>', other)
+
+    def __ge__(self, other):
+        return self._combine('>=', other)
+
+    __hash__ = None
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __sizeof__(self):
+        # The storage belongs to the pack alone, so it counts towards memory limits
+        return object.__sizeof__(self) + sys.getsizeof(self.items)
+
+    def __str__(self):
+        if type(self.items) is array:
+            return "[" + ", ".join(map(str, self.items)) + "]"
+        return "[" + ", ".join(f'"{value}"' if type(value) is str else str(value) for value in self.items) + "]"
+
+    def __repr__(self):
+        return f"pack{self}"
+
+
+def type_name(value):
+    """The name of a value's type, for a pack with the type of its elements: pack[int]."""
+    if type(value) is Pack:
+        return f"pack[{value.element_type}]"
+    return type(value).__name__
+
+
+def _index_error(action, values, index):
+    if type(values) is not Pack:
+        return DogLangError(f"Cannot {action} in {type_name(values)}, only in a pack")
+    if type(index) is not int:
+        return DogLangError(f"Pack index must be an int, not {type_name(index)}")
+    return DogLangIndexError(f"Pack index {index} is out of range for a pack of {len(values)}")
+
+
+def dig(values, index):
+    """values[index] for dig, O(1) and bounds checked."""
+    if type(values) is Pack:
+        items = values.items
+        if type(index) is int and 0 <= index < len(items):
+            return items[index]
+    raise _index_error("dig", values, index)
+
+
+def bury(values, index, value):
+    """values[index] = value for bury."""
+    if type(values) is not Pack:
+        raise _index_error("bury", values, index)
+    values.bury(index, value)
+
+
+def append(values, value):
+    """Add value to the end of a pack, for bury values[] = value."""
+    if type(values) is not Pack:
+        raise DogLangError(f"Cannot bury in {type_name(values)}, only in a pack")
+    values.append(value)
+
+
+def _elements(name, values):
+    if type(values) is not Pack:
+        raise DogLangError(f"{name} needs a pack, not {type_name(values)}")
+    if not values.items and name != "tally":
+        raise DogLangError(f"{name} of an empty pack")
+    return values.items
+
+
+def tally(values):
+    """The sum of a pack's elements, for a mask how many are true."""
+    return total(_elements("tally", values))
+
+
+def runt(values):
+    """The smallest element of a pack."""
+    return smallest(_elements("runt", values))
+
+
+def topdog(values):
+    """The largest element of a pack."""
+    return largest(_elements("topdog", values))
+
+
+# Built-in functions by name, each takes one value
+BUILTINS = {"tally": tally, "runt": runt, "topdog": topdog}
+
+
+class Limits:
+    """How much one run may do, None leaves a limit off.
+
+    steps is the number of statements executed, time the wall clock seconds,
+    output the number of characters barked and memory the bytes held by
+    variables (as sys.getsizeof counts them).
+    """
+    __slots__ = ('steps', 'time', 'output', 'memory')
+
+    def __init__(self, steps=None, time=None, output=None, memory=None):
+        self.steps = steps
+        self.time = time
+        self.output = output
+        self.memory = memory
+
+    def __repr__(self):
+        return f"Limits(steps={self.steps!r}, time={self.time!r}, output={self.output!r}, memory={self.memory!r})"
+
+
+class Budget:
+    """What one run has used of its Limits.
+
+    Engines count steps down locally and only call spend() when the allowance
+    it last returned runs out, so the clock is read once per CHECK_INTERVAL
+    steps at most.
+    """
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.steps = 0
+        self.deadline = None if limits.time is None else time.monotonic() + limits.time
+
+    def spend(self, steps):
+        """Charge steps, raise if a limit is exceeded, return how many steps may run before the next call."""
+        self.steps += steps
+        limits = self.limits
+        if limits.steps is not None and self.steps > limits.steps:
+            raise DogLangLimitError(f"Step limit of {limits.steps} exceeded", "steps")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise DogLangLimitError(f"Time limit of {limits.time} seconds exceeded", "time")
+        if limits.steps is None:
+            return CHECK_INTERVAL
+        # Stop exactly at the step after the last one allowed
+        return min(CHECK_INTERVAL, limits.steps - self.steps + 1)
+
+    def check_memory(self, used):
+        if used > self.limits.memory:
+            raise DogLangLimitError(f"Memory limit of {self.limits.memory} bytes exceeded", "memory")
+
+
+class InputReader:
+    """Where fetch reads its lines from.
+
+    source is any iterable of lines, such as an open file, a list or a
+    generator. Without one fetch reads standard input: through input(), which
+    shows the prompt, or when prompts is False straight from sys.stdin, which
+    is much faster for piped data. Prompts are never shown for a source.
+    """
+
+    def __init__(self, source=None, prompts=True):
+        # Interactive readers show a prompt, so pending output must be flushed first
+        self.interactive = source is None and prompts
+        if self.interactive:
+            self.read = self._read_interactive
+        else:
+            self._lines = iter(sys.stdin if source is None else source)
+
+    def read(self, prompt):
+        """Return the next line of input without its line ending."""
+        try:
+            line = next(self._lines)
+        except StopIteration:
+            raise DogLangError("fetch found no more input") from None
+        return line.rstrip("\r\n")
+
+    def _read_interactive(self, prompt):
+        try:
+            return input(prompt)
+        except EOFError:
+            raise DogLangError("fetch found no more input") from None
+
+
+def input_reader(inputs=None):
+    """An InputReader for inputs, which may already be one or an iterable of lines."""
+    if isinstance(inputs, InputReader):
+        return inputs
+    return InputReader(inputs)
+
+
+class OutputWriter:
+    """Collects bark output and writes it to a file-like target.
+
+    By default lines are joined in memory and written in one call once
+    buffer_size characters have built up, and when the program ends. With
+    line_buffering every line is written and flushed right away, which is
+    what an interactive session wants.
+
+    target is anything with a write() method, sys.stdout when not given.
+    With max_size set, writing more than that many characters in total
+    raises DogLangLimitError. What fits under the limit is still written.
+    """
+
+    def __init__(self, target=None, line_buffering=False, buffer_size=8192, max_size=None):
+        self.target = sys.stdout if target is None else target
+        self.line_buffering = line_buffering
+        self.buffer_size = buffer_size
+        self.written = 0
+        self._parts = []
+        self._size = 0
+        self.max_size = max_size
+        if line_buffering:
+            self.write = self._write_line
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size):
+        self._max_size = max_size
+        # Never buffer far past the limit, the check happens when writing out
+        self._threshold = self.buffer_size if max_size is None else min(self.buffer_size, max_size + 1)
+
+    def write(self, value):
+        """Output value followed by a newline, the way print() would."""
+        text = str(value) + "\n"
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self._threshold:
+            self.flush()
+
+    def _write_line(self, value):
+        self._write_out(str(value) + "\n")
+        self._flush_target()
+
+    def flush(self):
+        """Write out anything still buffered."""
+        if self._parts:
+            text = "".join(self._parts)
+            self._parts.clear()
+            self._size = 0
+            self._write_out(text)
+        self._flush_target()
+
+    def _write_out(self, text):
+        self.written += len(text)
+        if self._max_size is not None and self.written > self._max_size:
+            fits = len(text) - (self.written - self._max_size)
+            self.target.write(text[:fits])
+            self.written = self._max_size
+            self._flush_target()
+            raise DogLangLimitError(f"Output limit of {self._max_size} characters exceeded", "output")
+        self.target.write(text)
+
+    def _flush_target(self):
+        flush = getattr(self.target, "flush", None)
+        if flush is not None:
+            flush()
+
+
+def output_writer(output=None, max_size=None):
+    """An OutputWriter for output, which may already be one or a file-like object.
+
+    A max_size is the limit of one run and never changes a writer passed
+    in: the run gets a writer of its own on the same target instead, which
+    counts only what the run writes.
+    """
+    if not isinstance(output, OutputWriter):
+        return OutputWriter(output, max_size=max_size)
+    if max_size is None:
+        return output
+    # Whatever the shared writer holds has to come out first
+    output.flush()
+    return OutputWriter(output.target, output.line_buffering, output.buffer_size, max_size)
@@ -0,0 +1,276 @@
+"""Transpile DogLang to Python and let CPython run it.
+
+to_python() turns a resolved Program AST into a Python ast.Module that
+defines one function. Every DogLang variable becomes a local of that
+function, a wagtail becomes a while loop, a sniff an if/else and a bark a
+call that writes to the output. Packs are runtime.Pack objects, which dig
+and bury reach through the runtime functions of the same names. A counted wagtail, see
+optimizer.counted_loop, becomes a for loop over a runtime.CountedRange.
+load() compiles the module once and returns
+the function, which Program.run() then calls with the slots, output and
+input of each run:
+
+    def __doglang__(_slots, _write, _fetch, _spend, _memory):
+        count_0 = _slots[0]
+        count_0 = 0
+        while count_0 < 10:
+            _write(count_0)
+            count_0 = count_0 + 1
+        _slots[0] = count_0
+
+Statements keep their DogLang line numbers, so a traceback points at the
+.doggy line that failed. python_source() gives the generated code as text.
+
+With limits every statement charges one step before it runs, and so does
+each pass of a wagtail with an empty body, as in the other engines. That is
+a different function, generated when a Program is first run with limits, so
+runs without limits carry no accounting at all.
+"""
+import ast as py
+import sys
+
+from doglang.SemanticAnalyser import undeclared
+from doglang.SyntaxAnalyser import LITERAL_TYPES
+from doglang.Tokenizer import Tokens
+from doglang.error import DogLangError
+from doglang.optimizer import counted_loop
+from doglang.runtime import BUILTINS, UNSET, CountedRange, Pack, append, bury, coerce_input, dig
+
+FUNCTION_NAME = "__doglang__"
+PARAMETERS = ("_slots", "_write", "_fetch", "_spend", "_memory")
+
+BINARY_NODES = {'+': py.Add, '-': py.Sub, '*': py.Mult, '/': py.Div, '%': py.Mod}
+COMPARE_NODES = {'==': py.Eq, '!=': py.NotEq, '>': py.Gt, '<': py.Lt, '>=': py.GtE, '<=': py.LtE}
+UNARY_NODES = {'-': py.USub, '+': py.UAdd, '!': py.Not}
+
+
+def _unset(name):
+    raise undeclared(name)
+
+
+def _not_boolean():
+    raise DogLangError("Value inside sniff is not boolean.")
+
+
+def _name(name, store=False):
+    return py.Name(name, py.Store() if store else py.Load())
+
+
+def _call(function, *arguments):
+    return py.Call(_name(function), list(arguments), [])
+
+
+def _assign(target, value):
+    return py.Assign([_name(target, store=True)], value)
+
+
+def _unwrap(node):
+    while node.type == "expression" or node.type == "grouping":
+        node = node.children[0]
+    return node
+
+
+def is_boolean(node):
+    """True when node always evaluates to a bool, so it needs no bool() or type check.
+
+    Comparisons are not, with a pack on either side one gives a mask.
+    """
+    node = _unwrap(node)
+    if node.type == "logical":
+        return True
+    if node.type == "unary":
+        return node.value == '!'
+    return node.type in LITERAL_TYPES and type(node.value) is bool
+
+
+class Transpiler:
+    """Builds the Python ast.Module for one resolved Program AST.
+
+    charge adds the step accounting to every statement, memory also checks
+    the size of the variables each time.
+    """
+
+    def __init__(self, names, charge=False, memory=False):
+        self.names = names
+        self.charge = charge or memory
+        self.memory = memory
+        # Counted loops so far, each keeps its CountedRange in a local of its own
+        self.ranges = 0
+        self.locals = []
+        for slot, name in enumerate(names):
+            local = f"{name}_{slot}"
+            # The slot keeps locals apart, even for names Python would normalize to the same one
+            self.locals.append(local if local.isidentifier() else f"v_{slot}")
+
+    def module(self, ast):
+        body = [_assign(local, py.Subscript(_name("_slots"), py.Constant(slot), py.Load()))
+                for slot, local in enumerate(self.locals)]
+        if self.charge:
+            body.append(py.Assign([_name("_allowance", True), _name("_countdown", True)], py.Constant(0)))
+        if self.memory:
+            # Starting variables count too
+            body.append(self.memory_check())
+        body += self.statements(ast.children)
+        body += [py.Assign([py.Subscript(_name("_slots"), py.Constant(slot), py.Store())], _name(local))
+                 for slot, local in enumerate(self.locals)]
+        arguments = py.arguments(posonlyargs=[], args=[py.arg(name) for name in PARAMETERS], vararg=None,
+                                 kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[])
+        function = py.FunctionDef(FUNCTION_NAME, arguments, body or [py.Pass()], [], None)
+        function.lineno = function.end_lineno = 1
+        return py.fix_missing_locations(py.Module([function], []))
+
+    def statements(self, nodes):
+        """Python statements for DogLang statements, each charged first when there are limits."""
+        result = []
+        for node in nodes:
+            statements = self.statement(node)
+            if self.charge and node.type != "block":
+                statements = self.charges() + statements
+            for statement in statements:
+                statement.lineno = statement.end_lineno = node.line or 1
+            result += statements
+        return result
+
+    def statement(self, node):
+        kind = node.type
+        if kind == "assignment":
+            target, value = node.children
+            local = self.locals[target.slot]
+            if value.type == "expression":
+                return [_assign(local, self.expression(value))]
+            # fetch, the prompt is an expression
+            return [_assign(local, _call("_fetch", self.expression(value.children[0])))]
+        if kind == "print":
+            return [py.Expr(_call("_write", self.expression(node.children[0])))]
+        if kind == "bury":
+            operands = [self.expression(child) for child in node.children]
+            return [py.Expr(_call("_append" if node.value == "append" else "_bury", *operands))]
+        if kind == "loop":
+            loop = counted_loop(node)
+            if loop is not None:
+                return self.counted(node, *loop)
+            body = self.statements(node.children[1:])
+            if self.charge and not body:
+                # A pass that runs no statement is a step of its own
+                body = self.charges()
+            return [py.While(self.expression(node.children[0]), body or [py.Pass()], [])]
+        if kind == "conditional":
+            body = self.statements(node.children[1].children)
+            orelse = []
+            if len(node.children) > 2:
+                orelse = self.statements(node.children[2].children[0].children)
+            condition = node.children[0]
+            if is_boolean(condition):
+                return [py.If(self.expression(condition), body or [py.Pass()], orelse)]
+            # Only a real bool may decide a sniff
+            check = py.If(py.Compare(_name("_condition"), [py.Is()], [py.Constant(False)]),
+                          orelse or [py.Pass()], [py.Expr(_call("_not_boolean"))])
+            return [_assign("_condition", self.expression(condition)),
+                    py.If(py.Compare(_name("_condition"), [py.Is()], [py.Constant(True)]),
+                          body or [py.Pass()], [check])]
+        if kind == "block":
+            return self.statements(node.children)
+        raise DogLangError(f"Cannot transpile statement '{kind}'")
+
+    def counted(self, node, counter, stop, step, comparison):
+        """A for loop over a CountedRange, which leaves the counter where the wagtail would."""
+        counter = self.locals[counter.slot]
+        values = f"_range{self.ranges}"
+        self.ranges += 1
+        # The last statement is the increment, the CountedRange does that
+        body = self.statements(node.children[1:-1])
+        if self.charge:
+            # but it is still a statement that runs at the end of every pass
+            body += self.charges()
+        return [_assign(values, _call("_CountedRange", _name(counter), self.expression(stop), py.Constant(step),
+                                      py.Constant(comparison))),
+                py.For(_name(counter, store=True), _name(values), body or [py.Pass()], []),
+                _assign(counter, py.Attribute(_name(values), "end", py.Load()))]
+
+    def charges(self):
+        """Charge one step, the same accounting as runtime.Budget users elsewhere."""
+        statements = [
+            py.AugAssign(_name("_countdown", True), py.Sub(), py.Constant(1)),
+            py.If(py.Compare(_name("_countdown"), [py.LtE()], [py.Constant(0)]),
+                  [py.Assign([_name("_allowance", True), _name("_countdown", True)],
+                             _call("_spend", py.BinOp(_name("_allowance"), py.Sub(), _name("_countdown"))))],
+                  []),
+        ]
+        if self.memory:
+            statements.append(self.memory_check())
+        return statements
+
+    def memory_check(self):
+        return py.Expr(_call("_memory", py.Tuple([_name(local) for local in self.locals], py.Load())))
+
+    def expression(self, node):
+        node = _unwrap(node)
+        kind = node.type
+        if kind in LITERAL_TYPES:
+            return py.Constant(node.value)
+        if kind == Tokens.IDENTIFIER:
+            local = _name(self.locals[node.slot])
+            if not node.maybe_unset:
+                return local
+            return py.IfExp(py.Compare(local, [py.IsNot()], [_name("_UNSET")]), local,
+                            _call("_unset", py.Constant(node.value)))
+        if kind == "unary":
+            return py.UnaryOp(UNARY_NODES[node.value](), self.expression(node.children[0]))
+        if kind == "pack":
+            elements = [_unwrap(child) for child in node.children]
+            if all(element.type in LITERAL_TYPES for element in elements):
+                return _call("_Pack", py.Constant(tuple(element.value for element in elements)))
+            return _call("_Pack", py.List([self.expression(element) for element in elements], py.Load()))
+        if kind == "dig":
+            return _call("_dig", *(self.expression(child) for child in node.children))
+        if kind == "call":
+            return _call(f"_{node.value}", self.expression(node.children[0]))
+        if kind == "logical":
+            operands = [self.expression(child) if is_boolean(child) else _call("bool", self.expression(child))
+                        for child in node.children]
+            return py.BoolOp(py.And() if node.value == '&&' else py.Or(), operands)
+        left, right = (self.expression(child) for child in node.children)
+        if node.value in COMPARE_NODES:
+            return py.Compare(left, [COMPARE_NODES[node.value]()], [right])
+        return py.BinOp(left, BINARY_NODES[node.value](), right)
+
+
+def to_python(ast, names, charge=False, memory=False):
+    """The Python ast.Module for a resolved Program AST."""
+    return Transpiler(names, charge, memory).module(ast)
+
+
+def load(module):
+    """Compile a module from to_python() and return its function."""
+    namespace = {"_UNSET": UNSET, "_unset": _unset, "_not_boolean": _not_boolean, "_CountedRange": CountedRange,
+                 "_Pack": Pack, "_dig": dig, "_bury": bury, "_append": append}
+    namespace.update((f"_{name}", function) for name, function in BUILTINS.items())
+    try:
+        code = compile(module, "<doglang>", "exec")
+    except (SyntaxError, RecursionError) as error:
+        # CPython allows only so many nested loops in one function
+        raise DogLangError(f"Program is nested too deeply for the py engine: {error}") from None
+    exec(code, namespace)
+    return namespace[FUNCTION_NAME]
+
+
+def python_source(ast, names, charge=False, memory=False):
+    """The generated Python code as text, for reading and debugging."""
+    return py.unparse(to_python(ast, names, charge, memory)) + "\n"
+
+
+def fetcher(inputs, output):
+    """The _fetch argument of a run: read a value for fetch, as Executor.fetch does."""
+    def fetch(prompt):
+        if inputs.interactive:
+            # The prompt has to appear after everything barked so far
+            output.flush()
+        return coerce_input(inputs.read(prompt))
+    return fetch
+
+
+def memory_check(budget):
+    """The _memory argument of a run with a memory limit."""
+    def check(values):
+        budget.check_memory(sum(sys.getsizeof(value) for value in values if value is not UNSET))
+    return check
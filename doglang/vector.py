@@ -0,0 +1,202 @@
+"""Whole-pack operations, on NumPy when it is installed.
+
+runtime.Pack keeps its elements in an array.array of 64 bit ints ('q') or
+of doubles ('d'), or in a list when the types are mixed. Its operators and
+the tally, runt and topdog built-ins work on that storage through this
+module:
+
+- combine() applies an arithmetic operator or a comparison element by
+  element, between two packs of the same length or a pack and one value.
+  Comparisons give masks, packs of booleans.
+- total(), smallest() and largest() reduce a pack to one value.
+
+With NumPy the typed arrays are viewed in place with numpy.frombuffer and
+the loop runs in C. Python's results come first though: NumPy is only used
+where it gives exactly what Python would, so int results that could
+overflow 64 bits, division by zero, float remainders and float sums take
+the Python path. That path maps the operator over the storage, it is the
+only one without NumPy and gives the same results, only slower.
+"""
+import operator
+from array import array
+from itertools import repeat
+
+from doglang.error import DogLangError
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+}
+
+BACKENDS = ("numpy", "python")
+
+# Ints NumPy may work with must stay below this in magnitude, or int64 overflows
+INT64_LIMIT = 2 ** 63
+# Above this not every int is a float, and NumPy turns ints into floats before dividing or comparing
+EXACT_FLOAT = 2 ** 53
+
+_backend = "python" if numpy is None else "numpy"
+
+
+def backend():
+    """The backend in use, "numpy" or "python"."""
+    return _backend
+
+
+def use_backend(name):
+    """Switch to backend name and return the one used before."""
+    global _backend
+    if name not in BACKENDS:
+        raise DogLangError(f"Unknown backend '{name}', expected one of {', '.join(BACKENDS)}")
+    if name == "numpy" and numpy is None:
+        raise DogLangError("The numpy backend needs NumPy installed")
+    previous, _backend = _backend, name
+    return previous
+
+
+def compact(values):
+    """Storage for values: an array when they are all ints that fit one or all floats, else a list."""
+    if type(values) is array and values.typecode in ('q', 'd'):
+        return values[:]
+    if type(values) is not list and type(values) is not tuple:
+        values = list(values)
+    # The types are collected in C, no element is looked at from Python
+    types = set(map(type, values))
+    if types <= {int}:
+        try:
+            return array('q', values)
+        except OverflowError:
+            pass
+    elif types == {float}:
+        return array('d', values)
+    return list(values)
+
+
+def _is_storage(value):
+    return type(value) is array or type(value) is list
+
+
+def combine(op, left, right):
+    """left op right element by element, each is a pack's storage or a single value."""
+    if _is_storage(left) and _is_storage(right) and len(left) != len(right):
+        raise DogLangError(f"Cannot combine packs of {len(left)} and {len(right)} values")
+    if _backend == "numpy":
+        result = _numpy_combine(op, left, right)
+        if result is not None:
+            return result
+    function = OPERATORS[op]
+    if not _is_storage(left):
+        left = repeat(left)
+    elif not _is_storage(right):
+        right = repeat(right)
+    return compact(list(map(function, left, right)))
+
+
+def total(items):
+    """The sum of the elements, a mask's is how many are true."""
+    if _backend == "numpy" and type(items) is array and items.typecode == 'q' and items:
+        values = numpy.frombuffer(items, numpy.int64)
+        if len(items) * _magnitude(values) < INT64_LIMIT:
+            return int(values.sum())
+    return sum(items)
+
+
+def smallest(items):
+    if _backend == "numpy" and type(items) is array and items.typecode == 'q':
+        return int(numpy.frombuffer(items, numpy.int64).min())
+    return min(items)
+
+
+def largest(items):
+    if _backend == "numpy" and type(items) is array and items.typecode == 'q':
+        return int(numpy.frombuffer(items, numpy.int64).max())
+    return max(items)
+
+
+# NumPy
+
+def _view(value):
+    """value as NumPy sees it: a typed array viewed in place, or an int or float. None if NumPy must not take it."""
+    if type(value) is array:
+        if not value:
+            return None
+        return numpy.frombuffer(value, numpy.int64 if value.typecode == 'q' else numpy.float64)
+    if type(value) is int:
+        return value if -INT64_LIMIT < value < INT64_LIMIT else None
+    if type(value) is float:
+        return value
+    return None
+
+
+def _is_int(value):
+    if type(value) is int:
+        return True
+    return type(value) is not float and value.dtype.kind == 'i'
+
+
+def _magnitude(value):
+    """The largest absolute value, as a Python int so it cannot overflow."""
+    if type(value) is int:
+        return abs(value)
+    return max(-int(value.min()), int(value.max()))
+
+
+def _has_zero(value):
+    if type(value) is int or type(value) is float:
+        return value == 0
+    return not value.all()
+
+
+def _numpy_combine(op, left, right):
+    left, right = _view(left), _view(right)
+    if left is None or right is None:
+        return None
+    ints = _is_int(left) and _is_int(right)
+    if op in ('+', '-', '*'):
+        if ints:
+            left_size, right_size = _magnitude(left), _magnitude(right)
+            size = left_size * right_size if op == '*' else left_size + right_size
+            if size >= INT64_LIMIT:
+                return None
+    elif op == '/':
+        # Python divides ints exactly, NumPy makes them floats first
+        if _has_zero(right) or (ints and max(_magnitude(left), _magnitude(right)) > EXACT_FLOAT):
+            return None
+    elif op == '%':
+        if not ints or _has_zero(right) or _magnitude(left) >= INT64_LIMIT:
+            return None
+    elif not ints:
+        # Python compares an int with a float exactly
+        for value in (left, right):
+            if _is_int(value) and _magnitude(value) > EXACT_FLOAT:
+                return None
+    with numpy.errstate(all="ignore"):
+        result = OPERATORS[op](left, right)
+    return _storage(result)
+
+
+def _storage(result):
+    """Pack storage for a NumPy result."""
+    if result.dtype.kind == 'b':
+        return result.tolist()
+    if result.dtype.kind == 'i':
+        items, result = array('q'), numpy.ascontiguousarray(result, numpy.int64)
+    else:
+        items, result = array('d'), numpy.ascontiguousarray(result, numpy.float64)
+    # One copy of the raw bytes, the elements are never boxed
+    items.frombytes(memoryview(result).cast('B'))
+    return items
@@ -2,7 +2,6 @@
 import sys
 import os
 from io import StringIO
-from contextlib import contextmanager
 
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -11,22 +10,19 @@ import pytest
 from doglang.main import Interpreter
 
 
+@pytest.fixture(params=["tree", "vm", "py"])
+def engine(request):
+    """Fixture that runs a test once per execution engine"""
+    return request.param
+
+
 @pytest.fixture
-def capture_output():
-    """Fixture to capture stdout from DogLang code execution"""
-    @contextmanager
-    def _capture():
-        old_stdout = sys.stdout
-        sys.stdout = StringIO()
-        try:
-            yield sys.stdout
-        finally:
-            sys.stdout = old_stdout
-    
+def capture_output(engine):
+    """Fixture to capture the output of DogLang code execution"""
     def _run_and_capture(code):
-        with _capture() as output:
-            Interpreter(code)
-            return output.getvalue().strip()
+        output = StringIO()
+        Interpreter(code, engine=engine, output=output)
+        return output.getvalue().strip()
     
     return _run_and_capture
 
@@ -0,0 +1,181 @@
+"""Tests for running DogLang inside an asyncio event loop"""
+import asyncio
+import io
+import threading
+
+import pytest
+from doglang.async_interpreter import AsyncInterpreter
+from doglang.error import DogLangError
+from doglang.program import compile
+
+COUNT = 'i = 0; wagtail(i < limit){ bark(i); i = i + 1; }'
+
+
+class Channel:
+    """An async output channel that records what it was sent."""
+
+    def __init__(self):
+        self.values = []
+        self.flushed = False
+
+    async def write(self, value):
+        self.values.append(value)
+
+    async def flush(self):
+        self.flushed = True
+
+
+class AsyncLines:
+    def __init__(self, lines):
+        self.lines = list(lines)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.lines:
+            raise StopAsyncIteration
+        await asyncio.sleep(0)
+        return self.lines.pop(0)
+
+
+def test_run_returns_variables_and_writes_to_channel():
+    channel = Channel()
+    program = compile(COUNT, variables=["limit"])
+    interpreter = AsyncInterpreter(program, output=channel, variables={"limit": 3})
+    variables = asyncio.run(interpreter.run())
+    assert channel.values == [0, 1, 2]
+    assert channel.flushed
+    assert variables == {"limit": 3, "i": 3}
+    assert interpreter.variables == variables
+
+
+def test_fetch_awaits_an_async_iterable():
+    channel = Channel()
+    code = 'a = fetch("a? "); b = fetch("b? "); bark(a + b);'
+    asyncio.run(AsyncInterpreter(code, inputs=AsyncLines(["40\n", "2"]), output=channel).run())
+    assert channel.values == [42]
+
+
+def test_fetch_awaits_a_read_method():
+    prompts = []
+
+    class Prompter:
+        async def read(self, prompt):
+            prompts.append(prompt)
+            return "woof"
+
+    channel = Channel()
+    asyncio.run(AsyncInterpreter('x = fetch("say? "); bark(x);', inputs=Prompter(), output=channel).run())
+    assert prompts == ["say? "]
+    assert channel.values == ["woof"]
+
+
+def test_plain_inputs_and_file_output_work_too():
+    output = io.StringIO()
+    asyncio.run(AsyncInterpreter('x = fetch(""); bark(x * 2);', inputs=["21"], output=output).run())
+    assert output.getvalue() == "42\n"
+
+
+def test_running_out_of_async_input():
+    with pytest.raises(DogLangError, match="no more input"):
+        asyncio.run(AsyncInterpreter('x = fetch("");', inputs=AsyncLines([]), output=Channel()).run())
+
+
+def test_long_loops_let_other_tasks_run():
+    program = compile("i = 0; wagtail(i < 5000){ i = i + 1; }")
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        await AsyncInterpreter(program, output=Channel(), yield_every=100).run()
+        task.cancel()
+
+    asyncio.run(main())
+    assert len(ticks) >= 50
+
+
+def test_many_scripts_share_one_loop():
+    program = compile(COUNT, variables=["limit"])
+    channels = [Channel() for _ in range(200)]
+
+    async def main():
+        await asyncio.gather(*(AsyncInterpreter(program, output=channel, variables={"limit": n % 5}, yield_every=3).run()
+                               for n, channel in enumerate(channels)))
+
+    asyncio.run(main())
+    assert [channel.values for channel in channels] == [list(range(n % 5)) for n in range(200)]
+
+
+def test_cancelling_stops_an_endless_loop_and_flushes_output():
+    output = io.StringIO()
+    interpreter = AsyncInterpreter('bark("start"); wagtail(1 < 2){ x = 1; }', output=output, yield_every=10)
+
+    async def main():
+        task = asyncio.ensure_future(interpreter.run())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert output.getvalue() == "start\n"
+    assert interpreter.variables is None
+
+
+@pytest.mark.parametrize("code", [
+    "wagtail(1 < 2){ }",
+    "x = 0; wagtail(1 < 2){ sniff(x == 1){ bark(x); } }",
+])
+def test_cancelling_a_loop_without_statements(code):
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(AsyncInterpreter(code, output=Channel(), yield_every=10).run(), 0.05)
+        task.cancel()
+
+    asyncio.run(main())
+    assert ticks
+
+
+def test_standard_input_is_read_off_the_loop(monkeypatch):
+    answered = threading.Event()
+
+    def slow_input(prompt):
+        # Only answers once another task had a turn while fetch waited
+        return "6" if answered.wait(5) else "0"
+
+    monkeypatch.setattr("builtins.input", slow_input)
+    channel = Channel()
+
+    async def answer():
+        await asyncio.sleep(0.01)
+        answered.set()
+
+    async def main():
+        await asyncio.gather(AsyncInterpreter('x = fetch("n? "); bark(x * 7);', output=channel).run(), answer())
+
+    asyncio.run(main())
+    assert channel.values == [42]
+
+
+def test_vm_programs_are_rejected():
+    with pytest.raises(DogLangError, match="tree engine"):
+        AsyncInterpreter(compile("x = 1;", "vm"))
+
+
+def test_yield_every_must_be_positive():
+    with pytest.raises(DogLangError, match="yield_every"):
+        AsyncInterpreter("x = 1;", yield_every=0)
@@ -253,4 +253,24 @@ def test_boolean_expressions(run_code, condition, expected):
         bark("False");
     }}
     """
-    assert run_code(code) == expected
\ No newline at end of file
+    assert run_code(code) == expected
+
+@pytest.mark.parametrize("code,expected", [
+    ("a = 2 + 3 * 4; bark(a);", "14"),
+    ("a = (2 + 3) * 4; bark(a);", "20"),
+    ("a = -3 + 10; bark(a);", "7"),
+    ("a = 10 - 4 - 3; bark(a);", "3"),
+    ('a = "Dog" + "Lang"; bark(a);', "DogLang"),
+    ("sniff(1 < 2 && 3 > 4 || 5 == 5) { bark(1); }", "1"),
+])
+def test_expression_precedence(run_code, code, expected):
+    """Test that compiled expressions follow operator precedence"""
+    assert run_code(code) == expected
+
+
+def test_malformed_expression_fails_at_parse_time():
+    """Test that a broken expression is rejected before anything runs"""
+    from doglang.error import DogLangSyntaxError
+    from doglang.main import Interpreter
+    with pytest.raises(DogLangSyntaxError):
+        Interpreter("bark(1); a = (2 + ;")
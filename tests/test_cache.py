@@ -0,0 +1,114 @@
+"""Tests for the on-disk program cache"""
+import os
+import sys
+import pytest
+from doglang import cache, cli
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.error import DogLangNameError
+
+CODE = "a = 0; wagtail(a < 3) { bark(a); a = a + 1; }"
+
+
+def run(program, capsys):
+    program.run()
+    return capsys.readouterr().out.strip()
+
+
+def script(directory, code=CODE, name="loop.doggy"):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    with open(path, "w") as file:
+        file.write(code)
+    return path
+
+
+def test_miss_writes_entry(tmp_path, capsys, engine):
+    program = cache.load_program(CODE, script(tmp_path), engine, str(tmp_path / "cache"))
+    assert os.listdir(tmp_path / "cache") == [os.path.basename(cache.cache_path("", script(tmp_path), engine))]
+    assert run(program, capsys) == "0\n1\n2"
+
+
+def test_hit_skips_front_end(tmp_path, capsys, monkeypatch, engine):
+    path = script(tmp_path)
+    cache.load_program(CODE, path, engine)
+
+    def fail(self):
+        raise AssertionError("parser should not run on a cache hit")
+    monkeypatch.setattr(SyntaxAnalyser, "parse", fail)
+
+    assert run(cache.load_program(CODE, path, engine), capsys) == "0\n1\n2"
+
+
+def test_cached_program_keeps_unset_checks(tmp_path, engine):
+    code = "b = 0; wagtail(b < 1) { b = b + 1; } sniff(b > 2) { a = 1; } bark(a);"
+    path = script(tmp_path, code)
+    cache.load_program(code, path, engine)
+    with pytest.raises(DogLangNameError):
+        cache.load_program(code, path, engine).run()
+
+
+def test_engines_have_their_own_entries(tmp_path):
+    path = script(tmp_path)
+    for engine in ("tree", "vm", "py"):
+        cache.load_program(CODE, path, engine)
+    assert len(os.listdir(tmp_path / cache.CACHE_DIR_NAME)) == 3
+
+
+def test_same_name_in_other_directory_gets_own_entry(tmp_path, capsys):
+    first = script(tmp_path / "one", "bark(1);", "main.doggy")
+    second = script(tmp_path / "two", "bark(2);", "main.doggy")
+    shared = str(tmp_path / "cache")
+    for _ in range(2):
+        assert run(cache.load_program("bark(1);", first, "tree", shared), capsys) == "1"
+        assert run(cache.load_program("bark(2);", second, "tree", shared), capsys) == "2"
+    assert len(os.listdir(shared)) == 2
+
+
+def test_changed_source_replaces_the_entry(tmp_path, capsys):
+    path = script(tmp_path)
+    cache.load_program(CODE, path, "vm")
+    changed = CODE + " bark(9);"
+    entry = cache.cache_path(cache.default_cache_dir(path), path, "vm")
+    assert cache.read_cache(entry, cache.source_key(changed)) is None
+    assert run(cache.load_program(changed, path, "vm"), capsys) == "0\n1\n2\n9"
+    assert os.listdir(tmp_path / cache.CACHE_DIR_NAME) == [os.path.basename(entry)]
+
+
+def test_version_is_part_of_key(monkeypatch):
+    key = cache.source_key(CODE)
+    monkeypatch.setattr(cache, "__version__", "99.0")
+    assert cache.source_key(CODE) != key
+
+
+@pytest.mark.parametrize("content", [b"", b"garbage", cache.MAGIC + b"\x00\x01"])
+def test_corrupt_entry_is_recompiled(tmp_path, capsys, content, engine):
+    path = script(tmp_path)
+    entry = cache.cache_path(str(tmp_path), path, engine)
+    with open(entry, "wb") as file:
+        file.write(content)
+    assert run(cache.load_program(CODE, path, engine, str(tmp_path)), capsys) == "0\n1\n2"
+    assert cache.read_cache(entry, cache.source_key(CODE)) is not None
+
+
+def test_entry_of_the_wrong_shape_is_recompiled(tmp_path, capsys, engine):
+    path = script(tmp_path)
+    cache.write_cache(cache.cache_path(str(tmp_path), path, engine), cache.source_key(CODE), (1, 2))
+    assert run(cache.load_program(CODE, path, engine, str(tmp_path)), capsys) == "0\n1\n2"
+
+
+def cli_main(monkeypatch, *arguments):
+    monkeypatch.setattr(sys, "argv", ["doglang", *arguments])
+    cli.main()
+
+
+def test_cli_caches_files_on_the_default_engine(tmp_path, capsys, monkeypatch):
+    path = script(tmp_path)
+    cli_main(monkeypatch, "-f", path)
+    assert capsys.readouterr().out.strip() == "0\n1\n2"
+    assert os.listdir(tmp_path / cache.CACHE_DIR_NAME) == [os.path.basename(cache.cache_path("", path, "tree"))]
+
+
+def test_cli_does_not_cache_inline_code(tmp_path, capsys, monkeypatch):
+    cli_main(monkeypatch, "-e", CODE, "--cache-dir", str(tmp_path / "cache"))
+    assert capsys.readouterr().out.strip() == "0\n1\n2"
+    assert not os.path.exists(tmp_path / "cache")
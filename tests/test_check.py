@@ -0,0 +1,114 @@
+"""Tests for the error-recovering parser and --check"""
+import pytest
+from doglang import check
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer
+from doglang.cli import check_files
+from doglang.error import DogLangSyntaxError
+
+
+def positions(errors):
+    return [(error.line, error.column) for error in errors]
+
+
+def statement_types(ast):
+    return [node.type for node in ast.children]
+
+
+def test_every_error_is_reported_with_its_position():
+    code = "a = 1;\nb = ;\nc = 3;\nbark(c;\nd = 4;"
+    ast, errors = check(code)
+    assert positions(errors) == [(2, 5), (4, 7)]
+    assert all(isinstance(error, DogLangSyntaxError) for error in errors)
+    assert statement_types(ast) == ["assignment", "assignment", "assignment"]
+
+
+def test_broken_loop_header_skips_its_body():
+    ast, errors = check("wagtail(i < 3 {\n    bark(i);\n}\nx = 1;")
+    assert positions(errors) == [(1, 15)]
+    assert statement_types(ast) == ["assignment"]
+
+
+def test_errors_inside_a_block_keep_the_block():
+    ast, errors = check("wagtail(i < 3) {\n    bark(;\n    y = 1 1;\n    z = 2;\n}\nq = 1;")
+    assert positions(errors) == [(2, 10), (3, 11)]
+    loop = ast.children[0]
+    assert statement_types(ast) == ["loop", "assignment"]
+    assert [node.type for node in loop.children[1:]] == ["assignment"]
+
+
+def test_else_block_belongs_to_the_broken_sniff():
+    _, errors = check("sniff(a {\n    bark(1);\n} else {\n    bark(2);\n}\nc = 1;")
+    assert len(errors) == 1
+
+
+def test_stray_braces():
+    ast, errors = check("}\na = 1;\n}}\nb = 2;")
+    assert positions(errors) == [(1, 1), (3, 1), (3, 2)]
+    assert statement_types(ast) == ["assignment", "assignment"]
+
+
+def test_unclosed_block_is_reported_at_the_end():
+    _, errors = check("wagtail(x) {\n    bark(1);")
+    assert len(errors) == 1
+    assert "end of input" in str(errors[0])
+    assert errors[0].line == 2
+
+
+def test_tokenizer_errors_are_collected_too():
+    ast, errors = check('a = 1 @ 2;\nb = $ 3;\nbark("ok");')
+    assert positions(errors)[:2] == [(1, 7), (1, 9)]
+    assert "Unrecognized token '$'" in str(errors[2])
+    assert statement_types(ast)[-1] == "print"
+
+
+@pytest.mark.parametrize("code", ["a = 1;\nsniff(a == 1)", "a = 1;\nsniff(a == 1) { bark(a); } else"])
+def test_missing_block_at_end_of_input(code):
+    ast, errors = check(code)
+    assert len(errors) == 1
+    assert "end of input" in str(errors[0])
+    assert errors[0].line == 2
+    assert statement_types(ast) == ["assignment"]
+
+
+def test_every_cut_of_a_program_gives_diagnostics():
+    code = 'p = pack[1, 2];\nsniff(dig p[0] == 1) { bury p[] = 3; } else { bark("no"); }\nwagtail(x < 2) { x = x + 1; }'
+    for end in range(len(code)):
+        _, errors = check(code[:end])
+        assert all(isinstance(error, DogLangSyntaxError) for error in errors)
+
+
+def test_clean_code_has_no_errors():
+    ast, errors = check("a = 1;\nsniff(a > 0) { bark(a); } else { bark(0); }")
+    assert errors == []
+    assert statement_types(ast) == ["assignment", "conditional"]
+
+
+def test_default_parser_still_stops_at_the_first_error():
+    parser = SyntaxAnalyser(Tokenizer("a = ;\nb = ;"))
+    with pytest.raises(DogLangSyntaxError) as info:
+        parser.parse()
+    assert (info.value.line, info.value.column) == (1, 5)
+    assert parser.errors == []
+
+
+def test_unclosed_block_raises_a_syntax_error():
+    with pytest.raises(DogLangSyntaxError, match="end of input"):
+        SyntaxAnalyser(Tokenizer("wagtail(x) { bark(1);")).parse()
+
+
+def test_check_files(tmp_path, capsys):
+    good = tmp_path / "good.doggy"
+    good.write_text("a = 1;\n")
+    bad = tmp_path / "bad.doggy"
+    bad.write_text("a = ;\nbark(a;\n")
+    assert check_files([str(good)]) == 0
+    assert check_files([str(good), str(bad), str(tmp_path / "missing.doggy")]) == 1
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == f"{bad}:1:5: Unexpected token ';' in expression"
+    assert out[1] == f"{bad}:2:7: Expected PARENTHESIS ')' but got SEMICOLON ';'"
+    assert out[2].startswith(f"{tmp_path / 'missing.doggy'}: Error reading file")
+    odd = tmp_path / "odd.doggy"
+    odd.write_text("a = 1 @ 2;\n")
+    check_files([str(odd)])
+    assert capsys.readouterr().out.splitlines()[0] == f"{odd}:1:7: Unrecognized token '@'"
@@ -0,0 +1,71 @@
+"""Tests for the bytecode compiler and VM engine"""
+import pytest
+from doglang.Tokenizer import Tokenizer
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.compiler import VM, compile_program
+from doglang.error import DogLangError
+from doglang.main import Interpreter
+
+
+def compile_code(code):
+    return compile_program(SyntaxAnalyser(Tokenizer(code)).parse())
+
+
+def test_variables_get_fixed_slots():
+    bytecode = compile_code("a = 1; b = a + 2; a = b;")
+    assert bytecode.names == ["a", "b"]
+    # every instruction here is a fused assignment whose last operand is the target slot
+    assert [arg[-1] for op, arg in bytecode.code] == [0, 1, 0]
+
+
+def test_vm_keeps_values_in_slots():
+    vm = VM(compile_code("a = 0; wagtail(a < 5) { a = a + 1; }"))
+    vm.run()
+    assert vm.slots == [5]
+
+
+def test_disassemble_names_operands():
+    listing = compile_code("x = 2 * 3; y = x - 1; bark(x * (y + 1));").disassemble()
+    assert "LOAD_CONST" in listing
+    assert "(*)" in listing
+    assert "(x)" in listing
+    assert "(y = x - 1)" in listing
+    assert "(y + 1)" in listing
+
+
+def test_vm_undeclared_variable():
+    with pytest.raises(DogLangError, match="Variable not declared"):
+        Interpreter("bark(missing);", engine="vm")
+
+
+def test_unknown_engine():
+    with pytest.raises(DogLangError, match="Unknown engine"):
+        Interpreter("bark(1);", engine="jit")
+
+
+def test_sniff_runs_whole_block(run_code):
+    code = """
+    a = 4;
+    sniff(a > 2) {
+        bark("big");
+        a = a * 10;
+        bark(a);
+    }
+    """
+    assert run_code(code) == "big\n40"
+
+
+def test_sniff_requires_boolean(engine):
+    with pytest.raises(DogLangError, match="not boolean"):
+        Interpreter("a = 3; sniff(a % 2) { bark(a); }", engine=engine)
+
+
+def test_logical_short_circuit(run_code):
+    # The right hand side would fail if it were evaluated
+    assert run_code("sniff(1 > 2 && missing > 0) { bark(1); } else { bark(2); }") == "2"
+    assert run_code("sniff(2 > 1 || missing > 0) { bark(1); }") == "1"
+
+
+def test_fetch_reads_numbers(run_code, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda prompt: "7")
+    assert run_code('a = fetch("n"); wagtail(a < 9) { bark(a); a = a + 1; }') == "7\n8"
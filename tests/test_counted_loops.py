@@ -0,0 +1,110 @@
+"""Tests for counted wagtail loops, the vm runs every loop as written and is the reference"""
+import io
+
+import pytest
+from doglang.SemanticAnalyser import SemanticAnalyser
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer
+from doglang.error import DogLangLimitError
+from doglang.optimizer import counted_loop, optimize
+from doglang.program import compile
+from doglang.runtime import CountedRange, Limits
+
+
+def loop_of(code):
+    ast = optimize(SyntaxAnalyser(Tokenizer(code)).parse())
+    SemanticAnalyser(ast, ["n", "start"])
+    return next(node for node in ast.children if node.type == "loop")
+
+
+def outcome(code, engine, variables=None):
+    output = io.StringIO()
+    try:
+        values = compile(code, engine, variables=list(variables or ())).run(output=output, variables=variables)
+    except Exception as error:
+        return output.getvalue(), type(error), str(error)
+    return output.getvalue(), values
+
+
+@pytest.mark.parametrize("code", [
+    "i = 0; wagtail(i < 10){ i = i + 1; }",
+    "i = 0; wagtail(i <= 10){ i = i + 3; }",
+    "i = 10; wagtail(i > 0){ i = i - 3; }",
+    "i = 10; wagtail(i >= 0){ i = i - 2; }",
+    "i = 5; wagtail(i < n){ i = i + 1; }",
+    "i = 0; wagtail((i) < (n)){ i = (i + 2); }",
+])
+def test_loops_that_are_counted(code):
+    assert counted_loop(loop_of(code)) is not None
+
+
+@pytest.mark.parametrize("code", [
+    # the body also assigns the counter
+    "i = 0; wagtail(i < 10){ i = i * 1; i = i + 1; }",
+    "i = 0; wagtail(i < 10){ sniff(i == 3){ i = 5; } i = i + 1; }",
+    # the bound changes in the body
+    "i = 0; wagtail(i < n){ n = n - 1; i = i + 1; }",
+    # the counter moves away from the bound, or not by a constant
+    "i = 0; wagtail(i < 10){ i = i - 1; }",
+    "i = 0; wagtail(i < 10){ i = i + 0; }",
+    "i = 1; wagtail(i < 10){ i = i * 2; }",
+    "i = 0; wagtail(i < 10){ i = i + n; }",
+    # the increment is not the last statement
+    "i = 0; wagtail(i < 10){ i = i + 1; bark(i); }",
+    # the counter may not have a value yet
+    "wagtail(i < 10){ i = 1; }",
+    "i = 0; wagtail(i != 10){ i = i + 1; }",
+])
+def test_loops_that_are_not_counted(code):
+    assert counted_loop(loop_of(code)) is None
+
+
+@pytest.mark.parametrize("code", [
+    "i = 0; total = 0; wagtail(i < 10){ total = total + i; bark(i); i = i + 1; }",
+    "i = 0; wagtail(i <= 10){ bark(i); i = i + 3; }",
+    "i = 10; wagtail(i > 0){ bark(i); i = i - 3; }",
+    "i = 10; wagtail(i >= 0){ bark(i); i = i - 2; }",
+    "i = 7; wagtail(i < 3){ bark(i); i = i + 1; }",
+    "i = 0; wagtail(i < 0){ i = i + 1; }",
+    "i = 0; wagtail(i < 100000){ i = i + 1; }",
+    "i = 0; j = 0; n = 0; wagtail(i < 4){ j = 0; wagtail(j < i){ n = n + j; j = j + 1; } i = i + 1; } bark(n);",
+    "i = 0; wagtail(i < 5){ bark(10 / (3 - i)); i = i + 1; }",
+    'i = "a"; wagtail(i < "c"){ bark(i); i = i + 1; }',
+    "i = 1 == 1; wagtail(i < 3){ bark(i); i = i + 1; }",
+    "i = 0; wagtail(i < 3){ sniff(i == 1){ bark(i); } else { bark(0); } i = i + 1; }",
+])
+def test_counted_loops_behave_like_the_vm(code):
+    expected = outcome(code, "vm")
+    assert outcome(code, "tree") == expected
+    assert outcome(code, "py") == expected
+
+
+@pytest.mark.parametrize("start, n", [(0, 5), (0, 5.5), (0.5, 5), (2, -1), (1.5, 1.5)])
+def test_bounds_that_are_not_ints(start, n):
+    code = "i = start; wagtail(i < n){ bark(i); i = i + 1; }"
+    variables = {"start": start, "n": n}
+    expected = outcome(code, "vm", variables)
+    assert outcome(code, "tree", variables) == expected
+    assert outcome(code, "py", variables) == expected
+
+
+def test_counted_range_end():
+    values = CountedRange(0, 10, 4, '<')
+    assert list(values) == [0, 4, 8]
+    assert values.end == 12
+    empty = CountedRange(3, 1, 1, '<')
+    assert list(empty) == []
+    assert empty.end == 3
+
+
+def test_limits_count_every_statement_of_a_counted_loop(engine):
+    code = "i = 0; wagtail(i < 10){ i = i + 1; }"
+    # i = 0, the wagtail and ten increments
+    assert compile(code, engine).run(limits=Limits(steps=12)) == {"i": 10}
+    with pytest.raises(DogLangLimitError):
+        compile(code, engine).run(limits=Limits(steps=11))
+
+
+def test_limits_on_a_counted_loop(engine):
+    with pytest.raises(DogLangLimitError):
+        compile("i = 0; wagtail(i < 1000000){ i = i + 1; }", engine).run(limits=Limits(steps=1000))
@@ -0,0 +1,116 @@
+"""Tests for the iterative statement executor of the tree engine"""
+import sys
+from doglang.Tokenizer import Tokenizer, Tokens
+from doglang.SyntaxAnalyser import AST, SyntaxAnalyser
+from doglang.SemanticAnalyser import SemanticAnalyser
+from doglang.executor import Executor, prepare
+from doglang.runtime import InputReader, OutputWriter
+
+
+def literal(value):
+    node = AST("expression")
+    node.addchild(AST(Tokens.LITERAL, value))
+    return node
+
+
+def nested_sniffs(depth):
+    """sniff(true){ sniff(true){ ... x = 1; } } built without the parser."""
+    target = AST(Tokens.IDENTIFIER, "x")
+    target.slot = 0
+    innermost = AST("assignment")
+    innermost.addchild(target)
+    innermost.addchild(literal(1))
+    statement = innermost
+    for _ in range(depth):
+        block = AST("block")
+        block.addchild(statement)
+        statement = AST("conditional")
+        statement.addchild(literal(True))
+        statement.addchild(block)
+    program = AST("Program")
+    program.addchild(statement)
+    return program
+
+
+def test_nesting_is_not_limited_by_recursion():
+    slots = [0]
+    Executor(slots, OutputWriter(), InputReader()).execute(prepare(nested_sniffs(sys.getrecursionlimit() * 3)))
+    assert slots == [1]
+
+
+def test_prepare_precomputes_condition_and_body():
+    ast = SyntaxAnalyser(Tokenizer("i = 0; wagtail(i < 2){ sniff(i == 0){ bark(i); } else { bark(1); } i = i + 1; }")).parse()
+    SemanticAnalyser(ast)
+    assignment, loop = prepare(ast)
+    assert assignment.type == "assignment" and assignment.slot == 0
+    # It counts i up to a constant, so it can run as a counted loop
+    assert loop.type == "counted"
+    assert [step.type for step in loop.body] == ["conditional", "assignment"]
+    conditional = loop.body[0]
+    assert [step.type for step in conditional.body] == ["print"]
+    assert [step.type for step in conditional.orelse] == ["print"]
+    assert conditional.evaluate([0]) is True
+
+
+def test_loop_condition_sees_body_updates(run_code):
+    code = """
+    i = 0;
+    wagtail(i < 3){
+        j = 0;
+        wagtail(j < i){
+            bark(j);
+            j = j + 1;
+        }
+        i = i + 1;
+    }
+    bark("done");
+    """
+    assert run_code(code) == "0\n0\n1\ndone"
+
+
+def test_fib_keeps_exact_native_integers(run_code):
+    code = """
+    a = 0;
+    b = 1;
+    count = 0;
+    wagtail(count < 300) {
+        temp = a + b;
+        a = b;
+        b = temp;
+        count = count + 1;
+    }
+    bark(a);
+    """
+    a, b = 0, 1
+    for _ in range(300):
+        a, b = b, a + b
+    assert run_code(code) == str(a)
+
+
+def test_operators_on_variables_and_literals(run_code):
+    code = """
+    x = 7;
+    y = 2;
+    s = "dog";
+    bark(x - y);
+    bark(10 - x);
+    bark((x) % (y));
+    bark(x / y);
+    bark(s + "gy");
+    bark("hot" + s);
+    bark(y < x);
+    bark(x == 7);
+    """
+    assert run_code(code) == "5\n3\n1\n3.5\ndoggy\nhotdog\nTrue\nTrue"
+
+
+def test_operand_that_may_be_unset_is_still_checked(run_code, expect_error):
+    code = """
+    f = 0;
+    sniff(f == 1) {
+        x = 1;
+    }
+    bark(x + 1);
+    """
+    with expect_error(code, "Variable not declared: 'x'"):
+        run_code(code)
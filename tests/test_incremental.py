@@ -0,0 +1,142 @@
+"""Tests for the incremental front end, every result is checked against a full parse"""
+import random
+
+import pytest
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer
+from doglang.error import DogLangError, DogLangSyntaxError
+from doglang.incremental import Document
+
+SOURCE = """a = 0;
+b = 1;
+count = 0;
+wagtail(count < 10) {
+    bark(a);
+    temp = a + b;
+    a = b;
+    b = temp;
+    count = count + 1;
+}
+sniff(a > 1) {
+    bark(a);
+} else {
+    bark(b);
+}
+x = 1; y = 2;
+"""
+
+
+def dump(node):
+    return (str(node.type), node.value, node.line, [dump(child) for child in node.children])
+
+
+def assert_matches_full_parse(document):
+    tokens = Tokenizer(document.text)
+    assert [(t.token_type, t.value, t.line, t.column) for t in document.tokens] == \
+        [(t.token_type, t.value, t.line, t.column) for t in tokens]
+    assert dump(document.ast) == dump(SyntaxAnalyser(tokens).parse())
+
+
+def test_new_document_is_parsed():
+    document = Document(SOURCE)
+    assert document.text == SOURCE
+    assert_matches_full_parse(document)
+    assert len(document.ast.children) == 7
+
+
+def test_typing_inside_a_statement_reparses_little():
+    document = Document(SOURCE)
+    # count = 0; -> count = 10;
+    document.edit(3, 9, 3, 9, "1")
+    assert_matches_full_parse(document)
+    assert document.reparsed <= 2
+
+
+def test_edit_inside_loop_body_reparses_the_loop():
+    document = Document(SOURCE)
+    first, loop = document.ast.children[0], document.ast.children[3]
+    document.edit(6, 16, 6, 17, "b * 2")
+    assert_matches_full_parse(document)
+    assert document.ast.children[3] is not loop
+    assert document.ast.children[0] is first
+
+
+def test_statements_after_the_edit_are_reused_and_shifted():
+    document = Document(SOURCE)
+    tail = document.ast.children[4]
+    document.edit(1, 1, 1, 1, "z = 5;\nw = 6;\n")
+    assert_matches_full_parse(document)
+    assert document.ast.children[6] is tail
+    assert tail.line == 13
+
+
+def test_deleting_lines():
+    document = Document(SOURCE)
+    document.edit(5, 1, 9, 1, "")
+    assert_matches_full_parse(document)
+
+
+def test_edit_can_extend_the_previous_statement():
+    document = Document("x = 1\n")
+    document.edit(2, 1, 2, 1, "+ 2;")
+    assert_matches_full_parse(document)
+    assert len(document.ast.children) == 1
+
+
+def test_adding_else_to_a_sniff():
+    document = Document("sniff(a > 1) {\n    bark(a);\n}\nbark(2);\n")
+    document.edit(3, 2, 3, 2, " else { bark(3); }")
+    assert_matches_full_parse(document)
+    assert len(document.ast.children[0].children) == 3
+
+
+def test_two_statements_on_one_line():
+    document = Document(SOURCE)
+    document.edit(16, 12, 16, 13, "20")
+    assert_matches_full_parse(document)
+
+
+def test_broken_edit_raises_and_a_later_edit_recovers():
+    document = Document(SOURCE)
+    with pytest.raises(DogLangSyntaxError):
+        document.edit(2, 6, 2, 7, "")
+    assert document.ast is None
+    assert document.text.splitlines()[1] == "b = 1"
+    document.edit(2, 6, 2, 6, ";")
+    assert_matches_full_parse(document)
+
+
+def test_edit_outside_the_document_is_rejected():
+    document = Document(SOURCE)
+    with pytest.raises(DogLangError):
+        document.edit(40, 1, 40, 1, "x")
+    with pytest.raises(DogLangError):
+        document.edit(1, 50, 1, 50, "x")
+    assert_matches_full_parse(document)
+
+
+def test_random_edits_match_a_full_parse():
+    rng = random.Random(2024)
+    pieces = ["", " ", "\n", "x = 2;", "}", "{", "bark(1);\n", " else { bark(3); }",
+              "wagtail(count < 3) {", "a", "+ 1", "\n\n"]
+    document = Document(SOURCE)
+    checked = 0
+    while checked < 300:
+        lines = document.lines
+        start_line = rng.randint(1, len(lines))
+        end_line = rng.randint(start_line, min(len(lines), start_line + rng.choice([0, 0, 1, 3])))
+        start = (start_line, rng.randint(1, len(lines[start_line - 1]) + 1))
+        end = (end_line, rng.randint(1, len(lines[end_line - 1]) + 1))
+        start, end = min(start, end), max(start, end)
+        piece = rng.choice(pieces)
+        text = "\n".join(lines[:start[0] - 1] + [lines[start[0] - 1][:start[1] - 1] + piece + lines[end[0] - 1][end[1] - 1:]]
+                         + lines[end[0]:])
+        try:
+            SyntaxAnalyser(Tokenizer(text)).parse()
+        except Exception:
+            # Keep the document parseable, so the edits go through the incremental path
+            continue
+        document.edit(*start, *end, piece)
+        assert document.text == text
+        assert_matches_full_parse(document)
+        checked += 1
@@ -0,0 +1,69 @@
+"""Tests for reading fetch input from a supplied source"""
+import io
+import sys
+
+import pytest
+from doglang.error import DogLangError, DogLangSyntaxError
+from doglang.main import Interpreter
+from doglang.runtime import InputReader
+
+SUM_SCRIPT = 'total = 0; n = fetch("how many? "); wagtail(n > 0){ value = fetch("value? "); total = total + value; n = n - 1; } bark(total);'
+
+
+def run_with_input(code, inputs, engine):
+    output = io.StringIO()
+    Interpreter(code, engine=engine, output=output, inputs=inputs)
+    return output.getvalue()
+
+
+def test_fetch_reads_from_a_list(engine):
+    assert run_with_input(SUM_SCRIPT, ["3", "10", "20", "12"], engine) == "42\n"
+
+
+def test_fetch_reads_from_a_file(engine, tmp_path):
+    path = tmp_path / "values.txt"
+    path.write_text("2\n1.5\r\nwoof\n")
+    with open(path) as file:
+        assert run_with_input('n = fetch(""); a = fetch(""); b = fetch(""); bark(n); bark(a); bark(b);',
+                              file, engine) == "2\n1.5\nwoof\n"
+
+
+def test_fetch_reads_from_a_generator(engine):
+    lines = (str(i) for i in [1, 5])
+    assert run_with_input(SUM_SCRIPT, lines, engine) == "5\n"
+
+
+def test_prompts_are_not_shown_for_a_source(engine, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda prompt: pytest.fail("input() should not be used"))
+    assert run_with_input(SUM_SCRIPT, ["1", "7"], engine) == "7\n"
+
+
+def test_running_out_of_input_is_an_error(engine):
+    with pytest.raises(DogLangError, match="no more input"):
+        run_with_input(SUM_SCRIPT, ["2", "1"], engine)
+
+
+@pytest.mark.parametrize("code", [
+    'bark fetch "x";',
+    'sniff fetch "x" { bark(1); }',
+    'x = fetch fetch "x";',
+])
+def test_fetch_outside_an_assignment_is_a_syntax_error(engine, code):
+    with pytest.raises(DogLangSyntaxError, match="fetch can only be assigned to a variable"):
+        run_with_input(code, ["1"], engine)
+
+
+def test_stdin_without_prompts(engine, monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("1\n41\n"))
+    monkeypatch.setattr("builtins.input", lambda prompt: pytest.fail("input() should not be used"))
+    assert run_with_input(SUM_SCRIPT, InputReader(prompts=False), engine) == "41\n"
+
+
+def test_interactive_reader_uses_input(monkeypatch):
+    prompts = []
+    monkeypatch.setattr("builtins.input", lambda prompt: prompts.append(prompt) or "5")
+    reader = InputReader()
+    assert reader.interactive
+    assert reader.read("size? ") == "5"
+    assert prompts == ["size? "]
+    assert not InputReader(["1"]).interactive
@@ -0,0 +1,167 @@
+"""Tests for step, time, output and memory limits"""
+import io
+
+import pytest
+from doglang.compiler import VM
+from doglang.error import DogLangError, DogLangLimitError
+from doglang.main import Interpreter
+from doglang.program import compile
+from doglang.runner import run_many
+from doglang.runtime import Limits, OutputWriter
+
+ENDLESS = "i = 0; wagtail(i >= 0){ i = i + 1; }"
+
+
+def run_limited(code, engine, **limits):
+    output = io.StringIO()
+    variables = compile(code, engine).run(output=output, limits=Limits(**limits))
+    return output.getvalue(), variables
+
+
+def test_limit_error_is_a_doglang_error():
+    assert issubclass(DogLangLimitError, DogLangError)
+
+
+def test_step_limit_stops_an_endless_loop(engine):
+    with pytest.raises(DogLangLimitError, match="Step limit of 5000 exceeded") as raised:
+        run_limited(ENDLESS, engine, steps=5000)
+    assert raised.value.limit == "steps"
+
+
+def test_statements_are_counted_exactly(engine):
+    code = "a = 1; b = 2; c = 3;"
+    assert run_limited(code, engine, steps=3)[1] == {"a": 1, "b": 2, "c": 3}
+    with pytest.raises(DogLangLimitError):
+        run_limited(code, engine, steps=2)
+
+
+# Each program with the number of steps it takes: every statement that runs
+# is one, and so is each pass of a wagtail with an empty body
+STEPS = [
+    ("bark(1); bark(2); bark(3); bark(4); bark(5); bark(6);", 6),
+    ("i = 0; wagtail(i < 10){ i = i + 1; }", 12),
+    ("i = 0; j = 0; wagtail(i < 10){ i = i + 1; j = j + 2; }", 23),
+    ("i = 0; wagtail(i < 3){ sniff(i == 1){ bark(i); } else { bark(0); bark(0); } i = i + 1; }", 13),
+    ("i = 0; wagtail(i < 3){ j = 0; wagtail(j < i){ bark(j); j = j + 1; } i = i + 1; }", 17),
+    ("i = 0; wagtail(i >= 0 && i < 5){ i = i + 1; bark(i); }", 12),
+    ('s = "a"; wagtail(s != "aaa"){ s = s + "a"; }', 4),
+    ("p = pack[]; n = 0; wagtail(n < 4){ bury p[] = n; n = n + 1; } bark(tally(p));", 12),
+    ("i = 0; wagtail(i < 0){ i = i + 1; } bark(i);", 3),
+]
+
+
+@pytest.mark.parametrize("code, steps", STEPS)
+def test_engines_agree_on_steps(engine, code, steps):
+    expected = run_limited(code, "tree", steps=steps)
+    assert run_limited(code, engine, steps=steps) == expected
+    # One step fewer stops every engine at the same statement, after the same output
+    output = io.StringIO()
+    with pytest.raises(DogLangLimitError, match=f"Step limit of {steps - 1} exceeded"):
+        compile(code, engine).run(output=output, limits=Limits(steps=steps - 1))
+    tree_output = io.StringIO()
+    with pytest.raises(DogLangLimitError):
+        compile(code, "tree").run(output=tree_output, limits=Limits(steps=steps - 1))
+    assert output.getvalue() == tree_output.getvalue()
+
+
+def test_each_pass_of_an_empty_loop_is_a_step(engine):
+    # i = 0 and the wagtail, then the empty loop runs while the limit allows
+    code = "i = 0; wagtail(i < 1){ }"
+    for steps in (2, 3, 50):
+        output = io.StringIO()
+        program = compile(code, engine)
+        with pytest.raises(DogLangLimitError, match=f"Step limit of {steps} exceeded"):
+            program.run(output=output, limits=Limits(steps=steps))
+
+
+def test_empty_loop_is_counted(engine):
+    with pytest.raises(DogLangLimitError, match="Step limit"):
+        run_limited("wagtail(1 < 2){ }", engine, steps=100)
+
+
+def test_complex_loop_condition_is_counted():
+    # This condition is not a single comparison, so the vm loops back with JUMP_IF_TRUE
+    with pytest.raises(DogLangLimitError, match="Step limit"):
+        run_limited("i = 0; wagtail(i >= 0 && i < 1000000){ i = i + 1; }", "vm", steps=1000)
+
+
+def test_time_limit(engine):
+    with pytest.raises(DogLangLimitError, match="Time limit of 0.05 seconds exceeded") as raised:
+        run_limited(ENDLESS, engine, time=0.05)
+    assert raised.value.limit == "time"
+
+
+def test_output_limit_keeps_what_fits(engine):
+    output = io.StringIO()
+    with pytest.raises(DogLangLimitError, match="Output limit of 12 characters exceeded") as raised:
+        compile('wagtail(1 < 2){ bark("woof"); }', engine).run(output=output, limits=Limits(output=12))
+    assert raised.value.limit == "output"
+    assert output.getvalue() == "woof\nwoof\nwo"
+
+
+def test_output_limit_on_a_line_buffered_writer():
+    target = io.StringIO()
+    writer = OutputWriter(target, line_buffering=True, max_size=7)
+    writer.write("woof")
+    with pytest.raises(DogLangLimitError):
+        writer.write("woof")
+    assert target.getvalue() == "woof\nwo"
+
+
+def test_output_limit_leaves_a_shared_writer_alone(engine):
+    target = io.StringIO()
+    writer = OutputWriter(target)
+    program = compile('bark("woof"); bark("woof");', engine)
+    with pytest.raises(DogLangLimitError):
+        program.run(output=writer, limits=Limits(output=7))
+    assert writer.max_size is None
+    program.run(output=writer, limits=Limits(output=10))
+    program.run(output=writer)
+    writer.flush()
+    assert target.getvalue() == "woof\nwo" + "woof\nwoof\n" * 2
+
+
+def test_memory_limit_stops_a_growing_string(engine):
+    with pytest.raises(DogLangLimitError, match="Memory limit of 100000 bytes exceeded") as raised:
+        run_limited('s = "woof"; wagtail(1 < 2){ s = s + s; }', engine, memory=100000)
+    assert raised.value.limit == "memory"
+
+
+def test_memory_limit_counts_starting_variables():
+    program = compile("bark(1);", variables=["big"])
+    with pytest.raises(DogLangLimitError, match="Memory"):
+        program.run(output=io.StringIO(), variables={"big": "x" * 1000}, limits=Limits(memory=500))
+
+
+def test_programs_within_their_limits_run_normally(engine):
+    code = "i = 0; total = 0; wagtail(i < 100){ total = total + i; i = i + 1; } bark(total);"
+    output, variables = run_limited(code, engine, steps=10000, time=60, output=100, memory=10000)
+    assert output == "4950\n"
+    assert variables["total"] == 4950
+
+
+def test_limits_reset_between_runs(engine):
+    program = compile("i = 0; wagtail(i < 100){ i = i + 1; }", engine)
+    limits = Limits(steps=500)
+    for _ in range(3):
+        assert program.run(limits=limits) == {"i": 100}
+
+
+def test_unlimited_vm_code_has_no_charges():
+    program = compile(ENDLESS, "vm")
+    vm = VM(program.bytecode)
+    assert vm.code == program._code
+    limited = VM(program.bytecode, limits=Limits(steps=10))
+    assert limited.code != vm.code
+
+
+def test_interpreter_accepts_limits(engine):
+    with pytest.raises(DogLangLimitError):
+        Interpreter(ENDLESS, engine=engine, limits=Limits(steps=100))
+
+
+def test_run_many_applies_limits_to_each_run(engine):
+    program = compile("n = fetch(\"\"); i = 0; wagtail(i < n){ i = i + 1; }", engine)
+    results = run_many(program, [["5"], ["100000"], ["7"]], pool="thread", limits=Limits(steps=1000))
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, DogLangLimitError)
@@ -0,0 +1,76 @@
+"""Tests for the constant folding and dead branch optimizer"""
+import pytest
+from doglang.Tokenizer import Tokenizer, Tokens
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.error import DogLangError
+from doglang.main import Interpreter
+from doglang.optimizer import Optimizer
+
+
+def optimize_code(code):
+    optimizer = Optimizer()
+    return optimizer.optimize(SyntaxAnalyser(Tokenizer(code)).parse()), optimizer
+
+
+def value_of(assignment):
+    return assignment.children[1].children[0]
+
+
+@pytest.mark.parametrize("source,expected", [
+    ("60 * 60 * 24", 86400),
+    ("(1 + 2) * 3", 9),
+    ("-4 + 10", 6),
+    ("10 / 4", 2.5),
+    ('"Dog" + "Lang"', "DogLang"),
+    ("1 < 2 && 3 > 4", False),
+    ("!(1 == 2)", True),
+])
+def test_constant_expressions_are_folded(source, expected):
+    program, optimizer = optimize_code(f"x = {source};")
+    node = value_of(program.children[0])
+    assert node.type == Tokens.LITERAL
+    assert node.value == expected
+    assert type(node.value) is type(expected)
+    assert optimizer.folded > 0
+
+
+def test_partial_folding_keeps_variables():
+    program, _ = optimize_code("y = x + 2 * 3;")
+    node = value_of(program.children[0])
+    assert node.type == "binary"
+    assert node.children[1].value == 6
+
+
+@pytest.mark.parametrize("source", ["1 / 0", '"a" - 1'])
+def test_failing_expressions_are_not_folded(source):
+    program, _ = optimize_code(f"x = {source};")
+    assert value_of(program.children[0]).type == "binary"
+
+
+def test_static_sniff_keeps_only_taken_branch():
+    program, optimizer = optimize_code("""
+    sniff(1 == 0) { bark("then"); } else { bark("else"); a = 1; }
+    sniff(2 > 1) { bark("yes"); }
+    sniff(2 < 1) { bark("never"); }
+    """)
+    assert [node.type for node in program.children] == ["print", "assignment", "print"]
+    assert optimizer.removed == 3
+
+
+def test_constant_false_loop_is_removed():
+    program, _ = optimize_code("wagtail(1 > 2) { bark(1); } bark(2);")
+    assert [node.type for node in program.children] == ["print"]
+
+
+def test_non_boolean_sniff_still_fails(engine):
+    with pytest.raises(DogLangError, match="not boolean"):
+        Interpreter("sniff(1 + 1) { bark(1); }", engine=engine)
+
+
+def test_optimized_program_output(run_code):
+    code = """
+    x = 60 * 60 * 24;
+    sniff(1 == 0) { bark("dead"); } else { bark(x); }
+    wagtail(0 > 1) { bark("never"); }
+    """
+    assert run_code(code) == "86400"
@@ -0,0 +1,74 @@
+"""Tests for buffered bark output"""
+from io import StringIO
+
+import pytest
+from doglang.error import DogLangError
+from doglang.main import Interpreter
+from doglang.runtime import OutputWriter
+
+
+class CountingTarget(StringIO):
+    """A StringIO that records how often it is written to and flushed."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def test_block_buffered_output_is_written_once(engine):
+    target = CountingTarget()
+    Interpreter("i = 0; wagtail(i < 100){ bark(i); i = i + 1; }", engine=engine, output=target)
+    assert target.getvalue() == "".join(f"{i}\n" for i in range(100))
+    assert target.writes == 1
+
+
+def test_buffer_is_flushed_at_the_size_threshold():
+    target = CountingTarget()
+    output = OutputWriter(target, buffer_size=10)
+    for word in ("woof", "woof", "woof"):
+        output.write(word)
+    assert target.getvalue() == "woof\nwoof\n"
+    output.flush()
+    assert target.getvalue() == "woof\nwoof\nwoof\n"
+
+
+def test_line_buffered_output_writes_every_line(engine):
+    target = CountingTarget()
+    output = OutputWriter(target, line_buffering=True)
+    Interpreter('bark("a"); bark("b"); bark(3);', engine=engine, output=output)
+    assert target.getvalue() == "a\nb\n3\n"
+    assert target.writes == 3
+    assert target.flushes >= 3
+
+
+def test_output_matches_print_formatting(run_code):
+    assert run_code('bark(1 / 2); bark(1 < 2); bark("dog");') == "0.5\nTrue\ndog"
+
+
+def test_default_output_is_stdout(engine, capsys):
+    Interpreter("bark(42);", engine=engine)
+    assert capsys.readouterr().out == "42\n"
+
+
+def test_output_before_an_error_is_kept(engine):
+    target = StringIO()
+    with pytest.raises(DogLangError):
+        Interpreter('bark("before"); sniff(1){ bark("never"); }', engine=engine, output=target)
+    assert target.getvalue() == "before\n"
+
+
+def test_output_is_flushed_before_a_fetch_prompt(engine, monkeypatch):
+    target = StringIO()
+    seen = []
+    monkeypatch.setattr("builtins.input", lambda prompt: seen.append(target.getvalue()) or "7")
+    Interpreter('bark("hello"); x = fetch("number? "); bark(x);', engine=engine, output=target)
+    assert seen == ["hello\n"]
+    assert target.getvalue() == "hello\n7\n"
@@ -0,0 +1,129 @@
+"""Tests for pack, dig and bury"""
+import io
+import marshal
+import sys
+from array import array
+
+import pytest
+from doglang import Interpreter
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer
+from doglang.error import DogLangError, DogLangIndexError, DogLangLimitError, DogLangSyntaxError
+from doglang.program import compile
+from doglang.runtime import Limits, Pack, type_name
+
+
+def run(code, engine, variables=None):
+    output = io.StringIO()
+    values = compile(code, engine, variables=list(variables or ())).run(output=output, variables=variables)
+    return output.getvalue(), values
+
+
+def test_dig_and_bury(engine):
+    code = "numbers = pack[10, 20, 30]; first = dig numbers[0]; bury numbers[1] = 25; bark(numbers); bark(first);"
+    output, values = run(code, engine)
+    assert output == "[10, 25, 30]\n10\n"
+    assert list(values["numbers"]) == [10, 25, 30]
+
+
+def test_append(engine):
+    code = "numbers = pack[]; i = 0; wagtail(i < 5){ bury numbers[] = i * i; i = i + 1; } bark(dig numbers[4]);"
+    output, values = run(code, engine)
+    assert output == "16\n"
+    assert list(values["numbers"]) == [0, 1, 4, 9, 16]
+
+
+def test_elements_are_expressions(engine):
+    code = 'a = 2; grid = pack[pack[a, a + 1], "b"]; bark(dig (dig grid[0])[1] * 10); bark(grid);'
+    assert run(code, engine)[0] == '30\n[[2, 3], "b"]\n'
+
+
+def test_dig_inside_an_expression(engine):
+    code = "p = pack[1, 2, 3]; i = 1; bark(dig p[i + 1] - dig p[0]);"
+    assert run(code, engine)[0] == "2\n"
+
+
+def test_packs_are_shared(engine):
+    code = "a = pack[1, 2]; b = a; bury b[0] = 9; bark(dig a[0]);"
+    assert run(code, engine)[0] == "9\n"
+
+
+def test_pack_literals_are_new_every_time(engine):
+    program = compile("numbers = pack[1, 2, 3]; bury numbers[0] = dig numbers[0] + 1; bark(numbers);", engine)
+    for _ in range(2):
+        output = io.StringIO()
+        program.run(output=output)
+        assert output.getvalue() == "[2, 2, 3]\n"
+
+
+@pytest.mark.parametrize("code, error, message", [
+    ("p = pack[1, 2]; x = dig p[2];", DogLangIndexError, "2 is out of range for a pack of 2"),
+    ("p = pack[1, 2]; x = dig p[-1];", DogLangIndexError, "-1 is out of range"),
+    ("p = pack[1, 2]; bury p[5] = 1;", DogLangIndexError, "5 is out of range"),
+    ('p = pack[1, 2]; x = dig p["a"];', DogLangError, "must be an int, not str"),
+    ("p = pack[1, 2]; x = dig p[1 == 1];", DogLangError, "must be an int, not bool"),
+    ("p = 5; x = dig p[0];", DogLangError, "Cannot dig in int"),
+    ("p = 5; bury p[0] = 1;", DogLangError, "Cannot bury in int"),
+    ("p = 5; bury p[] = 1;", DogLangError, "Cannot bury in int"),
+])
+def test_errors(engine, code, error, message):
+    with pytest.raises(error, match=message):
+        run(code, engine)
+
+
+def test_syntax():
+    with pytest.raises(DogLangSyntaxError, match="fetch can only be assigned"):
+        SyntaxAnalyser(Tokenizer('p = pack[1]; bury p[0] = fetch("x");')).parse()
+    with pytest.raises(DogLangSyntaxError):
+        SyntaxAnalyser(Tokenizer("p = pack[1, 2;")).parse()
+    with pytest.raises(DogLangSyntaxError):
+        SyntaxAnalyser(Tokenizer("bury p = 1;")).parse()
+
+
+def test_int_packs_are_compact():
+    assert type(Pack([1, 2, 3]).items) is array
+    assert type(Pack([]).items) is array
+    for values in ([1, "a"], [1, 2.5], [1, True], [2 ** 70]):
+        assert type(Pack(values).items) is list
+
+
+def test_storage_falls_back_to_a_list_once():
+    numbers = Pack([1, 2, 3])
+    numbers.bury(0, 4)
+    numbers.append(5)
+    assert type(numbers.items) is array
+    numbers.bury(1, "dog")
+    assert type(numbers.items) is list
+    assert list(numbers) == [4, "dog", 3, 5]
+    big = Pack([1])
+    big.append(2 ** 64)
+    assert list(big) == [1, 2 ** 64]
+
+
+def test_element_types():
+    assert type_name(Pack([1, 2])) == "pack[int]"
+    assert type_name(Pack(["a", "b"])) == "pack[str]"
+    assert type_name(Pack([1, "a"])) == "pack[mixed]"
+    table = Interpreter('numbers = pack[1, 2]; words = pack["a"]; n = 1;', output=io.StringIO()).symbol_table
+    assert table.lookup("numbers").type == "pack[int]"
+    assert table.lookup("words").type == "pack[str]"
+    assert table.lookup("n").type == "int"
+
+
+def test_million_ints_take_a_fraction_of_a_list():
+    values = list(range(1_000_000))
+    as_list = sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+    assert sys.getsizeof(Pack(values)) < as_list / 4
+
+
+def test_memory_limit_sees_a_growing_pack(engine):
+    code = "numbers = pack[]; i = 0; wagtail(i < 100000){ bury numbers[] = i; i = i + 1; }"
+    with pytest.raises(DogLangLimitError):
+        compile(code, engine).run(limits=Limits(memory=100_000))
+    assert len(compile(code, engine).run(limits=Limits(memory=2_000_000))["numbers"]) == 100000
+
+
+def test_bytecode_with_packs_can_be_cached():
+    bytecode = compile("p = pack[1, 2]; q = pack[dig p[0], 3];", "vm").bytecode
+    marshal.dumps((bytecode.code, bytecode.constants, bytecode.names))
+    assert "pack[1, 2]" in bytecode.disassemble()
@@ -0,0 +1,94 @@
+"""Tests for source lines on the AST and the per-line profiler"""
+import io
+import json
+
+import pytest
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.Tokenizer import Tokenizer
+from doglang.error import DogLangError
+from doglang.profiler import profile
+from doglang.program import compile
+
+FIB = """a = 0;
+b = 1;
+count = 0;
+wagtail(count < 10) {
+    bark(a);
+    temp = a + b;
+    a = b;
+    b = temp;
+    sniff(count % 2 == 0) {
+        b = b + 0;
+    }
+    count = count + 1;
+}
+"""
+
+
+def test_ast_nodes_keep_their_line():
+    program = SyntaxAnalyser(Tokenizer(FIB)).parse()
+    assert [node.line for node in program.children] == [1, 2, 3, 4]
+    loop = program.children[3]
+    assert [node.line for node in loop.children[1:]] == [5, 6, 7, 8, 9, 12]
+    grouping = loop.children[0].children[0]
+    condition = grouping.children[0]
+    assert grouping.line == condition.line == 4
+    assert [child.line for child in condition.children] == [4, 4]
+
+
+def test_prepared_steps_keep_their_line():
+    program = compile(FIB)
+    assert [step.line for step in program.steps] == [1, 2, 3, 4]
+
+
+def test_hits_per_line():
+    result = profile(compile(FIB), output=io.StringIO())
+    hits = {line.line: line.hits for line in result.lines()}
+    assert hits == {1: 1, 2: 1, 3: 1, 4: 1, 5: 10, 6: 10, 7: 10, 8: 10, 9: 10, 10: 5, 12: 10}
+
+
+def test_lines_are_sorted_by_cumulative_time():
+    result = profile(compile(FIB), output=io.StringIO())
+    lines = result.lines()
+    assert lines[0].line == 4
+    assert [line.total_time for line in lines] == sorted((line.total_time for line in lines), reverse=True)
+    loop = lines[0]
+    assert loop.total_time >= sum(line.self_time for line in lines if 5 <= line.line <= 12)
+
+
+def test_profiled_run_still_produces_output():
+    output = io.StringIO()
+    profile(compile(FIB), output=output)
+    assert output.getvalue().split() == ["0", "1", "1", "2", "3", "5", "8", "13", "21", "34"]
+
+
+def test_report_lists_hot_lines():
+    report = profile(compile(FIB), output=io.StringIO()).report(limit=3)
+    rows = report.splitlines()
+    assert rows[0].split()[:3] == ["line", "statement", "hits"]
+    assert rows[1].split()[:3] == ["4", "wagtail", "1"]
+    assert len(rows) == 5
+    assert rows[-1].startswith("total")
+
+
+def test_json_export():
+    data = json.loads(profile(compile(FIB), output=io.StringIO()).to_json())
+    assert data["elapsed"] > 0
+    bark = next(line for line in data["lines"] if line["line"] == 5)
+    assert bark["statement"] == "bark"
+    assert bark["hits"] == 10
+
+
+def test_collapsed_stacks():
+    result = profile(compile(FIB), output=io.StringIO())
+    paths = [";".join(path) for _, path in result.root.walk()]
+    assert "program;wagtail:4;sniff:9;assign:10" in paths
+    for row in result.collapsed().splitlines():
+        stack, _, microseconds = row.rpartition(" ")
+        assert stack in paths
+        assert int(microseconds) > 0
+
+
+def test_profiling_needs_the_tree_engine():
+    with pytest.raises(DogLangError, match="tree engine"):
+        profile(compile(FIB, "vm"))
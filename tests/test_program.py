@@ -0,0 +1,78 @@
+"""Tests for compiling a program once and running it many times"""
+import io
+
+import pytest
+import doglang
+from doglang.error import DogLangError, DogLangNameError
+from doglang.program import Program, compile
+
+COUNTER = 'i = 0; wagtail(i < limit){ bark(i); i = i + 1; } name = fetch(""); bark(name);'
+
+
+def run(program, **kwargs):
+    output = io.StringIO()
+    variables = program.run(output=output, **kwargs)
+    return output.getvalue(), variables
+
+
+def test_compile_returns_a_program(engine):
+    program = compile("x = 1;", engine)
+    assert isinstance(program, Program)
+    assert program.engine == engine
+    assert program.names == ["x"]
+
+
+def test_compile_is_exported_from_the_package():
+    assert doglang.compile is compile
+    assert doglang.Program is Program
+
+
+def test_program_runs_many_times_with_fresh_state(engine):
+    program = compile(COUNTER, engine, variables=["limit"])
+    first, first_variables = run(program, variables={"limit": 2}, inputs=["rex"])
+    second, second_variables = run(program, variables={"limit": 3}, inputs=["fido"])
+    assert first == "0\n1\nrex\n"
+    assert second == "0\n1\n2\nfido\n"
+    assert first_variables == {"limit": 2, "i": 2, "name": "rex"}
+    assert second_variables == {"limit": 3, "i": 3, "name": "fido"}
+
+
+def test_run_returns_only_assigned_variables(engine):
+    program = compile("x = 0; sniff(x > 0){ y = 1; }", engine)
+    assert program.run(output=io.StringIO()) == {"x": 0}
+
+
+def test_missing_declared_variable_fails_at_runtime(engine):
+    program = compile("bark(limit);", engine, variables=["limit"])
+    with pytest.raises(DogLangNameError, match="limit"):
+        program.run(output=io.StringIO())
+
+
+def test_undeclared_variable_still_fails_at_compile_time(engine):
+    with pytest.raises(DogLangNameError, match="limit"):
+        compile("bark(limit);", engine)
+
+
+def test_unknown_variable_is_rejected(engine):
+    program = compile("x = 1;", engine)
+    with pytest.raises(DogLangNameError, match="no variable 'y'"):
+        program.run(variables={"y": 2})
+
+
+def test_starting_value_can_be_overwritten(engine):
+    output, variables = run(compile("x = x * 2; bark(x);", engine, variables=["x"]), variables={"x": 21})
+    assert output == "42\n"
+    assert variables == {"x": 42}
+
+
+def test_unknown_engine_on_compile():
+    with pytest.raises(DogLangError, match="Unknown engine"):
+        compile("x = 1;", "jit")
+
+
+def test_interpreter_wraps_compile_and_run(engine):
+    output = io.StringIO()
+    interpreter = doglang.Interpreter("a = 2; b = a + 3; bark(b);", engine=engine, output=output)
+    assert output.getvalue() == "5\n"
+    assert interpreter.variables == {"a": 2, "b": 5}
+    assert isinstance(interpreter.program, Program)
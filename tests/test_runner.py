@@ -0,0 +1,61 @@
+"""Tests for running one program against many input sets concurrently"""
+import pytest
+from doglang.error import DogLangError
+from doglang.program import Program, compile
+from doglang.runner import run_captured, run_many
+
+SUM = 'total = 0; n = fetch(""); wagtail(n > 0){ value = fetch(""); total = total + value; n = n - 1; } bark(total);'
+
+
+@pytest.fixture(params=["thread", "process"])
+def pool(request):
+    return request.param
+
+
+def test_results_come_back_in_order(engine, pool):
+    program = compile(SUM, engine)
+    input_sets = [[str(count)] + [str(i) for i in range(count)] for count in range(20)]
+    results = run_many(program, input_sets, workers=2, pool=pool)
+    assert [result.output for result in results] == [f"{sum(range(count))}\n" for count in range(20)]
+    assert all(result.ok for result in results)
+
+
+def test_each_run_has_its_own_variables(engine, pool):
+    program = compile("x = x + 1; bark(x);", engine, variables=["x"])
+    results = run_many(program, [None, None, None], variables={"x": 1}, workers=2, pool=pool)
+    assert [result.variables for result in results] == [{"x": 2}] * 3
+
+
+def test_a_failing_run_does_not_stop_the_others(engine, pool):
+    program = compile(SUM, engine)
+    results = run_many(program, [["1", "5"], ["2", "1"], ["0"]], workers=2, pool=pool)
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, DogLangError)
+    assert results[1].variables is None
+    assert results[2].output == "0\n"
+
+
+def test_generators_are_accepted_as_input_sets(pool):
+    program = compile(SUM)
+    results = run_many(program, ((str(n) for n in (1, n)) for n in range(3)), workers=1, pool=pool)
+    assert [result.output for result in results] == ["0\n", "1\n", "2\n"]
+
+
+def test_run_captured_keeps_output_before_an_error():
+    result = run_captured(compile('bark("woof"); x = 1 / 0;'))
+    assert result.output == "woof\n"
+    assert isinstance(result.error, ZeroDivisionError)
+    assert "error" in repr(result)
+
+
+def test_unknown_pool():
+    with pytest.raises(DogLangError, match="Unknown pool"):
+        run_many(compile("x = 1;"), [None], pool="cluster")
+
+
+def test_process_pool_needs_the_source():
+    program = compile("x = 1;")
+    bare = Program(program.names, steps=program.steps)
+    assert run_many(bare, [None], pool="thread")[0].variables == {"x": 1}
+    with pytest.raises(DogLangError, match="no source"):
+        run_many(bare, [None], pool="process")
@@ -0,0 +1,78 @@
+"""Tests for resolving variables to slots before execution"""
+import pytest
+from doglang.Tokenizer import Tokenizer
+from doglang.SyntaxAnalyser import SyntaxAnalyser
+from doglang.SemanticAnalyser import SemanticAnalyser
+from doglang.error import DogLangError, DogLangNameError
+from doglang.main import Interpreter
+
+
+def innermost(node):
+    while node.children:
+        node = node.children[0]
+    return node
+
+
+def analyse(code):
+    ast = SyntaxAnalyser(Tokenizer(code)).parse()
+    return ast, SemanticAnalyser(ast)
+
+
+def test_each_name_gets_one_slot():
+    _, analyser = analyse("x = 1; y = x + 1; x = y * 2;")
+    assert analyser.names == ["x", "y"]
+    assert analyser.slots == {"x": 0, "y": 1}
+
+
+def test_identifiers_are_annotated_with_slots():
+    ast, _ = analyse("a = 1; b = a;")
+    read = ast.children[1].children[1].children[0]
+    assert read.slot == 0
+    assert read.maybe_unset is False
+
+
+def test_undeclared_variable_is_reported_before_running(engine, capsys):
+    with pytest.raises(DogLangNameError, match="Variable not declared: 'typo'"):
+        Interpreter("bark(1); bark(typo);", engine=engine)
+    assert capsys.readouterr().out == ""
+
+
+def test_name_error_is_a_doglang_error():
+    assert issubclass(DogLangNameError, DogLangError)
+
+
+def test_read_before_assignment_in_program_order_fails():
+    with pytest.raises(DogLangNameError):
+        analyse("bark(x); x = 1;")
+
+
+def test_loop_carried_variable_is_allowed(run_code):
+    code = """
+    i = 0;
+    wagtail(i < 3){
+        sniff(i > 0){
+            bark(last);
+        }
+        last = i;
+        i = i + 1;
+    }
+    """
+    assert run_code(code) == "0\n1"
+
+
+def test_variable_assigned_in_one_branch_is_checked_at_runtime(engine, capsys):
+    ast, _ = analyse("x = 0; sniff(x > 0){ a = 1; } bark(a);")
+    assert innermost(ast.children[2]).maybe_unset is True
+    with pytest.raises(DogLangNameError, match="'a'"):
+        Interpreter("x = 0; sniff(x > 0){ a = 1; } bark(a);", engine=engine)
+
+
+def test_variable_assigned_in_both_branches_is_definite():
+    ast, _ = analyse("x = 0; sniff(x > 0){ a = 1; } else { a = 2; } bark(a);")
+    assert innermost(ast.children[2]).maybe_unset is False
+
+
+def test_variables_are_exposed_by_name(engine):
+    interpreter = Interpreter("x = 2; y = x * 3;", engine=engine)
+    assert interpreter.variables == {"x": 2, "y": 6}
+    assert interpreter.symbol_table.lookup("y").value == 6
@@ -0,0 +1,50 @@
+"""Tests for SymbolTable scopes and entries"""
+import pytest
+from doglang.SymbolTable import SymbolTable
+from doglang.error import DogLangError
+
+
+@pytest.mark.symbol_table
+class TestSymbolTableScopes:
+    """Test nested scope frames"""
+
+    def test_inner_scope_shadows_and_restores(self):
+        st = SymbolTable()
+        st.insert("x", "int", "global", 1)
+        st.push_scope()
+        st.insert("x", "int", "local", 2)
+        assert st.lookup("x")['value'] == 2
+        st.pop_scope()
+        assert st.lookup("x")['value'] == 1
+
+    def test_inner_scope_names_disappear_on_pop(self):
+        st = SymbolTable()
+        st.push_scope()
+        st.insert("tmp", "int", "local", 5)
+        st.pop_scope()
+        assert st.lookup("tmp") is None
+
+    def test_modify_reaches_outer_scope(self):
+        st = SymbolTable()
+        st.insert("total", "int", "global", 0)
+        st.push_scope()
+        st.modify("total", 10)
+        st.pop_scope()
+        assert st.lookup("total").value == 10
+
+    def test_cannot_pop_global_scope(self):
+        with pytest.raises(DogLangError):
+            SymbolTable().pop_scope()
+
+    def test_reinsert_replaces_entry(self):
+        st = SymbolTable()
+        st.insert("a", "int", "local", 1)
+        st.insert("a", "str", "local", "one")
+        assert len(st) == 1
+        assert st.lookup("a")['type'] == "str"
+
+    def test_repr_lists_entries(self):
+        st = SymbolTable()
+        assert repr(st) == "Symbol Table is empty"
+        st.insert("a", "int", "local", 3)
+        assert "name : a | value : 3" in repr(st)
@@ -37,4 +37,45 @@ def test_parser_raises_error_for_unexpected_token():
     analyser = SyntaxAnalyser(tokens)
     
     with pytest.raises(DogLangSyntaxError):
-        analyser.parse()
\ No newline at end of file
+        analyser.parse()
+
+def parse_expression(source):
+    """Parse 'x = <source>;' and return the expression tree below the wrapper node."""
+    program = SyntaxAnalyser(Tokenizer(f"x = {source};")).parse()
+    return program.children[0].children[1].children[0]
+
+
+def shape(node):
+    """Render an expression tree as a compact nested tuple."""
+    if not node.children:
+        return node.value
+    return (node.type, node.value) + tuple(shape(child) for child in node.children)
+
+
+@pytest.mark.parametrize("source,expected", [
+    ("1 + 2 * 3", ("binary", "+", 1, ("binary", "*", 2, 3))),
+    ("1 - 2 - 3", ("binary", "-", ("binary", "-", 1, 2), 3)),
+    ("(1 + 2) * 3", ("binary", "*", ("grouping", None, ("binary", "+", 1, 2)), 3)),
+    ("-a % 2", ("binary", "%", ("unary", "-", "a"), 2)),
+    ("a < 1 || b >= 2 && !c",
+     ("logical", "||", ("comparison", "<", "a", 1),
+      ("logical", "&&", ("comparison", ">=", "b", 2), ("unary", "!", "c")))),
+])
+def test_expression_tree_shape(source, expected):
+    """Tests that expressions are parsed into a precedence-aware tree."""
+    assert shape(parse_expression(source)) == expected
+
+
+@pytest.mark.parametrize("source", ["1 +", "(1 + 2", "1 2", "* 3", ")"])
+def test_malformed_expressions_raise(source):
+    """Tests that broken expressions are syntax errors."""
+    with pytest.raises(DogLangSyntaxError):
+        parse_expression(source)
+
+
+@pytest.mark.parametrize("source", ["a = 1;\nsniff(a == 1)", "a = 1;\nsniff(a == 1) { bark(a); } else"])
+def test_missing_block_at_end_of_input(source):
+    """Tests that a sniff or else with nothing after it is a syntax error at the end of the input."""
+    with pytest.raises(DogLangSyntaxError, match="end of input") as info:
+        SyntaxAnalyser(Tokenizer(source)).parse()
+    assert info.value.line == 2
@@ -0,0 +1,79 @@
+"""Tests for the master-regex tokenizer"""
+import io
+import pytest
+from doglang.Tokenizer import Tokenizer, Tokens, iter_tokens
+from doglang.error import DogLangSyntaxError
+
+
+def kinds(code):
+    return [(token.token_type, token.value) for token in Tokenizer(code)]
+
+
+def test_token_types_come_from_pattern():
+    assert kinds('x = fetch("n") >= 10 && !y;') == [
+        (Tokens.IDENTIFIER, "x"),
+        (Tokens.ASSIGNMENT_OP, "="),
+        (Tokens.KEYWORD, "fetch"),
+        (Tokens.PARENTHESIS, "("),
+        (Tokens.STRING_LITERAL, "n"),
+        (Tokens.PARENTHESIS, ")"),
+        (Tokens.COMPARISON_OP, ">="),
+        (Tokens.INT_LITERAL, "10"),
+        (Tokens.LOGICAL_OP, "&&"),
+        (Tokens.LOGICAL_OP, "!"),
+        (Tokens.IDENTIFIER, "y"),
+        (Tokens.SEMICOLON, ";"),
+    ]
+
+
+@pytest.mark.parametrize("name", ["barking", "sniffer", "else_x", "fetch2"])
+def test_keyword_prefix_is_identifier(name):
+    assert kinds(f"{name} = 1;")[0] == (Tokens.IDENTIFIER, name)
+
+
+def test_line_and_column_tracking():
+    tokens = Tokenizer("a = 1;\n  bark(a);")
+    assert [(token.line, token.column) for token in tokens] == [
+        (1, 1), (1, 3), (1, 5), (1, 6),
+        (2, 3), (2, 7), (2, 8), (2, 9), (2, 10),
+    ]
+
+
+def test_string_column_is_the_opening_quote():
+    tokens = Tokenizer('bark("hi");  x = "";')
+    assert [(token.value, token.column) for token in tokens if token.token_type == Tokens.STRING_LITERAL] == [
+        ("hi", 6), ("", 18),
+    ]
+
+
+@pytest.mark.parametrize("code,character,column", [
+    ("a = 1 # comment", "#", 7),
+    ("bark(@);", "@", 6),
+    ('bark("open);', '"', 6),
+])
+def test_unrecognized_characters_are_reported(code, character, column):
+    with pytest.raises(DogLangSyntaxError) as excinfo:
+        Tokenizer(code)
+    assert str(excinfo.value) == f"Unrecognized token '{character}' at line 1, column {column}"
+
+
+def test_iter_tokens_streams_from_file():
+    source = io.StringIO("a = 1;\nbark(a);\n")
+    tokens = iter_tokens(source)
+    first = next(tokens)
+    assert (first.token_type, first.value, first.line) == (Tokens.IDENTIFIER, "a", 1)
+    # the rest of the file is only read as tokens are requested
+    assert source.tell() < len(source.getvalue())
+    assert [token.value for token in tokens] == ["=", "1", ";", "bark", "(", "a", ")", ";"]
+
+
+def test_tokens_are_compact():
+    token = Tokenizer("alpha = alpha;")[0]
+    assert not hasattr(token, "__dict__")
+    assert isinstance(token.token_type, int)
+    assert str(token.token_type) == "IDENTIFIER"
+
+
+def test_repeated_names_share_one_string():
+    first, _, second, _ = Tokenizer("alpha = alpha;")
+    assert first.value is second.value
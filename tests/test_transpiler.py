@@ -0,0 +1,95 @@
+"""Tests for the py engine, which transpiles DogLang to Python"""
+import io
+import traceback
+
+import pytest
+from doglang.error import DogLangError, DogLangLimitError
+from doglang.program import compile
+from doglang.runtime import Limits
+from doglang.transpiler import python_source
+
+
+def source_of(code):
+    program = compile(code, "py")
+    return python_source(program.ast, program.names)
+
+
+def test_statements_become_python_statements():
+    source = source_of("i = 0; wagtail(i < 3){ i = i + 1; sniff(i == 1){ bark(i); } else { bark(0); } }")
+    assert "while i_0 < 3:" in source
+    # A comparison may give a mask, so sniff checks for a bool
+    assert "_condition = i_0 == 1" in source
+    assert "_write(i_0)" in source
+    assert "i_0 = i_0 + 1" in source
+
+
+def test_variables_are_locals_written_back_to_slots():
+    source = source_of("x = 1; y = x + 2;")
+    assert "x_0 = _slots[0]" in source
+    assert "_slots[1] = y_1" in source
+    assert compile("x = 1; y = x + 2;", "py").run() == {"x": 1, "y": 3}
+
+
+def test_sniff_on_a_variable_keeps_the_boolean_check():
+    source = source_of("flag = 1 == 1; sniff(flag){ bark(1); }")
+    assert "_not_boolean()" in source
+    with pytest.raises(DogLangError, match="not boolean"):
+        compile("flag = 1; sniff(flag){ bark(1); }", "py").run(output=io.StringIO())
+
+
+def test_logical_operators_give_booleans():
+    output = io.StringIO()
+    compile("a = 2; b = 0; bark(a && b); bark(a || b); bark(a > 1 && b == 0);", "py").run(output=output)
+    assert output.getvalue() == "False\nTrue\nTrue\n"
+
+
+def test_traceback_points_at_the_doggy_line():
+    program = compile("a = 1;\nb = 0;\n\nbark(a / b);\n", "py")
+    with pytest.raises(ZeroDivisionError) as raised:
+        program.run(output=io.StringIO())
+    frames = [frame for frame in traceback.extract_tb(raised.value.__traceback__) if frame.filename == "<doglang>"]
+    assert frames[-1].lineno == 4
+
+
+def test_unlimited_runs_have_no_charges():
+    program = compile("i = 0; wagtail(i < 10){ i = i + 1; }", "py")
+    assert "_countdown" not in python_source(program.ast, program.names)
+    assert "_countdown" in python_source(program.ast, program.names, charge=True)
+
+
+def test_limited_function_is_generated_once():
+    program = compile("i = 0; wagtail(i < 10){ i = i + 1; }", "py")
+    assert list(program._functions) == [(False, False)]
+    for _ in range(2):
+        program.run(limits=Limits(steps=100))
+    assert list(program._functions) == [(False, False), (True, False)]
+
+
+def test_every_statement_is_charged():
+    program = compile("i = 0; j = 0; wagtail(i < 10){ i = i + 1; j = j + 2; }", "py")
+    assert python_source(program.ast, program.names, charge=True).count("_countdown -= 1") == 5
+    assert program.run(limits=Limits(steps=23))["i"] == 10
+    with pytest.raises(DogLangLimitError):
+        program.run(limits=Limits(steps=22))
+
+
+def test_too_deeply_nested_loops_are_reported():
+    depth = 30
+    code = "i = 0; " + "wagtail(i < 1){ " * depth + "i = 1; " + "} " * depth
+    with pytest.raises(DogLangError, match="nested too deeply"):
+        compile(code, "py")
+
+
+def test_unusual_variable_names():
+    code = "_slots = 1; _write = 2; x_1 = 3; bark(_slots + _write + x_1);"
+    output = io.StringIO()
+    assert compile(code, "py").run(output=output) == {"_slots": 1, "_write": 2, "x_1": 3}
+    assert output.getvalue() == "6\n"
+
+
+def test_counted_loop_becomes_a_for_loop():
+    source = source_of("i = 0; total = 0; wagtail(i < 5){ total = total + i; i = i + 1; } bark(i);")
+    assert "for i_0 in _range0:" in source
+    assert "i_0 = _range0.end" in source
+    assert compile("i = 0; total = 0; wagtail(i < 5){ total = total + i; i = i + 1; }", "py").run() == \
+        {"i": 5, "total": 10}
@@ -0,0 +1,130 @@
+"""Tests for whole-pack arithmetic, comparisons and reductions, on every backend"""
+import io
+import math
+from array import array
+
+import pytest
+from doglang import vector
+from doglang.error import DogLangError
+from doglang.program import compile
+from doglang.runtime import Pack, runt, tally, topdog
+
+
+@pytest.fixture(params=vector.BACKENDS)
+def backend(request):
+    """Fixture that runs a test once per backend, numpy only when it is installed"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    previous = vector.use_backend(request.param)
+    yield request.param
+    vector.use_backend(previous)
+
+
+def output_of(code, engine):
+    output = io.StringIO()
+    compile(code, engine).run(output=output)
+    return output.getvalue()
+
+
+def same(left, right):
+    # nan is not equal to itself, so compare the text of floats
+    return [repr(value) for value in left] == [repr(value) for value in right]
+
+
+def test_whole_pack_operations(engine, backend):
+    code = """prices = pack[10, 20, 30];
+bark(prices * 2);
+bark(prices + pack[1, 2, 3]);
+bark(100 - prices);
+bark(prices / 4);
+bark(prices % 7);
+bark(prices > 15);
+bark(tally(prices > 15));
+bark(tally(prices));
+bark(runt(prices));
+bark(topdog(prices - 100));
+"""
+    assert output_of(code, engine) == ("[20, 40, 60]\n[11, 22, 33]\n[90, 80, 70]\n[2.5, 5.0, 7.5]\n"
+                                       "[3, 6, 2]\n[False, True, True]\n2\n60\n10\n-70\n")
+
+
+def test_mask_is_not_a_sniff_condition(engine, backend):
+    with pytest.raises(DogLangError, match="not boolean"):
+        output_of("p = pack[1, 2]; sniff(p == 1){ bark(1); }", engine)
+
+
+@pytest.mark.parametrize("left", [
+    [3, -7, 0, 12],
+    [2 ** 62, -2 ** 63, 2 ** 53 + 1, 5],
+    [0.5, -0.0, float("nan"), 1e308],
+    [1, 2.5, "a", True],
+])
+@pytest.mark.parametrize("right", [-3, 0, 2 ** 62, 2 ** 70, 2.5, True, [4, 0, -2, 3], [1.5, 2.0, -0.5, 0.0]])
+@pytest.mark.parametrize("op", list(vector.OPERATORS))
+def test_results_are_what_python_gives(backend, op, left, right):
+    function = vector.OPERATORS[op]
+    operands = right if isinstance(right, list) else [right] * len(left)
+    try:
+        expected = [function(x, y) for x, y in zip(left, operands)]
+    except Exception as error:
+        with pytest.raises(type(error)):
+            function(Pack(left), Pack(right) if isinstance(right, list) else right)
+        return
+    result = function(Pack(left), Pack(right) if isinstance(right, list) else right)
+    assert same(result, expected)
+    assert type(result.items) is type(Pack(expected).items)
+
+
+def test_scalar_on_the_left(backend):
+    assert list(10 - Pack([1, 2])) == [9, 8]
+    assert list(1 < Pack([0, 5])) == [False, True]
+    assert list("dog" + Pack(["s", "gy"])) == ["dogs", "doggy"]
+
+
+def test_results_keep_compact_storage(backend):
+    numbers = Pack(range(10))
+    assert (numbers * 3).items.typecode == 'q'
+    assert (numbers / 2).items.typecode == 'd'
+    assert type((numbers > 4).items) is list
+    # Still growable after NumPy looked at it
+    numbers.append(10)
+    assert len(numbers) == 11
+
+
+def test_packs_of_different_lengths(backend):
+    with pytest.raises(DogLangError, match="packs of 2 and 3"):
+        Pack([1, 2]) + Pack([1, 2, 3])
+
+
+def test_division_by_zero(backend):
+    with pytest.raises(ZeroDivisionError):
+        Pack([1, 2]) / 0
+    with pytest.raises(ZeroDivisionError):
+        Pack([1.5, 2.5]) % Pack([1.0, 0.0])
+
+
+def test_reductions(backend):
+    assert tally(Pack([])) == 0
+    assert tally(Pack([2 ** 62, 2 ** 62])) == 2 ** 63
+    assert tally(Pack([0.1, 0.2, 0.3])) == 0.1 + 0.2 + 0.3
+    assert tally(Pack([True, False, True])) == 2
+    assert runt(Pack([3, -1, 2])) == -1
+    assert topdog(Pack(["b", "a"])) == "b"
+    assert math.isnan(runt(Pack([float("nan"), 1.0])))
+    with pytest.raises(DogLangError, match="runt of an empty pack"):
+        runt(Pack([]))
+    with pytest.raises(DogLangError, match="topdog needs a pack, not int"):
+        topdog(5)
+
+
+def test_float_packs_are_compact():
+    assert type(Pack([0.5, 1.5]).items) is array
+    assert Pack([0.5]).element_type == "float"
+    floats = Pack([0.5])
+    floats.append(1)
+    assert type(floats.items) is list
+
+
+def test_unknown_backend():
+    with pytest.raises(DogLangError, match="Unknown backend"):
+        vector.use_backend("fortran")